@@ -0,0 +1,271 @@
+# 팩맨 자동 조종 (어트랙트 모드, 장시간 테스트, 밸런스 스윕의 기준 정책)
+# 팩맨이 타일 중앙에 있을 때만 방향을 정한다. 타일 단위로 단순화한 모델 위에서 expectimax 탐색을 하며,
+# 추적/산개 중인 고스트는 게임과 같은 목표 규칙으로 움직이고, 겁먹은 고스트는 random.choice 처럼
+# 갈 수 있는 방향 중 하나를 고르는 확률 노드로 둔다.
+# 시간 예산(budget, 초)이 있으면 깊이를 1 씩 늘리다가 마감 시각에 마지막으로 끝난 깊이의 답을 돌려준다.
+# 맵 그래프, 타일 사이 거리, 가장 가까운 펠릿까지 거리는 모두 물어본 타일의 값이 정해질 때까지만 만들고(BFS 를 이어 갈 수 있게
+# 큐를 남겨 둔다) 그 시간도 예산에 넣는다. 마감이 지나면 BFS 도중에 멈추고, 남은 부분은 다음 결정에서 이어 간다.
+from collections import deque
+import re
+import time
+
+import pacman
+
+DEFAULT_BUDGET = 0.003 # 초. 60fps 창 모드에서 한 프레임(16.7ms) 안에 여유 있게 들어가는 값
+DEFAULT_MAX_DEPTH = 12
+HEADLESS_DEPTH = 5 # 시간 예산 없이 고정 깊이로 돌 때 (결과가 기기 속도와 무관하게 재현된다)
+TICKS_PER_PLY = pacman.TILE_WIDTH // int(pacman.PACMAN_SPEED) # 팩맨이 한 타일 가는 데 드는 틱
+
+DEATH_PENALTY = 10000
+DANGER_WEIGHT = 400 # 가까운 추적 고스트에 대한 벌점 (거리 반비례)
+DANGER_RANGE = 5
+HUNT_WEIGHT = 150 # 잡아먹을 수 있는 겁먹은 고스트에 대한 가점
+PELLET_WEIGHT = 3 # 가장 가까운 펠릿까지의 거리 벌점
+PLY_DISCOUNT = 0.97 # 같은 점수면 빨리 얻는 쪽을 고른다
+
+ACTION_BY_CODE = [next(a for a, d in pacman.ACTION_DIRECTIONS.items() if d == direction) for direction in pacman.PRIORITY_ORDER]
+CODE_VECTORS = [(d.x, d.y) for d in pacman.PRIORITY_ORDER]
+REVERSE_CODE = [CODE_VECTORS.index((-x, -y)) for x, y in CODE_VECTORS]
+NO_CODE = -1
+CHECK_EVERY = 64 # BFS 에서 이만큼 타일을 꺼낼 때마다 마감 시각을 본다
+PELLET_TILES = re.compile(b'[\x02\x03]') # Level.map 에서 펠릿(2)과 파워 펠릿(3)
+
+
+class Timeout(Exception):
+    pass
+
+
+class Moves(dict):
+    # 타일 인덱스 -> (방향 코드, 이웃 인덱스) 목록 (PRIORITY_ORDER 순서). 처음 물어본 타일만 만든다.
+    def __init__(self, template):
+        self.walls, self.nav = template.walls, template.nav
+
+    def __missing__(self, i):
+        moves = ()
+        if not self.walls[i]:
+            moves = tuple((code, n) for code, n in ((code, self.nav.neighbor(i, d)) for code, d in enumerate(pacman.PRIORITY_ORDER)) if n >= 0)
+        self[i] = moves
+        return moves
+
+
+class Maze:
+    # 템플릿마다 하나. 거리 표는 ({타일: 거리}, 남은 BFS 큐) 이며 reach() 가 필요한 만큼만 채운다 (큰 맵에서도 표를 통째로 잡지 않는다).
+    def __init__(self, template):
+        self.template, self.width, self.height = template, template.width, template.height
+        self.moves = Moves(template)
+        self.distances = {}
+
+    def field(self, sources): return dict.fromkeys(sources, 0), deque(sources)
+
+    def distance_to(self, index):
+        # index 에서(미로는 양방향이므로 index 까지도) 다른 타일까지의 거리 표
+        table = self.distances.get(index)
+        if table is None: table = self.distances[index] = self.field((index,))
+        return table
+
+    def pellet_field(self, level_map):
+        # 모든 펠릿에서 동시에 시작하는 BFS: 타일마다 가장 가까운 펠릿까지 거리
+        return self.field([m.start() for m in PELLET_TILES.finditer(level_map)])
+
+    def reach(self, table, index, deadline=None, limit=None):
+        # index 의 거리가 정해질 때까지 (limit 가 있으면 limit 보다 먼 곳은 보지 않고) BFS 를 이어 간다. 모르면 -1.
+        dist, queue = table
+        moves, popped = self.moves, 0
+        while index not in dist and queue:
+            current = queue[0]
+            d = dist[current] + 1
+            if limit is not None and d > limit: break
+            queue.popleft()
+            for _, n in moves[current]:
+                if n not in dist:
+                    dist[n] = d
+                    queue.append(n)
+            popped += 1
+            if deadline is not None and popped % CHECK_EVERY == 0 and time.perf_counter() > deadline: raise Timeout()
+        return dist.get(index, -1)
+
+
+_mazes = {}
+
+def get_maze(template):
+    maze = _mazes.get(id(template))
+    if maze is None or maze.template is not template: maze = _mazes[id(template)] = Maze(template)
+    return maze
+
+
+class Autopilot:
+    def __init__(self, budget=DEFAULT_BUDGET, max_depth=DEFAULT_MAX_DEPTH):
+        self.budget, self.max_depth = budget, max_depth
+        self.deadline = None
+        self.last_depth, self.nodes = 0, 0
+        self.pellets, self.pellets_key = None, None
+
+    def prepare(self, engine):
+        # 창 모드에서 켤 때 부른다. 표는 결정하면서 예산 안에서 채우므로 여기서는 맵 그래프 객체만 잡아 둔다.
+        get_maze(engine.level.template)
+
+    def __call__(self, engine):
+        # runner.py 의 policy(engine) -> ACTION_* 규약
+        p = engine.pacman
+        if engine.state != pacman.STATE_PLAYING or not p.at_tile_center(): return pacman.ACTION_NONE
+        return self.choose(engine)
+
+    def choose(self, engine):
+        self.deadline = time.perf_counter() + self.budget if self.budget else None
+        level, p = engine.level, engine.pacman
+        maze = self.maze = get_maze(level.template)
+        width = maze.width
+        self.map = level.map
+        # 펠릿 거리 표는 펠릿 수가 바뀔 때만 새로 시작한다 (그 전까지는 앞 결정에서 멈춘 BFS 를 이어 쓴다)
+        key = (id(level.map), level.pellet_count, maze)
+        if key != self.pellets_key: self.pellets, self.pellets_key = maze.pellet_field(level.map), key
+        self.ghost_mode = engine.ghost_mode
+        self.scatter = {k: (g.scatter_target.x, g.scatter_target.y) for k, g in enumerate(engine.ghosts)}
+        start = p.tile_pos.y * width + p.tile_pos.x
+        if not maze.moves[start]: return pacman.ACTION_NONE
+
+        # 고스트: (번호, 타일, 방향 코드, 겁먹음). 집 안과 눈알(먹힌) 상태는 위험이 없으므로 뺀다.
+        ghosts = []
+        for k, g in enumerate(engine.ghosts):
+            if g.state in (pacman.GHOST_STATE_IN_HOUSE, pacman.GHOST_STATE_EATEN): continue
+            d = (g.direction.x, g.direction.y)
+            ghosts.append((k, g.tile_pos.y * width + g.tile_pos.x, CODE_VECTORS.index(d) if d in CODE_VECTORS else NO_CODE,
+                           g.state == pacman.GHOST_STATE_FRIGHTENED))
+        ghosts = tuple(ghosts)
+        fright = engine.frightened_timer // TICKS_PER_PLY
+        d = (p.direction.x, p.direction.y)
+        pdir = CODE_VECTORS.index(d) if d in CODE_VECTORS else NO_CODE
+
+        self.nodes, best = 0, maze.moves[start][0][0]
+        for depth in range(1, self.max_depth + 1) if self.deadline else (self.max_depth,):
+            try:
+                best = self.search_root(start, pdir, ghosts, fright, depth)
+                self.last_depth = depth
+            except Timeout:
+                break
+        return ACTION_BY_CODE[best]
+
+    def search_root(self, start, pdir, ghosts, fright, depth):
+        best_value, best_code = None, None
+        for code, n in self.maze.moves[start]:
+            value = self.pacman_move(start, n, code, ghosts, 0, fright, depth, 0)
+            if best_value is None or value > best_value: best_value, best_code = value, code
+        return best_code
+
+    def max_node(self, p, pdir, ghosts, eaten, fright, depth, ply):
+        if depth == 0: return self.evaluate(p, ghosts, eaten, fright)
+        best = None
+        for code, n in self.maze.moves[p]:
+            value = self.pacman_move(p, n, code, ghosts, eaten, fright, depth, ply)
+            if best is None or value > best: best = value
+        return best
+
+    def pacman_move(self, p, n, code, ghosts, eaten, fright, depth, ply):
+        self.nodes += 1
+        if self.deadline is not None and (self.nodes & 15) == 0 and time.perf_counter() > self.deadline: raise Timeout()
+        gain, bit = 0, 1 << n
+        tile = self.map[n]
+        if (tile == 2 or tile == 3) and not eaten & bit:
+            eaten |= bit
+            gain = 10
+            if tile == 3:
+                gain, fright = 50, 7 * 60 // TICKS_PER_PLY
+                ghosts = tuple((k, i, c, True) for k, i, c, _ in ghosts)
+        return gain + PLY_DISCOUNT * self.ghost_moves(p, n, code, ghosts, eaten, fright, depth, ply)
+
+    def ghost_moves(self, p_old, p, pdir, ghosts, eaten, fright, depth, ply):
+        # 추적 고스트는 결정적으로, 겁먹은 고스트는 (속도가 느리므로) 두 수에 한 번 움직인다.
+        # 확률 분기는 팩맨에게 가장 가까운 겁먹은 고스트 하나만 펼치고 나머지는 제자리로 둔다.
+        scared_turn = ply % 2 == 1
+        moved = []
+        blinky = next((i for k, i, _, _ in ghosts if k == 0), None)
+        nearest = None
+        for slot, (k, i, c, scared) in enumerate(ghosts):
+            if scared:
+                if scared_turn:
+                    d = self.maze.reach(self.maze.distance_to(p), i, self.deadline)
+                    if nearest is None or 0 <= d < nearest[0]: nearest = (d, slot)
+                moved.append((k, i, c, scared))
+            else:
+                moved.append(self.hunt_move(k, i, c, p, pdir, blinky))
+        if nearest is None: return self.resolve(p_old, p, pdir, ghosts, tuple(moved), eaten, fright, depth, ply)
+        slot = nearest[1]
+        k, i, c, _ = ghosts[slot]
+        options = self.ghost_options(i, c)
+        if not options: return self.resolve(p_old, p, pdir, ghosts, tuple(moved), eaten, fright, depth, ply)
+        total = 0.0
+        for code, n in options:
+            moved[slot] = (k, n, code, True)
+            total += self.resolve(p_old, p, pdir, ghosts, tuple(moved), eaten, fright, depth, ply)
+        return total / len(options)
+
+    def ghost_options(self, i, c):
+        options = self.maze.moves[i]
+        if len(options) > 1 and c != NO_CODE:
+            reverse = REVERSE_CODE[c]
+            options = tuple(move for move in options if move[0] != reverse)
+        return options
+
+    def hunt_move(self, k, i, c, p, pdir, blinky):
+        # Ghost.update 의 추적/산개 규칙을 타일 단위로: 되돌아가지 않는 방향 중 목표까지 직선거리 제곱이 가장 짧은 쪽
+        width = self.maze.width
+        tx, ty = self.target(k, i, p, pdir, blinky)
+        x, y = i % width, i // width
+        best, best_dist = None, None
+        for code, n in self.ghost_options(i, c):
+            dx, dy = CODE_VECTORS[code]
+            ox, oy = x + dx - tx, y + dy - ty
+            dist = ox * ox + oy * oy
+            if best_dist is None or dist < best_dist: best, best_dist = (code, n), dist
+        if best is None: return (k, i, c, False)
+        return (k, best[1], best[0], False)
+
+    def target(self, k, i, p, pdir, blinky):
+        width = self.maze.width
+        px, py = p % width, p // width
+        if self.ghost_mode == pacman.GHOST_STATE_SCATTER: return self.scatter[k]
+        dx, dy = CODE_VECTORS[pdir] if pdir != NO_CODE else (0, 0)
+        if k == 1: return (px - 4, py - 4) if dy < 0 else (px + dx * 4, py + dy * 4)
+        if k == 2 and blinky is not None:
+            bx, by = blinky % width, blinky // width
+            return (2 * (px + dx * 2) - bx, 2 * (py + dy * 2) - by)
+        if k == 3:
+            ox, oy = i % width - px, i // width - py
+            return (px, py) if ox * ox + oy * oy > 64 else self.scatter[3]
+        return (px, py)
+
+    def resolve(self, p_old, p, pdir, before, after, eaten, fright, depth, ply):
+        # 같은 타일에 있거나 서로 자리를 바꿨으면 부딪힌 것으로 본다.
+        gain, survivors, bonus = 0, [], 200
+        for (k, old, _, _), ghost in zip(before, after):
+            _, i, _, scared = ghost
+            if i == p or (i == p_old and old == p):
+                if not scared: return -DEATH_PENALTY
+                gain += bonus
+                bonus *= 2
+                continue
+            survivors.append(ghost)
+        ghosts = tuple(survivors) if gain else after
+        if fright > 0:
+            fright -= 1
+            if fright == 0: ghosts = tuple((k, i, c, False) for k, i, c, _ in ghosts)
+        return gain + self.max_node(p, pdir, ghosts, eaten, fright, depth - 1, ply + 1)
+
+    def evaluate(self, p, ghosts, eaten, fright):
+        # 고스트 거리는 DANGER_RANGE / 남은 겁먹음 시간 안쪽만 의미가 있으므로 그 너머로는 BFS 를 늘리지 않는다
+        maze, deadline = self.maze, self.deadline
+        distance, limit = maze.distance_to(p), max(DANGER_RANGE, fright)
+        value = -PELLET_WEIGHT * max(maze.reach(self.pellets, p, deadline), 0)
+        for _, i, _, scared in ghosts:
+            d = maze.reach(distance, i, deadline, limit)
+            if d < 0: continue
+            if not scared:
+                if d < DANGER_RANGE: value -= DANGER_WEIGHT / (1 + d)
+            elif fright > d:
+                value += HUNT_WEIGHT / (1 + d)
+        return value
+
+
+def make_policy(seed=None):
+    # runner.py 용: 시간 예산 없이 고정 깊이로 돌므로 같은 시드면 항상 같은 판이 나온다.
+    return Autopilot(budget=None, max_depth=HEADLESS_DEPTH)
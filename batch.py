@@ -0,0 +1,423 @@
+# N 판의 게임을 NumPy 배열(structure-of-arrays)로 들고 한 번에 한 틱씩 진행하는 배치 엔진 (강화학습용)
+# 규칙은 pacman.GameEngine 과 틱 단위로 같다:  python batch.py --check  로 스칼라 엔진과 대조한다.
+# 화면/과일 그림/입력 기록은 없다. 겁먹은 고스트의 무작위 방향만은 스칼라 엔진과 같은 결과를 내도록
+# 판마다의 random.Random 을 그대로 쓰므로, 그 순간에 해당하는 판들에 대해서만 파이썬 루프로 처리한다.
+#
+#   engine = BatchEngine(256, seeds=range(256))
+#   engine.step(actions)            # actions: 판마다 ACTION_* (길이 N)
+#   engine.score, engine.state ...  # 판별 상태 배열
+import random
+import sys
+import time
+
+import numpy as np
+
+import pacman
+from pacman import (TILE_WIDTH, TILE_HEIGHT, HALF_TILE_WIDTH, HALF_TILE_HEIGHT,
+                    STATE_PLAYING, STATE_PAUSED, STATE_GAME_OVER, ACTION_NONE,
+                    GHOST_STATE_CHASE, GHOST_STATE_SCATTER, GHOST_STATE_FRIGHTENED, GHOST_STATE_EATEN, GHOST_STATE_IN_HOUSE, GHOST_STATE_EXITING)
+
+GHOST_CLASSES = (pacman.Blinky, pacman.Pinky, pacman.Inky, pacman.Clyde) # GameEngine.init_game 과 같은 순서
+GHOST_COUNT = len(GHOST_CLASSES)
+GHOST_EXIT_TICKS = np.array(pacman.GHOST_HOUSE_TICKS)
+TILE_SIZE = np.array([TILE_WIDTH, TILE_HEIGHT])
+TILE_HALF = np.array([HALF_TILE_WIDTH, HALF_TILE_HEIGHT])
+TILE_SUBPIXELS = TILE_SIZE * pacman.SUBPIXELS
+
+# 방향은 (dx, dy) 정수 쌍으로 들고 다닌다. 코드 0..3 은 DIRECTIONS(=NAV_DIRECTIONS) 순서, 4 는 정지.
+DIRECTION_VECTORS = np.array([(d.x, d.y) for d in pacman.DIRECTIONS] + [(0, 0)])
+PRIORITY_VECTORS = np.array([(d.x, d.y) for d in pacman.PRIORITY_ORDER])
+PRIORITY_BITS = np.array([pacman.DIRECTION_BITS[d] for d in pacman.PRIORITY_ORDER])
+ACTION_VECTORS = np.zeros((5, 2), dtype=np.int64)
+for _action, _direction in pacman.ACTION_DIRECTIONS.items(): ACTION_VECTORS[_action] = (_direction.x, _direction.y)
+POPCOUNT = np.array([bin(mask).count('1') for mask in range(16)])
+WAVE_SCATTER = np.array([scatter for scatter, _ in pacman.SCATTER_CHASE_WAVES], dtype=float)
+WAVE_CHASE = np.array([chase for _, chase in pacman.SCATTER_CHASE_WAVES], dtype=float)
+FAR = np.iinfo(np.int64).max
+
+
+def nav_codes(nav, target):
+    # 흐름장의 방향 코드(NAV_NONE 포함)를 DIRECTION_VECTORS 의 인덱스로 바꾼 배열
+    codes = np.frombuffer(bytes(nav.field(target)[1]), dtype=np.uint8).astype(np.int64)
+    codes[codes == pacman.NAV_NONE] = 4
+    return codes
+
+
+class BatchEngine:
+    def __init__(self, n, seeds=None, map_data=pacman.LEVEL_DATA):
+        self.n = n
+        self.template = template = pacman.get_level_template(map_data)
+        self.width, self.height = template.width, template.height
+        self.tiles = np.frombuffer(template.tiles, dtype=np.uint8)
+        self.walls = np.frombuffer(template.walls, dtype=np.uint8).astype(bool)
+        self.exits = np.frombuffer(template.exits, dtype=np.uint8).astype(np.int64)
+        self.total_pellets = template.pellet_count
+
+        level = pacman.Level(map_data)
+        ghosts = [cls(level, level.ghost_start_pos[i]) for i, cls in enumerate(GHOST_CLASSES)]
+        self.pacman_start = np.array([level.pacman_start_pos.x, level.pacman_start_pos.y])
+        self.ghost_start = np.array([(g.start_pos.x, g.start_pos.y) for g in ghosts])
+        self.scatter_targets = np.array([(g.scatter_target.x, g.scatter_target.y) for g in ghosts])
+        self.house_exit = np.array([level.ghost_house_exit.x, level.ghost_house_exit.y])
+        self.fruit_tile = np.array([level.fruit_pos.x, level.fruit_pos.y])
+        # 먹힌 고스트의 귀환 / 집에서 나오기용 흐름장
+        self.home_codes = [nav_codes(template.nav, g.start_pos) for g in ghosts]
+        self.exit_codes = nav_codes(template.nav, level.ghost_house_exit)
+
+        ints = lambda *shape: np.zeros((n,) + shape, dtype=np.int64)
+        self.seeds, self.rngs = [0] * n, [None] * n
+        self.tick, self.state, self.pause_timer = ints(), ints(), ints()
+        self.round_level, self.deaths, self.score, self.lives = ints(), ints(), ints(), ints()
+        self.bonus_life_awarded = np.zeros(n, dtype=bool)
+        self.map = np.zeros((n, self.width * self.height), dtype=np.uint8)
+        self.pellet_count = ints()
+        # 위치는 Entity 와 같이 타일 + 타일 중앙에서의 서브픽셀 오프셋 + 넘친 거리(carry), 속도는 서브픽셀/틱 정수
+        self.pacman_tile, self.pacman_offset, self.pacman_carry, self.pacman_dir, self.pacman_buffered = ints(2), ints(2), ints(), ints(2), ints(2)
+        self.ghost_tile, self.ghost_offset, self.ghost_carry, self.ghost_dir = ints(GHOST_COUNT, 2), ints(GHOST_COUNT, 2), ints(GHOST_COUNT), ints(GHOST_COUNT, 2)
+        self.ghost_state, self.ghost_in_house_timer = ints(GHOST_COUNT), ints(GHOST_COUNT)
+        self.ghost_speed, self.ghost_base_speed = ints(GHOST_COUNT), ints(GHOST_COUNT)
+        self.ghost_immune = np.zeros((n, GHOST_COUNT), dtype=bool)
+        self.rage_speed = ints()
+        self.frightened_timer, self.scatter_chase_timer, self.current_wave = ints(), ints(), ints()
+        self.ghost_mode, self.ghost_eaten_score = ints(), ints()
+        self.fruit_active = np.zeros(n, dtype=bool)
+        self.fruit_spawn_time, self.fruit_spawn_level = ints(), ints()
+        self.reset(seeds)
+
+    # --- 초기화 (GameEngine.init_game / init_round / reset_after_death / increase_difficulty) ---
+    def reset(self, seeds=None, games=None):
+        games = np.arange(self.n) if games is None else np.asarray(games, dtype=np.int64)
+        seeds = [random.randrange(2**32) for _ in games] if seeds is None else list(seeds)
+        for i, seed in zip(games.tolist(), seeds):
+            self.seeds[i], self.rngs[i] = seed, random.Random(seed)
+        self.tick[games], self.round_level[games], self.deaths[games] = 0, 1, 0
+        self.score[games], self.lives[games], self.bonus_life_awarded[games] = 0, 3, False
+        self.map[games], self.pellet_count[games] = self.tiles, self.total_pellets
+        # 고스트는 생성자에서 GHOST_BASE_SPEED 를 받고, increase_difficulty 는 base_speed/rage_speed 만 바꾼다.
+        self.ghost_speed[games], self.rage_speed[games] = pacman.fixed_speed(pacman.GHOST_BASE_SPEED), pacman.fixed_speed(pacman.BLINKY_RAGE_SPEED)
+        self.increase_difficulty(games)
+        self.reset_entities(games, ghost_speed=False)
+        self.frightened_timer[games], self.scatter_chase_timer[games], self.current_wave[games] = 0, 0, 0
+        self.ghost_eaten_score[games], self.ghost_mode[games] = 200, GHOST_STATE_SCATTER
+        self.fruit_active[games], self.fruit_spawn_time[games], self.fruit_spawn_level[games] = False, 0, 0
+        self.state[games], self.pause_timer[games] = STATE_PAUSED, 60
+
+    def increase_difficulty(self, games):
+        steps = (self.round_level[games] - 1).astype(float)
+        # pacman.fixed_speed 와 같은 반올림 (둘 다 짝수 쪽으로 반올림)
+        base = np.minimum(pacman.GHOST_BASE_SPEED + pacman.GHOST_SPEED_STEP * steps, pacman.PACMAN_SPEED + pacman.MAX_GHOST_SPEED_BONUS)
+        self.ghost_base_speed[games] = np.round(base * pacman.SUBPIXELS).astype(np.int64)[:, None]
+        rage = np.minimum(pacman.BLINKY_RAGE_SPEED + pacman.BLINKY_RAGE_SPEED_STEP * steps, pacman.PACMAN_SPEED + pacman.MAX_RAGE_SPEED_BONUS)
+        self.rage_speed[games] = np.round(rage * pacman.SUBPIXELS).astype(np.int64)
+
+    def reset_entities(self, games, ghost_speed=True):
+        self.pacman_tile[games], self.pacman_offset[games], self.pacman_carry[games] = self.pacman_start, 0, 0
+        self.pacman_dir[games], self.pacman_buffered[games] = 0, 0
+        self.ghost_tile[games], self.ghost_offset[games], self.ghost_carry[games] = self.ghost_start, 0, 0
+        self.ghost_dir[games], self.ghost_state[games] = 0, GHOST_STATE_IN_HOUSE
+        if ghost_speed: self.ghost_speed[games] = self.ghost_base_speed[games]
+        self.ghost_immune[games], self.ghost_in_house_timer[games] = False, 0
+
+    # --- 한 틱 ---
+    def step(self, actions=None):
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            act = np.flatnonzero(actions != ACTION_NONE)
+            self.pacman_buffered[act] = ACTION_VECTORS[actions[act]]
+        self.tick += 1
+        playing = np.flatnonzero(self.state == STATE_PLAYING)
+        paused = np.flatnonzero(self.state == STATE_PAUSED)
+        if paused.size:
+            self.pause_timer[paused] -= 1
+            self.state[paused[self.pause_timer[paused] <= 0]] = STATE_PLAYING
+        if playing.size:
+            self.update_pacman(playing)
+            self.handle_pellet_eating(playing)
+            self.update_ghosts(playing)
+            self.handle_fruit_events(playing)
+            self.check_collisions(playing)
+            cleared = playing[self.pellet_count[playing] <= 0]
+            if cleared.size: self.start_new_round(cleared)
+
+    @property
+    def done(self): return self.state == STATE_GAME_OVER
+
+    def wall_at(self, pos):
+        # Level.is_wall_at 과 같이 맵 밖은 벽이 아닌 것으로 본다.
+        x, y = pos[:, 0], pos[:, 1]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        return inside & self.walls[np.where(inside, y * self.width + x, 0)]
+
+    def tile_index(self, tile):
+        return np.clip(tile[:, 1], 0, self.height - 1) * self.width + np.clip(tile[:, 0], 0, self.width - 1)
+
+    def move(self, tile, offset, carry, d, speed):
+        # Entity.update: 타일 중앙에서 벽이면 멈추고 carry 를 이번 이동에 더한다. 다음 타일 중앙에 닿으면 그 타일로 옮기고
+        # 넘친 거리를 carry 로 남기며, 좌우 맵 밖 타일은 반대편 끝으로 래핑한다. (carry 는 중앙에서만 0 이 아니다)
+        blocked = (offset == 0).all(1) & self.wall_at(tile + d)
+        d[blocked] = 0
+        offset += d * (speed + carry)[:, None]
+        carry[:] = 0
+        along = (offset * d).sum(1) - np.where(d[:, 0] != 0, TILE_SUBPIXELS[0], TILE_SUBPIXELS[1]) # 다음 중앙을 지나친 거리
+        arrived = np.flatnonzero(along >= 0)
+        if arrived.size:
+            carry[arrived] = along[arrived]
+            tile[arrived] += d[arrived]
+            offset[arrived] = 0
+            x = tile[arrived, 0]
+            tile[arrived, 0] = np.where(x < 0, self.width - 1, np.where(x >= self.width, 0, x))
+
+    def fixed_pos(self, tile, offset):
+        return (tile * TILE_SIZE + TILE_HALF) * pacman.SUBPIXELS + offset
+
+    def update_pacman(self, g):
+        tile, offset, carry, d, buffered = self.pacman_tile[g], self.pacman_offset[g], self.pacman_carry[g], self.pacman_dir[g], self.pacman_buffered[g]
+        turn = (offset == 0).all(1) & ~self.wall_at(tile + buffered)
+        d[turn] = buffered[turn]
+        self.move(tile, offset, carry, d, np.full(len(g), pacman.fixed_speed(pacman.PACMAN_SPEED)))
+        self.pacman_tile[g], self.pacman_offset[g], self.pacman_carry[g], self.pacman_dir[g] = tile, offset, carry, d
+        bonus = g[~self.bonus_life_awarded[g] & (self.score[g] >= 1500)]
+        self.lives[bonus] += 1
+        self.bonus_life_awarded[bonus] = True
+
+    def handle_pellet_eating(self, g):
+        index = self.tile_index(self.pacman_tile[g])
+        value = self.map[g, index]
+        eaten = (value == 2) | (value == 3)
+        if not eaten.any(): return
+        self.score[g] += np.where(value == 2, 10, np.where(value == 3, 50, 0))
+        g, index, value = g[eaten], index[eaten], value[eaten]
+        self.map[g, index] = 0
+        self.pellet_count[g] -= 1
+        power = g[value == 3]
+        if power.size:
+            self.ghost_immune[power] = False
+            self.frighten_ghosts(power)
+            self.ghost_eaten_score[power] = 200
+        pellets_eaten = self.total_pellets - self.pellet_count[g]
+        level = self.fruit_spawn_level[g]
+        first, second = (level == 0) & (pellets_eaten >= 10), (level == 1) & (pellets_eaten >= 70)
+        spawn = g[first | second]
+        self.fruit_active[spawn], self.fruit_spawn_time[spawn] = True, self.tick[spawn]
+        self.fruit_spawn_level[g[first]], self.fruit_spawn_level[g[second]] = 1, 2
+
+    def frighten_ghosts(self, g):
+        self.frightened_timer[g] = 7 * 60
+        state, speed = self.ghost_state[g], self.ghost_speed[g]
+        scared = state != GHOST_STATE_EATEN
+        state[scared], speed[scared] = GHOST_STATE_FRIGHTENED, pacman.fixed_speed(pacman.GHOST_FRIGHTENED_SPEED)
+        self.ghost_state[g], self.ghost_speed[g] = state, speed
+
+    def update_ghosts(self, g):
+        state, speed, base = self.ghost_state[g], self.ghost_speed[g], self.ghost_base_speed[g]
+        tile, offset, carry, direction = self.ghost_tile[g], self.ghost_offset[g], self.ghost_carry[g], self.ghost_dir[g]
+        timer, immune, mode = self.ghost_in_house_timer[g], self.ghost_immune[g], self.ghost_mode[g]
+
+        in_house = state == GHOST_STATE_IN_HOUSE
+        timer[in_house] += 1
+        state[in_house & (timer >= GHOST_EXIT_TICKS)] = GHOST_STATE_EXITING
+        at_exit = (state == GHOST_STATE_EXITING) & (tile == self.house_exit).all(2)
+        scared = at_exit & (self.frightened_timer[g] > 0)[:, None] & ~immune
+        calm = at_exit & ~scared
+        state[scared], speed[scared] = GHOST_STATE_FRIGHTENED, pacman.fixed_speed(pacman.GHOST_FRIGHTENED_SPEED)
+        state[calm], speed[calm] = np.broadcast_to(mode[:, None], state.shape)[calm], base[calm]
+
+        frightened = self.frightened_timer[g]
+        active = frightened > 0
+        frightened[active] -= 1
+        ended = active & (frightened == 0)
+        calmed = ended[:, None] & (state == GHOST_STATE_FRIGHTENED)
+        state[calmed], speed[calmed] = np.broadcast_to(mode[:, None], state.shape)[calmed], base[calmed]
+        self.frightened_timer[g] = frightened
+
+        sc_timer, wave = self.scatter_chase_timer[g], self.current_wave[g]
+        sc_timer[~active] += 1
+        wave_index = np.minimum(wave, len(WAVE_SCATTER) - 1)
+        switch = ~active & (wave < len(WAVE_SCATTER)) & (((mode == GHOST_STATE_SCATTER) & (sc_timer >= WAVE_SCATTER[wave_index])) |
+                                                         ((mode == GHOST_STATE_CHASE) & (sc_timer >= WAVE_CHASE[wave_index])))
+        mode[switch] = np.where(mode[switch] == GHOST_STATE_SCATTER, GHOST_STATE_CHASE, GHOST_STATE_SCATTER)
+        sc_timer[switch] = 0
+        wave[switch & (mode == GHOST_STATE_SCATTER)] += 1
+        self.scatter_chase_timer[g], self.current_wave[g], self.ghost_mode[g] = sc_timer, wave, mode
+
+        normal = (state == GHOST_STATE_CHASE) | (state == GHOST_STATE_SCATTER)
+        state[normal] = np.broadcast_to(mode[:, None], state.shape)[normal]
+
+        # 고스트는 순서대로 움직인다 (Inky 는 이번 틱에 움직인 Blinky 의 위치를 본다).
+        for k in range(GHOST_COUNT):
+            self.update_ghost(k, g, state[:, k], speed[:, k], base[:, k], tile[:, k], offset[:, k], carry[:, k], direction[:, k], tile[:, 0])
+        self.ghost_state[g], self.ghost_speed[g], self.ghost_in_house_timer[g] = state, speed, timer
+        self.ghost_tile[g], self.ghost_offset[g], self.ghost_carry[g], self.ghost_dir[g] = tile, offset, carry, direction
+
+    def update_ghost(self, k, g, state, speed, base, tile, offset, carry, d, blinky_tile):
+        if k == 0 and self.total_pellets > 0: # Blinky: 먹은 펠릿 비율만큼 rage_speed 쪽으로 빨라진다 (Blinky.rage_speed_for 와 같은 정수 연산)
+            raging = (state != GHOST_STATE_FRIGHTENED) & (state != GHOST_STATE_EATEN)
+            eaten = self.total_pellets - self.pellet_count[g]
+            speed[raging] = (base + (self.rage_speed[g] - base) * eaten // self.total_pellets)[raging]
+        elif k == 0:
+            raging = (state != GHOST_STATE_FRIGHTENED) & (state != GHOST_STATE_EATEN)
+            speed[raging] = base[raging]
+
+        home = (state == GHOST_STATE_EATEN) & (tile == self.ghost_start[k]).all(1)
+        state[home], speed[home] = GHOST_STATE_IN_HOUSE, base[home]
+
+        at_center = (offset == 0).all(1)
+        if at_center.any():
+            index = self.tile_index(tile)
+            exits = self.exits[index]
+            # 되돌아가는 방향(DIRECTION_BITS)은 다른 길이 있으면 제외
+            reverse = (d[:, 1] > 0) * 1 + (d[:, 1] < 0) * 2 + (d[:, 0] > 0) * 4 + (d[:, 0] < 0) * 8
+            exits = np.where(POPCOUNT[exits] > 1, exits & ~reverse, exits)
+
+            scared = np.flatnonzero(at_center & (state == GHOST_STATE_FRIGHTENED))
+            for j in scared.tolist():
+                valid = pacman.DIRECTIONS_BY_MASK[exits[j]]
+                if valid:
+                    choice = self.rngs[g[j]].choice(valid)
+                    d[j] = (choice.x, choice.y)
+
+            eaten = at_center & (state == GHOST_STATE_EATEN)
+            d[eaten] = DIRECTION_VECTORS[self.home_codes[k][index[eaten]]]
+            exiting = at_center & (state == GHOST_STATE_EXITING)
+            d[exiting] = DIRECTION_VECTORS[self.exit_codes[index[exiting]]]
+            d[at_center & (state == GHOST_STATE_IN_HOUSE)] = 0
+
+            hunting = at_center & ((state == GHOST_STATE_CHASE) | (state == GHOST_STATE_SCATTER)) & (exits != 0)
+            if hunting.any():
+                target = np.where((state == GHOST_STATE_SCATTER)[:, None], self.scatter_targets[k], self.chase_target(k, g, tile, blinky_tile))
+                delta = (tile - target)[:, None, :] + PRIORITY_VECTORS
+                distance = np.where((exits[:, None] & PRIORITY_BITS) != 0, (delta * delta).sum(2), FAR)
+                # argmin 은 첫 최솟값을 고르므로 PRIORITY_ORDER 의 동점 처리와 같다.
+                d[hunting] = PRIORITY_VECTORS[distance.argmin(1)][hunting]
+
+        self.move(tile, offset, carry, d, speed)
+
+    def chase_target(self, k, g, tile, blinky_tile):
+        pacman_tile, pacman_dir = self.pacman_tile[g], self.pacman_dir[g]
+        if k == 1: # Pinky: 4칸 앞 (위쪽일 때는 원작처럼 왼쪽 위)
+            return np.where((pacman_dir[:, 1] < 0)[:, None], pacman_tile - 4, pacman_tile + pacman_dir * 4)
+        if k == 2: # Inky: 2칸 앞 지점을 기준으로 Blinky 의 반대편
+            pivot = pacman_tile + pacman_dir * 2
+            return pivot * 2 - blinky_tile
+        if k == 3: # Clyde: 8칸보다 멀면 추적, 가까우면 산개 목표
+            offset = tile - pacman_tile
+            return np.where(((offset * offset).sum(1) > 64)[:, None], pacman_tile, self.scatter_targets[3])
+        return pacman_tile
+
+    def handle_fruit_events(self, g):
+        active = self.fruit_active[g]
+        if not active.any(): return
+        expired = active & (self.tick[g] - self.fruit_spawn_time[g] > pacman.FRUIT_DURATION_TICKS)
+        eaten = active & ~expired & (self.pacman_tile[g] == self.fruit_tile).all(1)
+        self.score[g[eaten]] += 100
+        self.fruit_active[g[expired | eaten]] = False
+
+    def check_collisions(self, g):
+        died = np.zeros(len(g), dtype=bool)
+        pacman_pos = self.fixed_pos(self.pacman_tile[g], self.pacman_offset[g])
+        for k in range(GHOST_COUNT):
+            offset = pacman_pos - self.fixed_pos(self.ghost_tile[g, k], self.ghost_offset[g, k])
+            close = (offset * offset).sum(1) < pacman.COLLISION_DISTANCE_FIXED_SQ
+            if not close.any(): continue
+            state = self.ghost_state[g, k]
+            eaten = g[close & (state == GHOST_STATE_FRIGHTENED)]
+            self.ghost_immune[eaten, k] = True
+            self.ghost_state[eaten, k], self.ghost_speed[eaten, k] = GHOST_STATE_EATEN, pacman.fixed_speed(pacman.GHOST_EATEN_SPEED)
+            self.score[eaten] += self.ghost_eaten_score[eaten]
+            self.ghost_eaten_score[eaten] *= 2
+            died |= close & (state != GHOST_STATE_FRIGHTENED) & (state != GHOST_STATE_EATEN) & (state != GHOST_STATE_IN_HOUSE)
+        dead = g[died]
+        if not dead.size: return
+        self.deaths[dead] += 1
+        self.lives[dead] -= 1
+        alive, over = dead[self.lives[dead] > 0], dead[self.lives[dead] <= 0]
+        self.reset_entities(alive)
+        self.state[alive], self.pause_timer[alive] = STATE_PAUSED, 60
+        self.lives[over], self.state[over] = 0, STATE_GAME_OVER
+
+    def start_new_round(self, g):
+        self.round_level[g] += 1
+        self.increase_difficulty(g)
+        self.map[g], self.pellet_count[g] = self.tiles, self.total_pellets
+        self.reset_entities(g)
+        self.fruit_active[g], self.fruit_spawn_level[g] = False, 0
+        self.state[g], self.pause_timer[g] = STATE_PAUSED, 120
+
+    # --- 스칼라 엔진과의 대조 ---
+    def game_fields(self, i):
+        fields = {'tick': int(self.tick[i]), 'state': int(self.state[i]), 'pause_timer': int(self.pause_timer[i]),
+                  'round': int(self.round_level[i]), 'deaths': int(self.deaths[i]), 'score': int(self.score[i]),
+                  'lives': int(self.lives[i]), 'pellets': int(self.pellet_count[i]), 'map': self.map[i].tobytes(),
+                  'pacman': tuple(self.pacman_tile[i]) + tuple(self.pacman_offset[i]) + (self.pacman_carry[i],) + tuple(self.pacman_dir[i]) + tuple(self.pacman_buffered[i]),
+                  'timers': (int(self.frightened_timer[i]), int(self.scatter_chase_timer[i]), int(self.current_wave[i]), int(self.ghost_mode[i]), int(self.ghost_eaten_score[i])),
+                  'fruit': (bool(self.fruit_active[i]), int(self.fruit_spawn_level[i]))}
+        for k in range(GHOST_COUNT):
+            fields[f'ghost{k}'] = tuple(self.ghost_tile[i, k]) + tuple(self.ghost_offset[i, k]) + (self.ghost_carry[i, k],) + tuple(self.ghost_dir[i, k]) + \
+                                  (int(self.ghost_state[i, k]), int(self.ghost_speed[i, k]), bool(self.ghost_immune[i, k]), int(self.ghost_in_house_timer[i, k]))
+        return {name: tuple(int(v) if isinstance(v, np.integer) else v for v in value) if isinstance(value, tuple) else value for name, value in fields.items()}
+
+
+def engine_fields(engine):
+    p = engine.pacman
+    fields = {'tick': engine.tick, 'state': engine.state, 'pause_timer': engine.pause_timer, 'round': engine.round_level,
+              'deaths': engine.deaths, 'score': p.score, 'lives': p.lives, 'pellets': engine.level.pellet_count, 'map': bytes(engine.level.map),
+              'pacman': (p.tile_pos.x, p.tile_pos.y, p.offset.x, p.offset.y, p.carry, p.direction.x, p.direction.y, p.buffered_direction.x, p.buffered_direction.y),
+              'timers': (engine.frightened_timer, engine.scatter_chase_timer, engine.current_wave, engine.ghost_mode, engine.ghost_eaten_score),
+              'fruit': (engine.fruit.is_active, engine.fruit_spawn_level)}
+    for k, ghost in enumerate(engine.ghosts):
+        fields[f'ghost{k}'] = (ghost.tile_pos.x, ghost.tile_pos.y, ghost.offset.x, ghost.offset.y, ghost.carry, ghost.direction.x, ghost.direction.y,
+                               ghost.state, ghost.speed, ghost.is_immune, ghost.in_house_timer)
+    return fields
+
+
+def check_conformance(games=16, ticks=5000, seed=0, policy=None, min_round=2):
+    # 같은 시드의 스칼라 엔진 N 개와 배치 엔진을 같은 입력으로 돌리며 매 틱 모든 상태를 비교한다.
+    # policy(engine) -> ACTION_* 는 스칼라 엔진을 보고 입력을 고른다. 기본은 라운드를 깨는 autopilot 이라
+    # 라운드 전환과 뒤 라운드의 난이도까지 대조된다. 어느 판도 min_round 에 닿지 못하면 검사가 부족한 것으로 보고 실패한다.
+    seeds = [seed + i for i in range(games)]
+    batch = BatchEngine(games, seeds)
+    engines = [pacman.GameEngine(seed=s) for s in seeds]
+    if policy is None:
+        import autopilot
+        policy = autopilot.make_policy(seed)
+    for t in range(ticks):
+        actions = [policy(engine) for engine in engines]
+        for engine, action in zip(engines, actions):
+            engine.apply_action(action)
+            engine.update()
+        batch.step(actions)
+        for i, engine in enumerate(engines):
+            expected, actual = engine_fields(engine), batch.game_fields(i)
+            diff = [name for name in expected if expected[name] != actual[name]]
+            if diff:
+                detail = ', '.join(f"{name}: {expected[name]!r} != {actual[name]!r}" for name in diff if name != 'map')
+                raise AssertionError(f"game {i} (seed {seeds[i]}) diverged at tick {engine.tick}: {detail or 'map'}")
+    result = {'games': games, 'ticks': ticks, 'game_over': int(batch.done.sum()), 'max_round': int(batch.round_level.max()), 'deaths': int(batch.deaths.sum())}
+    if result['max_round'] < min_round: raise AssertionError(f"no game reached round {min_round} in {ticks} ticks, round transitions were not compared: {result}")
+    return result
+
+
+def bench(games=1024, ticks=1000, seed=0):
+    engine = BatchEngine(games, range(seed, seed + games))
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, 5, size=(ticks, games))
+    start = time.perf_counter()
+    for t in range(ticks): engine.step(actions[t])
+    return games * ticks / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Batched NumPy pacman engine.")
+    parser.add_argument('--check', action='store_true', help="compare against the scalar GameEngine tick by tick")
+    parser.add_argument('--games', type=int, default=None)
+    parser.add_argument('--ticks', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.check:
+        result = check_conformance(args.games or 16, args.ticks or 5000, args.seed)
+        print(f"OK: {result}")
+    else:
+        games, ticks = args.games or 1024, args.ticks or 1000
+        print(f"{games} games x {ticks} ticks: {bench(games, ticks, args.seed):.0f} game-ticks/s")
+    sys.exit()
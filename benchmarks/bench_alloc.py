@@ -0,0 +1,59 @@
+# 엔티티 1틱당 Vector2 할당 수와 GC 발생 횟수를 재는 마이크로 벤치마크
+# 사용법: python benchmarks/bench_alloc.py [틱 수]
+#
+# 시드와 입력이 고정이라 같은 틱 수면 매번 같은 판이 나온다. BEFORE 는 Vector2 를 슬롯/불변 방향 상수로 바꾸기 직전
+# 트리(6f3f787^)에서 같은 입력과 시드(그때는 random.seed)로 run() 과 같은 루프를 돌려 잰 값이며, 출력에 그 값과의 차이를 붙인다.
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pacman
+
+SCRIPT = [pacman.ACTION_LEFT, pacman.ACTION_UP, pacman.ACTION_RIGHT, pacman.ACTION_DOWN]
+SEED = 20240601
+BEFORE = {2000: (99615, 9.9615), 10000: (511651, 10.23302), 20000: (1031228, 10.31228)} # 틱 수: (Vector2 할당 수, 엔티티-틱당)
+
+
+def run(ticks, seed=SEED):
+    engine = pacman.GameEngine(seed=seed)
+    counter = [0]
+    original_init = pacman.Vector2.__init__
+
+    def counting_init(self, x=0, y=0):
+        counter[0] += 1
+        original_init(self, x, y)
+
+    pacman.Vector2.__init__ = counting_init
+    entity_ticks, collections_before = 0, sum(s['collections'] for s in gc.get_stats())
+    start = time.perf_counter()
+    try:
+        for t in range(ticks):
+            engine.step(SCRIPT[(t // 40) % len(SCRIPT)])
+            entity_ticks += 1 + len(engine.ghosts)
+            if engine.state == pacman.STATE_GAME_OVER: engine.init_game(seed)
+    finally:
+        pacman.Vector2.__init__ = original_init
+    elapsed = time.perf_counter() - start
+    collections = sum(s['collections'] for s in gc.get_stats()) - collections_before
+    result = {
+        'ticks': ticks,
+        'vector2_allocs': counter[0],
+        'allocs_per_entity_tick': counter[0] / entity_ticks,
+        'gc_collections': collections,
+        'ticks_per_sec': ticks / elapsed,
+    }
+    if ticks in BEFORE and seed == SEED:
+        before_allocs, before_per_tick = BEFORE[ticks]
+        result['before_vector2_allocs'], result['before_allocs_per_entity_tick'] = before_allocs, before_per_tick
+        result['allocs_change'] = counter[0] / before_allocs - 1
+    return result
+
+
+if __name__ == '__main__':
+    result = run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
+    for key, value in result.items():
+        if key == 'allocs_change': print(f"{key:>29}: {value:+.2%}")
+        elif isinstance(value, float): print(f"{key:>29}: {value:.4f}" if key.endswith('per_entity_tick') else f"{key:>29}: {value:.2f}")
+        else: print(f"{key:>29}: {value}")
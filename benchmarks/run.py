@@ -0,0 +1,333 @@
+# pacman.py 성능 벤치마크 모음
+# 결과를 JSON 으로 내보내고, 저장된 기준값(baseline)과 비교해 회귀가 있으면 종료 코드 1을 돌려준다.
+#
+#   python benchmarks/run.py                        # 전체 실행, 결과 출력
+#   python benchmarks/run.py --output out.json      # 결과 저장
+#   python benchmarks/run.py --save-baseline        # benchmarks/baseline.json 갱신
+#   python benchmarks/run.py --baseline benchmarks/baseline.json --runs 9
+#
+# 항목마다 --runs 번 재서 중앙값을 값으로 쓰고, 그 흩어진 정도(spread: 중앙값 대비 MAD 기반 표준편차)를 함께 저장한다.
+# 회귀 판정 기준은 항목별로 기준값과 이번 측정의 spread 를 합친 표준편차의 NOISE_SIGMAS 배이고, --threshold 는 그 하한이다.
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import Future
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pygame
+import pacman
+import bench_alloc
+import levelfile
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+SEED = 20240601
+DEFAULT_RUNS = 5
+NOISE_SIGMAS = 4 # 이만큼의 표준편차 안쪽 변화는 잡음으로 본다
+MAD_TO_STDEV = 1.4826
+SCRIPT = [pacman.ACTION_LEFT, pacman.ACTION_UP, pacman.ACTION_RIGHT, pacman.ACTION_DOWN]
+
+
+class NullSpriteLoader:
+    # PokeAPI 대신 쓰는 스텁: 요청은 즉시 '이미지 없음'으로 끝난다.
+    def fetch(self, name):
+        future = Future()
+        future.set_result(None)
+        return future
+
+
+def scripted_action(tick):
+    return SCRIPT[(tick // 40) % len(SCRIPT)]
+
+
+def make_maze(width, height, seed=1):
+    # 기존 LEVEL_DATA 형식의 합성 미로: 바깥 벽 + 격자 기둥 + 무작위 벽, 나머지는 펠릿.
+    rng = random.Random(seed)
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            border = x in (0, width - 1) or y in (0, height - 1)
+            pillar = x % 2 == 0 and y % 2 == 0
+            row.append(100 if border or pillar or (x % 2 != y % 2 and rng.random() < 0.2) else 2)
+        rows.append(row)
+    cx, cy = width // 2 | 1, height // 2 | 1
+    rows[cy][cx], rows[cy + 2][cx] = 10, 1
+    rows[cy + 3][cx] = 11
+    rows[cy + 3][cx + 1 if cx + 1 < width - 1 else cx - 1] = 12
+    rows[cy + 3][cx - 1] = 13
+    rows[height - 2][1] = 4
+    return '\n'.join(' '.join(str(tile) for tile in row) for row in rows)
+
+
+def bench_sim_ticks(quick):
+    ticks = 5000 if quick else 30000
+    engine = pacman.GameEngine(seed=SEED)
+    start = time.perf_counter()
+    for t in range(ticks):
+        engine.step(scripted_action(t))
+        if engine.state == pacman.STATE_GAME_OVER: engine.init_game(SEED)
+    return ticks / (time.perf_counter() - start)
+
+
+def bench_many_ghosts(quick):
+    # 101x101 미로에 고스트 200 마리를 더 풀어 둔 게임의 틱 속도 (충돌 검사는 TileIndex 로 주변 타일만 본다)
+    ticks, rng = 500 if quick else 3000, random.Random(SEED)
+    template = pacman.LevelTemplate(make_maze(101, 101))
+    engine = pacman.GameEngine(seed=SEED)
+    engine.level_template = template
+    engine.init_game(SEED)
+    level = engine.level
+    open_tiles = [pacman.Vector2(x, y) for y in range(level.height) for x in range(level.width) if not level.is_wall_at(x, y)]
+    for k in range(200):
+        ghost = (pacman.Pinky, pacman.Inky, pacman.Clyde)[k % 3](level, rng.choice(open_tiles))
+        ghost.state, ghost.direction = pacman.GHOST_STATE_SCATTER, rng.choice(pacman.DIRECTIONS)
+        engine.add_ghost(ghost)
+    engine.pacman.lives = ticks # 게임 오버로 끝나지 않게
+    start = time.perf_counter()
+    for t in range(ticks): engine.step(scripted_action(t))
+    return ticks / (time.perf_counter() - start)
+
+
+def bench_fast_forward(quick):
+    # sim_ticks_per_sec 와 같은 입력을 팩맨이 타일 중앙에 있을 때만 주고, 그 사이는 fast_forward() 로 건너뛴다.
+    ticks = 5000 if quick else 30000
+    engine, done = pacman.GameEngine(seed=SEED), 0
+    start = time.perf_counter()
+    while done < ticks:
+        engine.apply_action(scripted_action(engine.tick))
+        done += engine.fast_forward(ticks - done)
+        if engine.state == pacman.STATE_GAME_OVER: engine.init_game(SEED)
+    return ticks / (time.perf_counter() - start)
+
+
+def bfs_latency(level, pairs, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for a, b in pairs: pacman.find_shortest_path_bfs(a, b, level)
+        samples.append((time.perf_counter() - start) / len(pairs))
+    return statistics.median(samples) * 1e6
+
+
+def far_pairs(level, count, seed=3):
+    rng = random.Random(seed)
+    open_tiles = [pacman.Vector2(i % level.width, i // level.width) for i, wall in enumerate(level.walls) if not wall]
+    return [(rng.choice(open_tiles), rng.choice(open_tiles)) for _ in range(count)]
+
+
+def bench_bfs_stock(quick):
+    level = pacman.Level()
+    return bfs_latency(level, far_pairs(level, 50), 3 if quick else 10)
+
+
+def bench_bfs_large(quick):
+    level = pacman.Level(make_maze(101, 101))
+    return bfs_latency(level, far_pairs(level, 5 if quick else 20), 3)
+
+
+def bench_level_load(quick):
+    # 1000x1000 미로 파일을 이진 캐시에서 읽어 템플릿과 Level 을 만드는 시간 (첫 파싱은 재지 않는다)
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path, cache_dir = os.path.join(tmp, 'stress.txt'), os.path.join(tmp, 'cache')
+        with open(path, 'w') as f: f.write(make_maze(1000, 1000))
+        levelfile.load_level_file(path, cache_dir)
+        samples = []
+        for _ in range(3 if quick else 10):
+            start = time.perf_counter()
+            pacman.Level(template=pacman.LevelTemplate.from_file(path, cache_dir))
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def bench_nav_lookup(quick):
+    level = pacman.Level()
+    pairs = far_pairs(level, 1000)
+    for a, b in pairs: level.nav.field(b)
+    repeat = 5 if quick else 50
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for a, b in pairs: level.nav.next_direction(a, b)
+    return (time.perf_counter() - start) / (repeat * len(pairs)) * 1e6
+
+
+def stub_pokeapi():
+    pacman.get_sprite_loader = lambda: NullSpriteLoader()
+
+
+def bench_draw_frame(quick):
+    stub_pokeapi()
+    game = pacman.GameController(seed=SEED)
+    frames = 300 if quick else 2000
+    samples = []
+    for t in range(frames):
+        game.step(scripted_action(t))
+        if game.state == pacman.STATE_GAME_OVER: game.init_game(SEED)
+        start = time.perf_counter()
+        game.draw()
+        samples.append(time.perf_counter() - start)
+    return statistics.mean(samples) * 1000
+
+
+COLD_START_SCRIPT = '''
+import sys, time
+sys.path.insert(0, sys.argv[1])
+import run, pacman
+run.stub_pokeapi()
+start = time.perf_counter()
+pacman.GameController(seed=run.SEED)
+print((time.perf_counter() - start) * 1000)
+'''
+
+def bench_cold_start(quick):
+    # 이미지 디코딩/아틀라스 캐시가 없는 새 프로세스에서 GameController() 생성 시간을 잰다.
+    samples = []
+    for _ in range(1 if quick else 5):
+        output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, BENCH_DIR], capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def bench_init_game(quick):
+    stub_pokeapi()
+    game = pacman.GameController(seed=SEED)
+    repeat = 20 if quick else 200
+    start = time.perf_counter()
+    for _ in range(repeat): game.init_game(SEED)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_allocs(quick):
+    return bench_alloc.run(2000 if quick else 10000)['allocs_per_entity_tick']
+
+
+def bench_clones(quick):
+    # 탐색 에이전트가 쓰는 방식: 스냅샷 하나에서 몇 틱 굴려 보고 되돌리기를 반복한다.
+    engine = pacman.GameEngine(seed=SEED)
+    for t in range(600): engine.step(scripted_action(t))
+    repeat = 2000 if quick else 20000
+    start = time.perf_counter()
+    for i in range(repeat):
+        snapshot = engine.snapshot()
+        engine.restore(snapshot)
+    return repeat / (time.perf_counter() - start)
+
+
+def bench_batch(quick):
+    import batch
+    return batch.bench(1024, 100 if quick else 500, SEED)
+
+
+# 이름: (함수, 단위, 클수록 좋은지)
+CASES = {
+    'sim_ticks_per_sec': (bench_sim_ticks, 'ticks/s', True),
+    'fast_forward_ticks_per_sec': (bench_fast_forward, 'ticks/s', True),
+    'sim_200_ghosts_ticks_per_sec': (bench_many_ghosts, 'ticks/s', True),
+    'bfs_stock_us': (bench_bfs_stock, 'us/query', False),
+    'bfs_large_101x101_us': (bench_bfs_large, 'us/query', False),
+    'nav_lookup_us': (bench_nav_lookup, 'us/query', False),
+    'level_load_1000x1000_ms': (bench_level_load, 'ms', False),
+    'draw_frame_ms': (bench_draw_frame, 'ms/frame', False),
+    'cold_start_ms': (bench_cold_start, 'ms', False),
+    'init_game_ms': (bench_init_game, 'ms', False),
+    'vector2_allocs_per_entity_tick': (bench_allocs, 'allocs', False),
+    'clones_per_sec': (bench_clones, 'clones/s', True),
+}
+try:
+    import numpy
+    CASES['batch_1024_game_ticks_per_sec'] = (bench_batch, 'game-ticks/s', True)
+except ImportError: # numpy 는 선택 의존성 (pip install .[batch])
+    pass
+
+
+def spread(samples):
+    # 중앙값 대비 상대 표준편차 (MAD 로 추정하므로 튀는 한두 번에 휘둘리지 않는다)
+    median = statistics.median(samples)
+    if len(samples) < 2 or not median: return 0.0
+    return MAD_TO_STDEV * statistics.median(abs(x - median) for x in samples) / abs(median)
+
+
+def run_cases(names, quick, runs=DEFAULT_RUNS):
+    # 기기 상태가 천천히 바뀌는 영향이 한 항목에 몰리지 않도록 항목들을 번갈아 돌린다.
+    samples = {name: [] for name in names}
+    for _ in range(runs):
+        for name in names: samples[name].append(CASES[name][0](quick))
+    results = {}
+    for name in names:
+        func, unit, higher_is_better = CASES[name]
+        value = statistics.median(samples[name])
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better,
+                         'samples': samples[name], 'spread': spread(samples[name])}
+        print(f"{name:>32}: {value:12.3f} {unit:<14} ±{results[name]['spread']:.1%}", file=sys.stderr)
+    pygame.quit()
+    return results
+
+
+def compare(results, baseline, threshold):
+    # 기준값 대비 그 항목의 잡음 폭(최소 threshold)보다 더 나빠진 항목을 돌려준다.
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base['value']: continue
+        change = (result['value'] - base['value']) / base['value']
+        worse = -change if result['higher_is_better'] else change
+        allowed = max(threshold, NOISE_SIGMAS * math.hypot(result['spread'], base.get('spread', 0.0))) # 두 측정 모두의 잡음
+        result['baseline'], result['change'], result['allowed'] = base['value'], change, allowed
+        if worse > allowed: regressions.append((name, base['value'], result['value'], change, allowed))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run pacman benchmarks.")
+    parser.add_argument('cases', nargs='*', help=f"subset of: {', '.join(CASES)}")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations (smoke run)")
+    parser.add_argument('--output', help="write JSON results to this file (default: stdout)")
+    parser.add_argument('--baseline', default=None, help="baseline JSON to compare against")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help=f"measure every case this many times and use the median (default {DEFAULT_RUNS})")
+    parser.add_argument('--threshold', type=float, default=0.05, help="minimum allowed slowdown ratio; noisy cases get a wider one (default 0.05)")
+    parser.add_argument('--save-baseline', action='store_true', help=f"write results to {DEFAULT_BASELINE}")
+    args = parser.parse_args(argv)
+
+    names = args.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown: parser.error(f"unknown cases: {', '.join(unknown)}")
+    if args.runs < 1: parser.error("--runs must be at least 1")
+
+    report = {
+        'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                 'pygame': pygame.version.ver, 'platform': platform.platform(), 'quick': args.quick, 'runs': args.runs},
+        'results': run_cases(names, args.quick, args.runs),
+    }
+
+    regressions = []
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) and not args.save_baseline else None)
+    if baseline_path:
+        with open(baseline_path) as f: baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.threshold)
+        report['regressions'] = [name for name, *_ in regressions]
+        for name, base, value, change, allowed in regressions:
+            print(f"REGRESSION {name}: {base:.3f} -> {value:.3f} ({change:+.1%}, allowed {allowed:.1%})", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w') as f: f.write(text + '\n')
+    if args.output:
+        with open(args.output, 'w') as f: f.write(text + '\n')
+    elif not args.save_baseline:
+        print(text)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
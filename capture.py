@@ -0,0 +1,234 @@
+# 화면 캡처: 그린 프레임을 배경 스레드가 raw 파일, PNG 시퀀스, 또는 인코더 프로세스(ffmpeg 등)의 stdin 으로 내보낸다.
+# 프레임마다 새 메모리를 잡지 않는다. 화면과 같은 형식의 Surface 를 pool 개 미리 만들어 두고, 캡처는 빈 Surface 에
+# 화면을 blit(복사 한 번)해서 큐에 넣는 것이 전부다. 쓰기 스레드는 그 Surface 의 버퍼를 그대로(get_view) 내보낸 뒤
+# 빈 목록에 돌려준다. 빈 Surface 가 없으면(쓰기가 밀리면) 게임 루프를 멈추지 않고 그 프레임을 버리고 dropped 를 센다.
+# drop=False 면 기다린다 (오프라인 내보내기처럼 모든 프레임이 필요할 때).
+#
+#   python capture.py out.raw --seed 1 --autopilot --ticks 3600     # 창 없이(SDL dummy) 실시간보다 빨리 렌더링
+#   python capture.py frames/ --replay game.pmr                      # 디렉터리면 PNG 시퀀스
+#   python capture.py out.mp4 --replay game.pmr --pipe "ffmpeg -y -loglevel error -f rawvideo -pix_fmt {pix_fmt} -s {width}x{height} -r {fps} -i - {output}"
+import json
+import os
+import queue
+import shlex
+import struct
+import subprocess
+import threading
+import time
+import zlib
+
+import pacman
+import replay
+
+CAPTURE_POOL = 8 # 쓰기 스레드를 기다리는 프레임 최대 수 (60fps 에서 약 0.13초)
+PNG_COMPRESSION = 1
+CHANNEL_NAMES = 'rgba'
+
+
+def pixel_format(surface):
+    # 화면 버퍼의 바이트 순서를 ffmpeg 의 -pix_fmt 이름으로 (예: 'bgr0'). raw 출력과 파이프가 쓴다.
+    size = surface.get_bytesize()
+    if size not in (3, 4): raise ValueError(f"unsupported {surface.get_bitsize()}-bit surface")
+    order = ''
+    for i in range(size):
+        byte_mask = 0xFF << (8 * i)
+        order += next((name for name, mask in zip(CHANNEL_NAMES, surface.get_masks()) if mask == byte_mask), '0')
+    return order + '24' if size == 3 else order
+
+
+def frame_bytes(surface):
+    # 줄 끝에 패딩이 없으면 복사 없이 Surface 버퍼를 그대로 돌려준다
+    view = surface.get_view('0')
+    width, height = surface.get_size()
+    row, pitch = width * surface.get_bytesize(), surface.get_pitch()
+    if row == pitch: return view
+    raw = view.raw
+    return b''.join(raw[y * pitch:y * pitch + row] for y in range(height))
+
+
+def png_chunk(kind, data): return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def encode_png(surface):
+    # 필터 없는 8비트 RGB PNG. pygame.image.save 보다 몇 배 빠르고 쓰기 스레드에서 GIL 을 오래 잡지 않는다 (zlib 이 놓는다).
+    width, height = surface.get_size()
+    rgb, stride = pacman.pygame.image.tobytes(surface, 'RGB'), width * 3
+    raw = b''.join(b'\0' + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + png_chunk(b'IDAT', zlib.compress(raw, PNG_COMPRESSION)) + png_chunk(b'IEND', b''))
+
+
+class RawSink:
+    # 프레임 버퍼를 이어 붙인 파일 하나. 크기/형식은 옆의 .json 에 남긴다.
+    def __init__(self, path): self.path, self.file = path, None
+
+    def open(self, width, height, pix_fmt, fps):
+        self.file = open(self.path, 'wb')
+        with open(self.path + '.json', 'w') as f: json.dump({'width': width, 'height': height, 'pix_fmt': pix_fmt, 'fps': fps}, f)
+
+    def write(self, index, surface): self.file.write(frame_bytes(surface))
+
+    def close(self):
+        if self.file: self.file.close()
+
+
+class PngSink:
+    def __init__(self, directory, pattern='frame-{:06d}.png'): self.directory, self.pattern = directory, pattern
+
+    def open(self, width, height, pix_fmt, fps): os.makedirs(self.directory, exist_ok=True)
+
+    def write(self, index, surface):
+        with open(os.path.join(self.directory, self.pattern.format(index)), 'wb') as f: f.write(encode_png(surface))
+
+    def close(self): pass
+
+
+class PipeSink:
+    # 프레임 버퍼를 명령의 stdin 으로 흘려 보낸다. 명령의 {width} {height} {pix_fmt} {fps} {output} 를 채운다.
+    def __init__(self, command, output=''): self.command, self.output, self.process = command, output, None
+
+    def open(self, width, height, pix_fmt, fps):
+        args = [arg.format(width=width, height=height, pix_fmt=pix_fmt, fps=fps, output=self.output) for arg in shlex.split(self.command)]
+        self.process = subprocess.Popen(args, stdin=subprocess.PIPE)
+
+    def write(self, index, surface): self.process.stdin.write(frame_bytes(surface))
+
+    def close(self):
+        if self.process is None: return
+        try: self.process.stdin.close()
+        except OSError: pass
+        self.process.wait()
+
+
+def open_sink(path, pipe=None):
+    # pipe 명령이 있으면 파이프, 경로가 디렉터리(또는 / 로 끝남)면 PNG 시퀀스, 아니면 raw 파일
+    if pipe: return PipeSink(pipe, path)
+    if path.endswith(('/', os.sep)) or os.path.isdir(path): return PngSink(path)
+    return RawSink(path)
+
+
+class FrameCapture:
+    def __init__(self, sink, pool=CAPTURE_POOL, drop=True, fps=pacman.DISPLAY_FPS):
+        self.sink, self.pool_size, self.drop, self.fps = sink, pool, drop, fps
+        self.free, self.frames = queue.Queue(), queue.Queue()
+        self.captured = self.written = self.dropped = 0
+        self.error, self.thread, self.size = None, None, None
+        self.game, self.installed = None, None
+
+    def start(self, surface):
+        # 첫 프레임에서 화면 크기와 형식을 보고 풀과 출력을 준비한다
+        self.size = surface.get_size()
+        self.sink.open(*self.size, pixel_format(surface), self.fps)
+        for _ in range(self.pool_size): self.free.put(pacman.pygame.Surface(self.size, 0, surface))
+        self.thread = threading.Thread(target=self.write_loop, name='frame-capture', daemon=True)
+        self.thread.start()
+
+    def capture(self, surface):
+        # -> 프레임을 큐에 넣었으면 True. 쓰기가 밀려 빈 버퍼가 없으면 (drop=True 일 때) 버리고 False.
+        if self.thread is None: self.start(surface)
+        try: frame = self.free.get(block=not self.drop)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        frame.blit(surface, (0, 0))
+        self.frames.put((self.captured, frame))
+        self.captured += 1
+        return True
+
+    def write_loop(self):
+        while True:
+            item = self.frames.get()
+            if item is None: break
+            index, frame = item
+            if self.error is None: # 출력이 한 번 실패하면 나머지는 버린다 (게임은 계속된다)
+                try:
+                    self.sink.write(index, frame)
+                    self.written += 1
+                except (OSError, ValueError) as e:
+                    self.error = e
+                    print(f"Warning: Frame capture stopped. Error: {e}")
+            self.free.put(frame)
+
+    def close(self):
+        if self.thread is not None:
+            self.frames.put(None)
+            self.thread.join()
+            self.thread = None
+            self.sink.close()
+        if self.game is not None: self.detach()
+        return self.stats()
+
+    def stats(self): return {'captured': self.captured, 'written': self.written, 'dropped': self.dropped}
+
+    def attach(self, game):
+        # present() 뒤에 화면을 캡처한다. 붙이지 않았을 때는 게임 코드에 추가 비용이 없다.
+        self.game = game
+        present = game.present
+        def present_and_capture(full_redraw, rects):
+            present(full_redraw, rects)
+            if self.game is not None: self.capture(game.screen) # 떼어 냈는데 다른 모듈이 위에 감싸 두어 남아 있으면 넘기기만 한다
+        present_and_capture.__wrapped__ = present
+        self.installed = (game.__dict__.get('present'), present_and_capture)
+        game.present = present_and_capture
+        game.capture = self
+        return self
+
+    def detach(self):
+        # 감싼 뒤 아무도 그 위를 덮지 않았을 때만 감싸기 전 값으로 되돌린다 (profiler 등 다른 모듈의 감싸기는 건드리지 않는다)
+        game = self.game
+        previous, wrapper = self.installed
+        if game.__dict__.get('present') is wrapper:
+            if previous is None: del game.present
+            else: game.present = previous
+        game.capture, self.game = None, None
+
+
+def render(game, sink, ticks=None, log=None, autopilot=False, pool=CAPTURE_POOL, drop=False):
+    # 화면 대기 없이 틱마다 한 프레임씩 그려 내보낸다 (영상은 sim_hz fps). log 가 있으면 그 입력을 재생한다.
+    capture = FrameCapture(sink, pool, drop, fps=game.sim_hz).attach(game)
+    if autopilot: game.toggle_autopilot()
+    inputs, i = (log.inputs if log else []), 0
+    end = log.end_tick if log else ticks
+    if log and ticks is not None: end = min(end, ticks)
+    start = time.perf_counter()
+    try:
+        while game.state != pacman.STATE_GAME_OVER and (end is None or game.tick < end):
+            pacman.pygame.event.pump()
+            while i < len(inputs) and inputs[i][0] == game.tick:
+                game.pacman.set_direction(pacman.ACTION_DIRECTIONS[inputs[i][1]]); i += 1
+            if game.autopilot is not None: game.apply_action(game.autopilot(game))
+            game.update()
+            game.draw()
+    finally:
+        stats = capture.close()
+    stats['seconds'] = time.perf_counter() - start
+    stats['ticks'] = game.tick
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+    from inputlog import InputLog
+    parser = argparse.ArgumentParser(description="Render a pacman game or replay to raw frames, a PNG sequence, or an encoder pipe.")
+    parser.add_argument('output', help="raw file, directory for PNGs, or {output} for --pipe")
+    parser.add_argument('--replay', metavar='LOG', default=None, help="input log to render (default: a fresh game)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--level', metavar='FILE', default=None)
+    parser.add_argument('--autopilot', action='store_true', help="let the built-in AI play a fresh game")
+    parser.add_argument('--ticks', type=int, default=None, help="stop after this many ticks")
+    parser.add_argument('--pipe', metavar='CMD', default=None, help="encoder command reading raw frames on stdin")
+    parser.add_argument('--drop', action='store_true', help="drop frames instead of waiting when the writer falls behind")
+    parser.add_argument('--window', action='store_true', help="show the window while rendering (default: headless)")
+    args = parser.parse_args()
+    if not args.window: os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    if args.replay is None and args.ticks is None and not args.autopilot: parser.error("a fresh game needs --ticks or --autopilot to end")
+    log = InputLog.load(args.replay) if args.replay else None
+    try:
+        game = pacman.GameController(seed=log.seed if log else args.seed, fps=0, level=replay.level_path(log, args.level) if log else args.level)
+        if log: replay.check_level(log, game)
+    except (OSError, ValueError) as e: parser.error(f"cannot render {args.replay or args.level}: {e}")
+    stats = render(game, open_sink(args.output, args.pipe), args.ticks, log, args.autopilot and log is None, drop=args.drop)
+    seconds = stats['seconds']
+    print(f"rendered {stats['ticks']} ticks in {seconds:.2f} s ({stats['ticks'] / game.sim_hz / max(seconds, 1e-9):.1f}x real time): "
+          f"{stats['written']} frames written, {stats['dropped']} dropped")
+    pacman.pygame.quit()
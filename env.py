@@ -0,0 +1,90 @@
+# 강화학습용 gym 스타일 환경: reset() -> (obs, info), step(action) -> (obs, reward, terminated, truncated, info)
+# 관측은 미리 할당한 uint8 텐서 (채널, 높이, 너비) 하나를 매 스텝 제자리에서 갱신해 돌려준다.
+# 같은 배열이 다음 step() 에서 덮어써지므로, 보관하려면 호출하는 쪽에서 복사해야 한다.
+#
+#   env = PacmanEnv(seed=1)                         # 헤드리스 (GameEngine)
+#   env = PacmanEnv(seed=1, render_mode='rgb_array') # 창(GameController) + 픽셀 관측 env.render()
+import numpy as np
+
+import pacman
+
+CHANNELS = ('walls', 'pellets', 'power_pellets', 'pacman', 'blinky', 'pinky', 'inky', 'clyde', 'frightened')
+CH_WALLS, CH_PELLETS, CH_POWER_PELLETS, CH_PACMAN, CH_GHOSTS, CH_FRIGHTENED = 0, 1, 2, 3, 4, 8
+MAX_GHOSTS = CH_FRIGHTENED - CH_GHOSTS # 고스트마다 채널 하나. 관측 모양을 고정하려고 더 늘리지 않는다.
+ACTION_COUNT = 5 # ACTION_NONE .. ACTION_RIGHT
+
+
+class PacmanEnv:
+    def __init__(self, seed=None, render_mode=None, frame_skip=1, max_ticks=None):
+        if render_mode not in (None, 'rgb_array'): raise ValueError(f"unsupported render_mode: {render_mode!r}")
+        self.render_mode, self.frame_skip, self.max_ticks = render_mode, frame_skip, max_ticks
+        self.game = pacman.GameController(seed) if render_mode else pacman.GameEngine(seed)
+        level = self.game.level
+        self.observation = np.zeros((len(CHANNELS), level.height, level.width), dtype=np.uint8)
+        self.observation_shape, self.action_count = self.observation.shape, ACTION_COUNT
+        self.level = self.map_source = self.map_view = None
+        self.pixels = None
+        self.info = {}
+        self.last_score = 0
+        self.refresh()
+
+    def reset(self, seed=None):
+        self.game.init_game(seed)
+        self.last_score = 0
+        self.refresh()
+        return self.observation, self.info
+
+    def step(self, action):
+        game = self.game
+        game.apply_action(action)
+        for _ in range(self.frame_skip):
+            game.update()
+            if game.state == pacman.STATE_GAME_OVER: break
+        score = game.pacman.score
+        reward, self.last_score = score - self.last_score, score
+        terminated = game.state == pacman.STATE_GAME_OVER
+        truncated = not terminated and self.max_ticks is not None and game.tick >= self.max_ticks
+        self.refresh()
+        return self.observation, reward, terminated, truncated, self.info
+
+    def refresh(self):
+        self.update_observation()
+        if self.render_mode: self.render_frame()
+        game, info = self.game, self.info
+        info['tick'], info['lives'], info['round'], info['deaths'], info['seed'] = game.tick, game.pacman.lives, game.round_level, game.deaths, game.seed
+
+    def bind_level(self):
+        # Level.map(bytearray) 를 복사 없이 (높이, 너비) 배열로 본다. 레벨이 바뀔 때만 다시 묶는다.
+        level = self.level = self.game.level
+        self.map_source = level.map
+        self.map_view = np.frombuffer(level.map, dtype=np.uint8).reshape(level.height, level.width)
+        self.observation[CH_WALLS] = np.frombuffer(level.walls, dtype=np.uint8).reshape(level.height, level.width)
+
+    def update_observation(self):
+        game, obs = self.game, self.observation
+        if game.level is not self.level or game.level.map is not self.map_source: self.bind_level()
+        np.equal(self.map_view, 2, out=obs[CH_PELLETS], casting='unsafe')
+        np.equal(self.map_view, 3, out=obs[CH_POWER_PELLETS], casting='unsafe')
+        if len(game.ghosts) > MAX_GHOSTS: raise ValueError(f"PacmanEnv observes at most {MAX_GHOSTS} ghosts, the game has {len(game.ghosts)}")
+        obs[CH_PACMAN:].fill(0)
+        self.mark(CH_PACMAN, game.pacman.tile_pos)
+        for k, ghost in enumerate(game.ghosts):
+            self.mark(CH_GHOSTS + k, ghost.tile_pos)
+            if ghost.state == pacman.GHOST_STATE_FRIGHTENED: self.mark(CH_FRIGHTENED, ghost.tile_pos)
+
+    def mark(self, channel, pos):
+        if 0 <= pos.y < self.level.height and 0 <= pos.x < self.level.width: self.observation[channel, pos.y, pos.x] = 1
+
+    def render_frame(self):
+        # surfarray 뷰가 살아 있는 동안은 화면 surface 가 잠기므로, 그리기 전에 놓았다가 그린 뒤 다시 잡는다.
+        self.pixels = None
+        self.game.draw()
+        self.pixels = pacman.pygame.surfarray.pixels3d(self.game.screen)
+
+    def render(self):
+        # (너비, 높이, 3) uint8 뷰 - 화면 surface 의 픽셀을 복사 없이 가리킨다. 다음 step() 까지만 유효하다.
+        return self.pixels
+
+    def close(self):
+        self.pixels = None
+        if self.render_mode: pacman.pygame.quit()
@@ -0,0 +1,75 @@
+import os
+import struct
+
+# 입력 기록 파일 형식 (리틀 엔디언)
+#   헤더: 매직 b'PMRC', 버전(u8), 시드(u32), 체크섬 간격(u16), 미로 체크섬(u32, LevelTemplate.checksum),
+#         미로 파일 경로 길이(u16) + 경로 바이트 (기본 맵이면 길이 0)
+#   레코드: 종류(u8) + 틱(u32) + 내용
+#     RECORD_INPUT    액션(u8)     - 해당 틱의 update() 직전에 적용된 방향 입력
+#     RECORD_CHECKSUM crc32(u32)  - 해당 틱의 update() 직후 상태 체크섬
+#     RECORD_END      (없음)       - 기록이 끝난 틱
+MAGIC, VERSION = b'PMRC', 3 # 2: 고정소수점 이동 (버전 1 기록은 재생이 어긋난다), 3: 미로 체크섬과 경로
+HEADER = struct.Struct('<4sBIH')
+LEVEL_HEADER = struct.Struct('<IH') # 버전 3 부터 HEADER 뒤에 붙는다. 버전 2 기록은 미로를 모른다 (level_crc None).
+RECORD = struct.Struct('<BI')
+RECORD_INPUT, RECORD_CHECKSUM, RECORD_END = 0, 1, 2
+CHECKSUM_INTERVAL = 60
+
+
+class ReplayDesyncError(Exception):
+    def __init__(self, tick, expected, actual):
+        super().__init__(f"replay diverged at tick {tick}: expected checksum {expected:08x}, got {actual:08x}")
+        self.tick, self.expected, self.actual = tick, expected, actual
+
+
+class InputLog:
+    # 한 판의 시드와 미로, 방향 입력(틱 번호 기준), 주기적인 상태 체크섬을 담는다.
+    def __init__(self, seed, checksum_interval=CHECKSUM_INTERVAL, level_path='', level_crc=None):
+        self.seed, self.checksum_interval = seed, checksum_interval
+        self.level_path, self.level_crc = level_path, level_crc
+        self.inputs, self.checksums, self.end_tick = [], {}, 0
+
+    def record_input(self, tick, action): self.inputs.append((tick, action))
+    def record_checksum(self, tick, checksum): self.checksums[tick] = checksum
+
+    def to_bytes(self):
+        records = [(tick, RECORD_INPUT, struct.pack('<B', action)) for tick, action in self.inputs]
+        records += [(tick, RECORD_CHECKSUM, struct.pack('<I', crc)) for tick, crc in self.checksums.items()]
+        records.sort(key=lambda r: (r[0], r[1]))
+        path = os.fsencode(self.level_path)
+        chunks = [HEADER.pack(MAGIC, VERSION, self.seed, self.checksum_interval), LEVEL_HEADER.pack(self.level_crc or 0, len(path)), path]
+        for tick, kind, payload in records:
+            chunks.append(RECORD.pack(kind, tick))
+            chunks.append(payload)
+        chunks.append(RECORD.pack(RECORD_END, self.end_tick))
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, interval = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version not in (2, VERSION): raise ValueError("not a pacman input log")
+        log = cls(seed, interval)
+        offset = HEADER.size
+        if version >= 3:
+            log.level_crc, length = LEVEL_HEADER.unpack_from(data, offset)
+            offset += LEVEL_HEADER.size
+            log.level_path = os.fsdecode(data[offset:offset + length])
+            offset += length
+        while offset < len(data):
+            kind, tick = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if kind == RECORD_INPUT:
+                log.inputs.append((tick, data[offset])); offset += 1
+            elif kind == RECORD_CHECKSUM:
+                log.checksums[tick] = struct.unpack_from('<I', data, offset)[0]; offset += 4
+            elif kind == RECORD_END:
+                log.end_tick = tick
+            else: raise ValueError(f"unknown record type {kind}")
+        return log
+
+    def save(self, path):
+        with open(path, 'wb') as f: f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f: return cls.from_bytes(f.read())
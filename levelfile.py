@@ -0,0 +1,88 @@
+import os
+import struct
+import zlib
+
+# 미로 파일: LEVEL_DATA 와 같은 형식의 텍스트 (한 줄이 한 행, 타일 코드는 공백으로 구분). 크기 제한은 없다.
+# 텍스트 파싱은 큰 미로에서 느리므로, 처음 읽을 때 파싱 결과를 이진 캐시로 남겨 두고 다음부터는 그것을 읽는다.
+# 캐시 파일 형식 (리틀 엔디언)
+#   헤더: 매직 b'PMLV', 버전(u8), 원본 crc32(u32), 원본 크기(u32), 너비(u32), 높이(u32)
+#   본문: zlib 으로 압축한 타일 코드 바이트 (width * height, 가로 한 줄씩)
+# 캐시 파일 이름이 원본 내용(crc32, 크기)에서 나오므로 원본을 고치면 자연히 새 캐시를 만든다.
+MAGIC, VERSION = b'PMLV', 1
+HEADER = struct.Struct('<4sBIIII')
+LEVEL_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'pacman', 'levels')
+
+
+REQUIRED_CODES = {4: 'Pac-Man start', 1: 'ghost house door', 10: 'Blinky start', 11: 'Pinky start', 12: 'Inky start', 13: 'Clyde start'}
+
+
+class LevelFormatError(ValueError):
+    pass
+
+
+def check_tiles(tiles):
+    # 엔진이 위치를 꼭 알아야 하는 타일(시작 자리, 고스트 집 문)이 없으면 게임을 만들 때가 아니라 읽을 때 알린다
+    for code, name in REQUIRED_CODES.items():
+        if code not in tiles: raise LevelFormatError(f"missing tile code {code} ({name})")
+
+
+def parse_level_text(text):
+    # -> (너비, 높이, 타일 바이트)
+    lines = [line for line in (line.strip() for line in text.strip().splitlines()) if line]
+    if not lines: raise LevelFormatError("empty level")
+    width, height = len(lines[0].split()), len(lines)
+    try:
+        tiles = bytes(map(int, text.split()))
+    except ValueError as e:
+        raise LevelFormatError(f"bad tile code: {e}") from None
+    if len(tiles) != width * height or any(len(line.split()) != width for line in lines):
+        raise LevelFormatError(f"rows must all be {width} tiles wide")
+    check_tiles(tiles)
+    return width, height, tiles
+
+
+def cache_path(crc, size, cache_dir=LEVEL_CACHE_DIR):
+    return os.path.join(cache_dir, f'{crc:08x}-{size}.lvl')
+
+
+def read_cache(path, crc, size):
+    try:
+        with open(path, 'rb') as f: data = f.read()
+        magic, version, cached_crc, cached_size, width, height = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or (cached_crc, cached_size) != (crc, size): return None
+        tiles = zlib.decompress(data[HEADER.size:])
+        return (width, height, tiles) if len(tiles) == width * height else None
+    except (OSError, struct.error, zlib.error):
+        return None
+
+
+def write_cache(path, crc, size, width, height, tiles):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, crc, size, width, height))
+            f.write(zlib.compress(tiles, 1))
+        os.replace(tmp, path) # 여러 프로세스가 같은 미로를 읽어도 반쯤 쓴 파일을 보지 않는다
+    except OSError as e:
+        print(f"Warning: Could not write level cache {path}. Error: {e}")
+
+
+def load_level_file(path, cache_dir=LEVEL_CACHE_DIR):
+    # -> (너비, 높이, 타일 바이트). cache_dir=None 이면 캐시를 쓰지 않는다.
+    with open(path, 'rb') as f: source = f.read()
+    crc, size = zlib.crc32(source), len(source)
+    cached = cache_path(crc, size, cache_dir) if cache_dir else None
+    level = read_cache(cached, crc, size) if cached else None
+    if level is None:
+        level = parse_level_text(source.decode('ascii'))
+        if cached: write_cache(cached, crc, size, *level)
+    else:
+        check_tiles(level[2]) # 검사를 넣기 전에 만든 캐시일 수 있다
+    return level
+
+
+def write_level_file(path, width, height, tiles):
+    with open(path, 'w') as f:
+        for y in range(height):
+            f.write(' '.join(map(str, tiles[y * width:(y + 1) * width])) + '\n')
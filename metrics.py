@@ -0,0 +1,154 @@
+# 무인 운영(키오스크)용 지표: 프레임 시간 히스토그램, 놓친 프레임 마감, 판/라운드/죽음/고스트/과일 수, PokeAPI 요청 시간과 실패 수.
+# 로컬 HTTP 엔드포인트에서 Prometheus 텍스트 형식으로 내보낸다 (배경 스레드).
+#
+#   python pacman.py --metrics 9108          # http://127.0.0.1:9108/metrics
+#
+# 게임 쪽 수치(죽음, 라운드, 고스트/과일)는 엔진이 이미 판마다 세고 있으므로 틱마다 하는 일은 없다.
+# 새 판을 시작할 때(init_game) 끝난 판의 값을 누적에 더하고, 읽을 때 진행 중인 판의 값을 더해 보여 준다.
+# 프레임마다 하는 일은 draw() 뒤의 시간 측정과 히스토그램 칸 하나를 올리는 것뿐이다. 값은 쓰는 스레드가 하나뿐이라
+# 잠금 없이 더하고, 읽는 쪽(HTTP 스레드)은 GIL 아래에서 그대로 읽는다 (칸 사이가 한 프레임 어긋날 수는 있다).
+# 여러 스레드가 쓰는 PokeAPI 지표만 잠금을 쓴다 (드문 일이다).
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pacman
+
+FRAME_BUCKETS = (0.004, 0.008, 0.0125, 0.0167, 0.02, 0.025, 0.0333, 0.05, 0.1, 0.25, 1.0) # 초
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # 마지막 칸은 +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, help_text):
+        counts = list(self.counts)
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        total = 0
+        for bound, n in zip((*self.buckets, '+Inf'), counts):
+            total += n
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+        lines += [f'{name}_sum {self.sum}', f'{name}_count {total}']
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.frame_time = Histogram(FRAME_BUCKETS)
+        self.missed_deadlines = 0
+        self.last_frame = None
+        # 끝난 판들의 누적 (진행 중인 판은 읽을 때 더한다)
+        self.games = 0
+        self.totals = {'rounds': 0, 'deaths': 0, 'ghosts_eaten': 0, 'fruits_eaten': 0}
+        self.fetch_time = Histogram(FETCH_BUCKETS)
+        self.fetch_failures = 0
+        self.fetch_lock = threading.Lock()
+        self.game, self.server = None, None
+
+    @staticmethod
+    def game_counts(game):
+        return {'rounds': game.round_level - 1, 'deaths': game.deaths, 'ghosts_eaten': game.ghosts_eaten, 'fruits_eaten': game.fruits_eaten}
+
+    def attach(self, game):
+        # profiler 처럼 인스턴스 단위로 감싼다. 붙이지 않았을 때는 게임 코드에 추가 비용이 없다.
+        self.game = game
+        self.games += 1
+        init_game = game.init_game
+        def init_and_count(*args, **kwargs):
+            for key, value in self.game_counts(game).items(): self.totals[key] += value
+            self.games += 1
+            self.last_frame = None # 게임 오버 화면에 머문 시간은 프레임 시간이 아니다
+            return init_game(*args, **kwargs)
+        init_and_count.__wrapped__ = init_game
+        game.init_game = init_and_count
+        clock = getattr(game, 'clock', None) # 화면이 없는 GameEngine 은 게임 수치만 센다
+        if clock is not None:
+            draw = game.draw
+            budget = 1.0 / game.fps if game.fps else None
+            def draw_and_time(alpha=1.0):
+                draw(alpha)
+                now = time.perf_counter()
+                # 이번 프레임의 일(입력, update() 들, draw())에 쓴 시간: run() 이 clock.tick() 에서 돌아온 시각부터 지금까지.
+                # run() 밖에서 그린 프레임(frame_start 가 지난 draw 보다 앞)은 재지 않는다.
+                start = game.frame_start
+                if budget is not None and start is not None and (self.last_frame is None or start >= self.last_frame) and now - start > budget:
+                    self.missed_deadlines += 1
+                if self.last_frame is not None: self.frame_time.observe(now - self.last_frame)
+                self.last_frame = now
+            draw_and_time.__wrapped__ = draw
+            game.draw = draw_and_time
+        return self
+
+    def instrument_loader(self, loader):
+        # PokeAPI 다운로드(캐시에 없을 때)의 시간과 실패를 잰다. 게임을 만들기 전에 붙여야 첫 요청부터 잡힌다.
+        download = loader.download
+        def timed_download(name):
+            start = time.perf_counter()
+            data = download(name)
+            elapsed = time.perf_counter() - start
+            with self.fetch_lock:
+                self.fetch_time.observe(elapsed)
+                if data is None: self.fetch_failures += 1
+            return data
+        timed_download.__wrapped__ = download
+        loader.download = timed_download
+        return self
+
+    def render(self):
+        lines = []
+        def metric(name, help_text, value, kind='counter'): lines.extend((f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}'))
+        game = self.game
+        current = self.game_counts(game) if game is not None else dict.fromkeys(self.totals, 0)
+        lines += self.frame_time.lines('pacman_frame_seconds', "Time between drawn frames while playing.")
+        metric('pacman_frame_deadline_missed_total', "Frames whose update and draw work exceeded 1/fps.", self.missed_deadlines)
+        metric('pacman_skipped_ticks_total', "Simulation ticks dropped because the frame loop fell behind.", getattr(game, 'skipped_ticks', 0))
+        metric('pacman_games_total', "Games started.", self.games)
+        metric('pacman_rounds_total', "Rounds cleared (start_new_round).", self.totals['rounds'] + current['rounds'])
+        metric('pacman_deaths_total', "Lives lost to ghosts.", self.totals['deaths'] + current['deaths'])
+        metric('pacman_ghosts_eaten_total', "Frightened ghosts eaten.", self.totals['ghosts_eaten'] + current['ghosts_eaten'])
+        metric('pacman_fruits_eaten_total', "Fruits taken.", self.totals['fruits_eaten'] + current['fruits_eaten'])
+        if game is not None:
+            metric('pacman_score', "Score of the current game.", game.pacman.score, 'gauge')
+            metric('pacman_round', "Round of the current game.", game.round_level, 'gauge')
+            metric('pacman_playing', "1 while a game is in progress, 0 on the game over screen.", int(game.state != pacman.STATE_GAME_OVER), 'gauge')
+        with self.fetch_lock:
+            lines += self.fetch_time.lines('pacman_pokeapi_fetch_seconds', "PokeAPI sprite download time (cache misses).")
+            metric('pacman_pokeapi_fetch_failures_total', "PokeAPI sprite downloads that failed.", self.fetch_failures)
+        metric('pacman_process_start_time_seconds', "Start time of the process since the epoch.", self.started, 'gauge')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        # 배경(daemon) 스레드에서 /metrics 를 제공한다. port=0 이면 빈 포트를 고른다 (self.server.server_address).
+        metrics = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, format, *args): pass # 스크레이프마다 stderr 에 찍지 않는다
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+        return self
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
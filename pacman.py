@@ -3,9 +3,15 @@ import random
 import os
 import io
 import sys # sys 모듈 추가 (Quit 기능에 사용)
-import requests
-from math import sqrt, cos, sin
+import time
+import struct
+import zlib
+from math import sqrt, cos, sin, floor, ceil
 from collections import deque
+from pokeapi import get_sprite_loader
+from inputlog import InputLog
+import levelfile
+from profiler import Profiler
 
 # 이 스크립트 파일(pacman.py)의 실제 위치를 찾습니다.
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -24,6 +30,9 @@ BUTTON_COLOR, BUTTON_TEXT_COLOR, BUTTON_HOVER_COLOR = (0, 100, 200), (255, 255,
 # 게임 상태
 STATE_PLAYING, STATE_GAME_OVER, STATE_WIN, STATE_PAUSED = 1, 2, 3, 4
 
+# 입력 액션 (headless step() 및 키보드 입력 공용)
+ACTION_NONE, ACTION_UP, ACTION_DOWN, ACTION_LEFT, ACTION_RIGHT = 0, 1, 2, 3, 4
+
 # 고스트 상태
 GHOST_STATE_CHASE, GHOST_STATE_SCATTER, GHOST_STATE_FRIGHTENED, GHOST_STATE_EATEN, GHOST_STATE_IN_HOUSE, GHOST_STATE_EXITING = 1, 2, 3, 4, 5, 6
 
@@ -34,6 +43,23 @@ GHOST_FRIGHTENED_SPEED = 1.2
 GHOST_EATEN_SPEED = 4.0
 CRUISE_ELROY_PELLET_COUNT = 20
 BLINKY_RAGE_SPEED = 2.1
+GHOST_SPEED_STEP, BLINKY_RAGE_SPEED_STEP = 0.15, 0.2 # 라운드마다 오르는 속도
+MAX_GHOST_SPEED_BONUS, MAX_RAGE_SPEED_BONUS = 0.8, 1.1 # 팩맨 속도 대비 상한
+FRUIT_DURATION_TICKS = 10 * 60 # 과일 유지 시간 (틱 단위, 60틱 = 1초)
+GHOST_HOUSE_TICKS = (1, 4*60, 8*60, 12*60) # 고스트별(id 순) 집에서 나오기까지의 틱
+SCATTER_CHASE_WAVES = ((7*60, 20*60), (7*60, 20*60), (5*60, 20*60), (float('inf'), 5*60)) # (산개, 추적) 시간
+COLLISION_DISTANCE = TILE_WIDTH * 0.75
+COLLISION_DISTANCE_SQ = COLLISION_DISTANCE ** 2
+# 이동은 고정소수점: 1 픽셀 = SUBPIXELS 서브픽셀. 위 속도(픽셀/틱)는 fixed_speed() 로 서브픽셀/틱 정수가 된다.
+SUBPIXEL_BITS = 8
+SUBPIXELS = 1 << SUBPIXEL_BITS
+TILE_SUBPIXELS_X, TILE_SUBPIXELS_Y = TILE_WIDTH * SUBPIXELS, TILE_HEIGHT * SUBPIXELS
+COLLISION_DISTANCE_FIXED_SQ = round(COLLISION_DISTANCE * SUBPIXELS) ** 2
+
+# 게임 루프: 시뮬레이션은 고정 틱(모든 타이머/속도는 틱 단위), 화면은 디스플레이 속도로 보간해서 그린다.
+SIM_HZ = 60
+DISPLAY_FPS = 60 # 0 이면 제한 없음
+MAX_STEPS_PER_FRAME = 5 # 한 프레임에 따라잡는 최대 틱 수. 넘치면 게임이 느려지는 쪽을 택한다.
 
 LEVEL_DATA = '''
 107 100 100 100 100 100 100 100 100 133 100 100 100 100 100 100 100 100 108
@@ -61,34 +87,23 @@ LEVEL_DATA = '''
 '''
 
 
-def load_image_from_pokeapi(pokemon_name):
-    try:
-        api_url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-        response = requests.get(api_url)
-        response.raise_for_status()
-        
-        data = response.json()
-        image_url = data['sprites']['other']['official-artwork']['front_default']
-
-        if not image_url:
-            print(f"Warning: No official artwork found for '{pokemon_name}'.")
-            return None
-
-        image_response = requests.get(image_url)
-        image_response.raise_for_status()
-        image_data = image_response.content
-
-        image_file = io.BytesIO(image_data)
-        pygame_image = pygame.image.load(image_file).convert_alpha()
-        
-        print(f"Successfully loaded '{pokemon_name}' sprite from PokeAPI.")
-        return pygame_image
+FRUIT_POKEMON_NAMES = ['cherubi', 'bounsweet', 'applin']
+_fruit_surfaces = {} # 디코딩/스케일이 끝난 과일 이미지 (재시작 시 재사용)
 
-    except (requests.exceptions.RequestException, KeyError, IndexError, TypeError) as e:
-        print(f"Warning: Failed to load sprite for '{pokemon_name}' from PokeAPI. Error: {e}")
+def decode_sprite(pokemon_name, image_data):
+    if image_data is None: return None
+    try:
+        return pygame.image.load(io.BytesIO(image_data)).convert_alpha()
+    except pygame.error as e:
+        print(f"Warning: Failed to decode sprite for '{pokemon_name}'. Error: {e}")
         return None
 
+def load_image_from_pokeapi(pokemon_name):
+    # 동기 버전: 디스크 캐시를 먼저 보고, 없으면 타임아웃이 걸린 요청으로 받아 온다.
+    return decode_sprite(pokemon_name, get_sprite_loader().fetch(pokemon_name).result())
+
 class Vector2:
+    __slots__ = ('x', 'y')
     def __init__(self, x=0, y=0): self.x, self.y = int(x), int(y)
     def __add__(self, o): return Vector2(self.x + o.x, self.y + o.y)
     def __sub__(self, o): return Vector2(self.x - o.x, self.y - o.y)
@@ -97,137 +112,546 @@ class Vector2:
     def magnitude(self): return sqrt(self.x**2 + self.y**2)
     def __eq__(self, o): return self.x == o.x and self.y == o.y
     def __hash__(self): return hash((self.x, self.y))
+    # 매 틱 새 객체를 만들지 않도록 제자리(in-place)에서 값을 바꾸는 경로
+    def set(self, x, y): self.x, self.y = x, y
+
+class Direction(Vector2):
+    # 공유되는 방향 상수. 실수로 값을 바꾸면 모든 엔티티가 망가지므로 변경을 막는다.
+    __slots__ = ()
+    def __init__(self, x, y):
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+    def __setattr__(self, name, value): raise AttributeError("direction constants are immutable")
+
+UP, DOWN, LEFT, RIGHT, ZERO = Direction(0, -1), Direction(0, 1), Direction(-1, 0), Direction(1, 0), Direction(0, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT) # 유효 방향 탐색 순서
+DIRECTION_CODES = {(d.x, d.y): code for code, d in enumerate((*DIRECTIONS, ZERO))} # 직렬화용 방향 번호 (DIRECTIONS 순서, 정지는 4)
+PRIORITY_ORDER = (UP, LEFT, DOWN, RIGHT) # 원작의 동점 시 방향 우선순위
+HALF_TILE_WIDTH, HALF_TILE_HEIGHT = TILE_WIDTH // 2, TILE_HEIGHT // 2
+
+ACTION_DIRECTIONS = {ACTION_UP: UP, ACTION_DOWN: DOWN, ACTION_LEFT: LEFT, ACTION_RIGHT: RIGHT}
+KEY_ACTIONS = {pygame.K_UP: ACTION_UP, pygame.K_DOWN: ACTION_DOWN, pygame.K_LEFT: ACTION_LEFT, pygame.K_RIGHT: ACTION_RIGHT}
+
+class Assets:
+    # res/ 의 모든 이미지를 프로세스당 한 번만 디코딩하고, 필요한 크기/뒤집기/회전 변형을 미리 만들어
+    # 하나의 아틀라스 surface 에 모아 둔다. 엔티티들은 아틀라스의 subsurface 를 공유한다.
+    def __init__(self, res_dir=RES_DIR):
+        sources = {}
+        for file_name in sorted(os.listdir(res_dir)):
+            if not file_name.endswith('.png'): continue
+            try:
+                sources[file_name[:-4]] = pygame.image.load(os.path.join(res_dir, file_name)).convert_alpha()
+            except pygame.error as e:
+                print(f"Warning: Could not load {file_name}. Error: {e}")
+
+        variants = {}
+        for name, image in sources.items():
+            variants[name] = pygame.transform.scale(image, (TILE_WIDTH, TILE_HEIGHT))
+        for frame in ('pacman_1', 'pacman_2'):
+            if frame not in variants: continue
+            right = variants[frame + '_right'] = pygame.transform.flip(variants[frame], True, False)
+            variants[frame + '_up'] = pygame.transform.rotate(right, 90)
+            variants[frame + '_down'] = pygame.transform.rotate(right, -90)
+
+        self.names = list(variants)
+        self.atlas = pygame.Surface((TILE_WIDTH * max(len(variants), 1), TILE_HEIGHT), pygame.SRCALPHA).convert_alpha()
+        self.atlas.fill((0, 0, 0, 0))
+        self.images = {}
+        for i, (name, image) in enumerate(variants.items()):
+            self.atlas.blit(image, (i * TILE_WIDTH, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.images[name] = self.atlas.subsurface((i * TILE_WIDTH, 0, TILE_WIDTH, TILE_HEIGHT))
+
+        self.pacman_animations = None
+        if 'pacman_1' in self.images and 'pacman_2' in self.images:
+            self.pacman_animations = {d: [self.images['pacman_1' + suffix], self.images['pacman_2' + suffix]]
+                                      for d, suffix in ((LEFT, ''), (RIGHT, '_right'), (UP, '_up'), (DOWN, '_down'))}
+        else:
+            print("Warning: Could not load Pac-Man images. Using fallback.")
+        self.ghost_images = None
+        if all(name in self.images for name in ('frightened', 'frightened_flash', 'eyes')):
+            self.ghost_images = {name: self.images[name] for name in ('frightened', 'frightened_flash', 'eyes')}
+        else:
+            print("Warning: Could not load common ghost images. Game may not display correctly.")
+
+    def image(self, name):
+        image = self.images.get(name)
+        if image is None: print(f"Warning: Could not load {name}.png.")
+        return image
+
+    def memory_bytes(self):
+        return self.atlas.get_bytesize() * self.atlas.get_width() * self.atlas.get_height()
+
+_assets = None
+
+def get_assets():
+    # 디스플레이가 만들어진 뒤(convert_alpha 필요)에 호출해야 한다.
+    global _assets
+    if _assets is None: _assets = Assets()
+    return _assets
+
+def fixed_speed(speed): return round(speed * SUBPIXELS) # 픽셀/틱 -> 서브픽셀/틱 (기기와 무관하게 같은 값)
 
 def get_tile_center(tile_pos): return Vector2(tile_pos.x * TILE_WIDTH + TILE_WIDTH/2, tile_pos.y * TILE_HEIGHT + TILE_HEIGHT/2)
 
 def find_shortest_path_bfs(start_pos, end_pos, level):
-    queue = deque([([start_pos], start_pos)])
-    visited = {start_pos}
+    # 경로 리스트를 노드마다 복사하지 않고 부모 포인터로 역추적한다.
+    queue = deque([start_pos])
+    parent = {start_pos: None}
     while queue:
-        path, current_pos = queue.popleft()
-        if current_pos == end_pos: return path
-        for d in [Vector2(0,-1), Vector2(0,1), Vector2(-1,0), Vector2(1,0)]:
+        current_pos = queue.popleft()
+        if current_pos == end_pos:
+            path = []
+            while current_pos is not None:
+                path.append(current_pos)
+                current_pos = parent[current_pos]
+            path.reverse()
+            return path
+        for d in DIRECTIONS:
             next_pos = current_pos + d
-            if next_pos not in visited and not level.is_wall(next_pos):
-                visited.add(next_pos)
-                new_path = list(path)
-                new_path.append(next_pos)
-                queue.append((new_path, next_pos))
+            if next_pos not in parent and not level.is_wall(next_pos):
+                parent[next_pos] = current_pos
+                queue.append(next_pos)
     return None
 
+NAV_DIRECTIONS = DIRECTIONS
+NAV_NONE = 255
+
+class NavIndex:
+    # 목표 타일별 흐름장(flow field): 목표에서 거꾸로 BFS 를 돌려
+    # 모든 타일의 목표까지 거리와 다음 이동 방향을 표로 저장한다. 조회는 O(1).
+    # 좌우 끝의 터널은 Entity 의 화면 래핑과 같게 서로 이웃으로 취급한다.
+    # 큰 맵에서 한 번에 다 만들면 멈칫하므로, 조회한 타일의 값이 정해질 때까지만 BFS 를 진행하고 나머지는 큐에 남겨 둔다.
+    def __init__(self, open_tiles, width, height):
+        self.width, self.height = width, height
+        self.open = open_tiles
+        self.fields = {} # (x, y) -> [거리, 방향, 남은 BFS 큐]
+
+    def neighbor(self, index, d):
+        x, y = index % self.width + d.x, index // self.width + d.y
+        if not 0 <= y < self.height: return -1
+        x %= self.width
+        n = y * self.width + x
+        return n if self.open[n] else -1
+
+    def search(self, target):
+        key = (target.x, target.y)
+        search = self.fields.get(key)
+        if search is None:
+            size = self.width * self.height
+            dist, dirs, queue = [-1] * size, bytearray([NAV_NONE]) * size, deque()
+            start = target.y * self.width + target.x
+            if self.in_bounds(target) and self.open[start]:
+                dist[start] = 0
+                queue.append(start)
+            search = self.fields[key] = (dist, dirs, queue)
+        return search
+
+    def expand(self, search, index=-1):
+        # index 타일의 값이 정해질 때까지(-1 이면 끝까지) BFS 를 이어 간다. BFS 라 한 번 정해진 값은 바뀌지 않는다.
+        dist, dirs, queue = search
+        while queue and (index < 0 or dist[index] < 0):
+            current = queue.popleft()
+            for code, d in enumerate(NAV_DIRECTIONS):
+                # d 방향으로 한 칸 움직여 current 에 도착하는 이웃 타일
+                prev = self.neighbor(current, d * -1)
+                if prev >= 0 and dist[prev] < 0:
+                    dist[prev], dirs[prev] = dist[current] + 1, code
+                    queue.append(prev)
+
+    def field(self, target):
+        # 완성된 (거리, 방향) 표
+        search = self.search(target)
+        if search[2]: self.expand(search)
+        return search[0], search[1]
+
+    def in_bounds(self, pos): return 0 <= pos.x < self.width and 0 <= pos.y < self.height
+
+    def next_direction(self, pos, target):
+        if not self.in_bounds(pos): return ZERO
+        index = pos.y * self.width + pos.x
+        search = self.fields.get((target.x, target.y)) or self.search(target)
+        if search[2] and search[0][index] < 0: self.expand(search, index)
+        code = search[1][index]
+        return ZERO if code == NAV_NONE else NAV_DIRECTIONS[code]
+
+    def distance(self, pos, target):
+        if not self.in_bounds(pos): return -1
+        index = pos.y * self.width + pos.x
+        search = self.fields.get((target.x, target.y)) or self.search(target)
+        if search[2] and search[0][index] < 0: self.expand(search, index)
+        return search[0][index]
+
+
+DIRECTION_BITS = {d: 1 << i for i, d in enumerate(DIRECTIONS)}
+DIRECTIONS_BY_MASK = tuple(tuple(d for i, d in enumerate(DIRECTIONS) if mask & (1 << i)) for mask in range(16))
+
+def ghost_choices(mask, direction):
+    # 고스트가 타일 중앙에서 고를 수 있는 방향: 되돌아가는 방향은 다른 길이 있으면 뺀다. (탐색 순서, 우선순위 순서)
+    valid = [d for d in DIRECTIONS_BY_MASK[mask] if not (d.x == -direction.x and d.y == -direction.y)] or list(DIRECTIONS_BY_MASK[mask])
+    return tuple(valid), tuple(d for d in PRIORITY_ORDER if d in valid)
+GHOST_CHOICES = {(mask, d.x, d.y): ghost_choices(mask, d) for mask in range(16) for d in (*DIRECTIONS, ZERO)} # (출구 마스크, 방향 x, y) ->
+
+WALL_TABLE = bytes(1 if tile >= 100 else 0 for tile in range(256)) # 타일 코드 -> 벽(1)/길(0)
+OPEN_TABLE = bytes(0 if tile >= 100 else 1 for tile in range(256))
+NAV_PREBUILD_TILES = 4096 # 이보다 작은 맵은 고스트 집/출구까지의 흐름장을 템플릿을 만들 때 미리 다 만든다
+
+def compute_exit_table(open_tiles, width, height):
+    # 타일 하나를 한 바이트(0/1)로 둔 큰 정수 위에서 이웃 이동을 비트 시프트로 처리한다 (백만 타일도 수십 ms).
+    # 결과는 compute_exits() 를 모든 타일에 부른 것과 같다: 맵 밖은 열린 것으로 본다.
+    size, row = width * height, 8 * width
+    is_open = int.from_bytes(open_tiles, 'little')
+    full = int.from_bytes(b'\x01' * size, 'little')
+    first_row = int.from_bytes(b'\x01' * width, 'little')
+    first_col = int.from_bytes((b'\x01' + b'\x00' * (width - 1)) * height, 'little')
+    last_col = first_col << 8 * (width - 1)
+    up = (is_open << row | first_row) & full
+    down = is_open >> row | first_row << 8 * (size - width)
+    left = (is_open << 8 & full & ~first_col) | first_col
+    right = (is_open >> 8 & ~last_col) | last_col
+    return (up | down << 1 | left << 2 | right << 3).to_bytes(size, 'little')
+
+class LevelTemplate:
+    # 파싱이 끝난 맵 원본. 벽/출구 마스크/길찾기 표는 모든 Level 이 공유한다.
+    # 타일 코드: 0 빈 길, 1 고스트 집 문(그 위 칸이 출구), 2 펠릿, 3 파워 펠릿, 4 팩맨 시작, 5 과일 자리,
+    #            10~13 고스트 시작(블링키, 핑키, 잉키, 클라이드), 100 이상 벽. 크기 제한은 없다.
+    def __init__(self, map_data=None, size=None, tiles=None):
+        # map_data(문자열) 또는 size=(너비, 높이) 와 tiles(바이트) 로 만든다.
+        if map_data is not None: width, height, tiles = levelfile.parse_level_text(map_data)
+        else: width, height = size
+        self.width, self.height, self.tiles = width, height, bytes(tiles)
+        tiles = self.tiles
+        self.walls = tiles.translate(WALL_TABLE)
+        self.pellet_count = tiles.count(2) + tiles.count(3)
+        self.checksum = zlib.crc32(tiles, zlib.crc32(struct.pack('<II', width, height))) # 입력 기록이 어느 미로에서 나왔는지 확인하는 데 쓴다
+        # 같은 코드가 여러 번 나오면 마지막 것을 쓴다
+        self.pacman_start_pos = self.find_tile(4) or Vector2()
+        self.ghost_start_pos = {code - 10: pos for code in range(10, 14) if (pos := self.find_tile(code))}
+        door = self.find_tile(1)
+        self.ghost_house_exit = Vector2(door.x, door.y - 1) if door else Vector2()
+        self.fruit_pos = self.find_tile(5) or self.default_fruit_pos()
+        self._wall_tiles = None
+
+        # 타일마다 열린 방향(DIRECTIONS 순서의 4비트). 맵 밖은 기존 is_wall 과 같이 열린 것으로 본다.
+        open_tiles = tiles.translate(OPEN_TABLE)
+        self.exits = compute_exit_table(open_tiles, width, height)
+
+        self.nav = NavIndex(open_tiles, width, height)
+        if width * height <= NAV_PREBUILD_TILES:
+            for target in list(self.ghost_start_pos.values()) + [self.ghost_house_exit]:
+                self.nav.field(target)
+        self.wall_surface = None
+
+    @classmethod
+    def from_file(cls, path, cache_dir=levelfile.LEVEL_CACHE_DIR):
+        width, height, tiles = levelfile.load_level_file(path, cache_dir)
+        return cls(size=(width, height), tiles=tiles)
+
+    def find_tile(self, code):
+        i = self.tiles.rfind(code)
+        return Vector2(i % self.width, i // self.width) if i >= 0 else None
+
+    def default_fruit_pos(self):
+        # 과일 자리(5)가 없는 맵: 고스트 집 바로 아래, 출구 열에서 처음 만나는 길 (기본 맵에서는 (9, 12))
+        x = self.ghost_house_exit.x
+        y = max((pos.y for pos in self.ghost_start_pos.values()), default=self.ghost_house_exit.y) + 1
+        while y < self.height:
+            if not self.is_wall_at(x, y): return Vector2(x, y)
+            y += 1
+        return Vector2(self.pacman_start_pos.x, self.pacman_start_pos.y)
+
+    @property
+    def wall_tiles(self):
+        # 큰 맵에서는 쓰일 때만 만든다
+        if self._wall_tiles is None:
+            self._wall_tiles = [Vector2(i % self.width, i // self.width) for i, wall in enumerate(self.walls) if wall]
+        return self._wall_tiles
+
+    def is_wall_at(self, x, y): return 0<=y<self.height and 0<=x<self.width and self.walls[y*self.width+x] == 1
+
+    def compute_exits(self, x, y):
+        mask = 0
+        for i, d in enumerate(DIRECTIONS):
+            if not self.is_wall_at(x + d.x, y + d.y): mask |= 1 << i
+        return mask
+
+_level_templates = {}
+
+def get_level_template(map_data):
+    template = _level_templates.get(map_data)
+    if template is None:
+        template = _level_templates[map_data] = LevelTemplate(map_data)
+    return template
+
+def load_level_template(path):
+    # 미로 파일용: 이진 캐시(levelfile)를 거쳐 읽고, 같은 파일은 프로세스 안에서 한 번만 만든다.
+    key = ('file', os.path.abspath(path), os.path.getmtime(path))
+    template = _level_templates.get(key)
+    if template is None:
+        template = _level_templates[key] = LevelTemplate.from_file(path)
+    return template
 
 class Level:
-    def __init__(self):
-        self.original_map_data = LEVEL_DATA.strip()
-        self.map, self.ghost_start_pos, self.wall_tiles = [], {}, []
-        self.pacman_start_pos, self.ghost_house_exit, self.pellet_count = Vector2(), Vector2(), 0
-        self.total_pellets = 0
+    def __init__(self, map_data=LEVEL_DATA, template=None):
+        self.template = template = template or get_level_template(map_data)
+        self.width, self.height = template.width, template.height
+        self.pixel_width = self.width * TILE_WIDTH # 좌우 터널 래핑 기준
+        self.walls, self.exits, self.nav = template.walls, template.exits, template.nav
+        # 시작 위치들은 템플릿과 공유되는 읽기 전용 값
+        self.pacman_start_pos, self.ghost_start_pos, self.ghost_house_exit = template.pacman_start_pos, template.ghost_start_pos, template.ghost_house_exit
+        self.fruit_pos = template.fruit_pos
+        self.total_pellets = template.pellet_count
+        # 가로 한 줄씩 이어 붙인 1차원 타일 배열: map[y * width + x]
+        # 스냅샷과 공유 중일 때(map_shared)는 처음 바꾸기 직전에 복사한다 (copy-on-write).
+        self.map, self.map_shared = bytearray(template.tiles), False
+        # 렌더링 레이어: 배경(벽+펠릿)은 펠릿을 먹을 때마다 부분적으로 지운다. 화면에 다 들어가는 맵은 벽을 한 번만
+        # 그려 두고 맵 전체를 배경으로 쓰며, 큰 맵은 카메라에 보이는 타일 영역(view)만 배경으로 두고 스크롤한다.
+        self.background, self.view, self.dirty_rects = None, None, []
+        self.generation = 0
+        # 먹은 타일 인덱스를 받는 쪽(관전 서버의 델타, 궤적 기록)마다 자기 리스트를 하나씩 넣어 두면 eat_pellet() 이 모두에 덧붙인다.
+        # 비우는 것은 각자 한다 (서로의 몫을 가져가지 않는다).
+        self.eaten_logs = []
         self.load_level()
 
     def load_level(self):
-        self.map, self.ghost_start_pos, self.wall_tiles = [], {}, []
-        self.pellet_count = 0
-        self.total_pellets = 0
-        for y, line in enumerate(self.original_map_data.splitlines()):
-            row = []
-            for x, tile_val in enumerate(line.strip().split()):
-                tile = int(tile_val)
-                row.append(tile)
-                if tile >= 100: self.wall_tiles.append(Vector2(x, y))
-                elif tile == 2 or tile == 3:
-                    self.pellet_count += 1
-                    self.total_pellets += 1
-                elif tile == 4: self.pacman_start_pos = Vector2(x, y)
-                elif 10 <= tile <= 13: self.ghost_start_pos[tile - 10] = Vector2(x, y)
-                elif tile == 1: self.ghost_house_exit = Vector2(x, y - 1)
-            self.map.append(row)
-
-    def get_tile(self, pos): return self.map[int(pos.y)][int(pos.x)] if 0<=pos.y<SCREEN_HEIGHT_TILES and 0<=pos.x<SCREEN_WIDTH_TILES else -1
+        # 라운드 초기화는 다시 파싱하지 않고 원본 버퍼를 복사한다.
+        if self.map_shared: self.map, self.map_shared = bytearray(self.template.tiles), False
+        else: self.map[:] = self.template.tiles
+        self.pellet_count = self.total_pellets = self.template.pellet_count
+        self.generation += 1
+        self.background, self.dirty_rects = None, []
+
+    def get_tile(self, pos):
+        x, y = int(pos.x), int(pos.y)
+        return self.map[y*self.width+x] if 0<=y<self.height and 0<=x<self.width else -1
     def is_wall(self, pos): return self.get_tile(pos) >= 100
+    def is_wall_at(self, x, y): return 0<=y<self.height and 0<=x<self.width and self.walls[y*self.width+x] == 1
+    def exit_mask(self, x, y): return self.exits[y*self.width+x] if 0<=y<self.height and 0<=x<self.width else self.template.compute_exits(x, y)
     def eat_pellet(self, pos):
         tile_val = self.get_tile(pos)
         if tile_val in [2, 3]:
+            x, y = int(pos.x), int(pos.y)
             self.pellet_count -= 1
-            self.map[int(pos.y)][int(pos.x)] = 0
+            if self.map_shared: self.map, self.map_shared = bytearray(self.map), False
+            self.map[y*self.width+x] = 0
+            if self.background: self.erase_pellet(x, y)
+            for log in self.eaten_logs: log.append(y*self.width+x)
             return tile_val
         return 0
 
-    def draw(self, screen):
-        for y in range(SCREEN_HEIGHT_TILES):
-            for x in range(SCREEN_WIDTH_TILES):
-                tile = self.get_tile(Vector2(x, y))
-                if tile >= 100: pygame.draw.rect(screen, BLUE, (x*TILE_WIDTH, y*TILE_HEIGHT, TILE_WIDTH, TILE_HEIGHT), 1)
-                elif tile == 2: pygame.draw.circle(screen, WHITE, (int(x*TILE_WIDTH+TILE_WIDTH/2), int(y*TILE_HEIGHT+TILE_HEIGHT/2)), 2)
-                elif tile == 3: pygame.draw.circle(screen, WHITE, (int(x*TILE_WIDTH+TILE_WIDTH/2), int(y*TILE_HEIGHT+TILE_HEIGHT/2)), 6)
+    def tile_rect(self, x, y): return pygame.Rect(x*TILE_WIDTH, y*TILE_HEIGHT, TILE_WIDTH, TILE_HEIGHT)
+
+    def erase_pellet(self, x, y):
+        # dirty_rects 는 월드 픽셀 좌표
+        rect = self.tile_rect(x, y)
+        if self.view.collidepoint(x, y): self.background.fill(BLACK, self.tile_rect(x - self.view.x, y - self.view.y))
+        self.dirty_rects.append(rect)
+
+    def view_for(self, camera):
+        # 배경이 덮을 타일 영역. camera 는 화면 왼쪽 위의 월드 픽셀 좌표.
+        if self.width <= SCREEN_WIDTH_TILES and self.height <= SCREEN_HEIGHT_TILES: return pygame.Rect(0, 0, self.width, self.height)
+        return pygame.Rect(camera.x // TILE_WIDTH, camera.y // TILE_HEIGHT, SCREEN_WIDTH_TILES + 1, SCREEN_HEIGHT_TILES + 1)
+
+    def build_layers(self, view=None):
+        view = view or self.view_for(ZERO)
+        if view == (0, 0, self.width, self.height):
+            template = self.template
+            if template.wall_surface is None:
+                template.wall_surface = pygame.Surface((self.width * TILE_WIDTH, self.height * TILE_HEIGHT)).convert()
+                template.wall_surface.fill(BLACK)
+                for pos in template.wall_tiles:
+                    pygame.draw.rect(template.wall_surface, BLUE, self.tile_rect(pos.x, pos.y), 1)
+            self.background = template.wall_surface.copy()
+            for i, tile in enumerate(self.map):
+                if tile == 2 or tile == 3:
+                    x, y = i % self.width, i // self.width
+                    if tile == 2: pygame.draw.circle(self.background, WHITE, (int(x*TILE_WIDTH+TILE_WIDTH/2), int(y*TILE_HEIGHT+TILE_HEIGHT/2)), 2)
+                    else: pygame.draw.circle(self.background, WHITE, (int(x*TILE_WIDTH+TILE_WIDTH/2), int(y*TILE_HEIGHT+TILE_HEIGHT/2)), 6)
+        elif self.background is not None and self.view is not None and self.view.size == view.size and self.view.colliderect(view):
+            # 스크롤: 겹치는 부분은 surface 안에서 옮기고 새로 드러난 줄만 그린다
+            dx, dy = self.view.x - view.x, self.view.y - view.y
+            self.background.scroll(dx * TILE_WIDTH, dy * TILE_HEIGHT)
+            if dx: self.draw_tiles(view, pygame.Rect(view.x if dx > 0 else view.right + dx, view.y, abs(dx), view.h))
+            if dy: self.draw_tiles(view, pygame.Rect(view.x, view.y if dy > 0 else view.bottom + dy, view.w, abs(dy)))
+        else:
+            self.background = pygame.Surface((view.w * TILE_WIDTH, view.h * TILE_HEIGHT)).convert()
+            self.draw_tiles(view, view)
+        self.view, self.dirty_rects = view, []
+
+    def draw_tiles(self, view, area):
+        # view 기준 배경 surface 에 area(타일 단위) 안의 벽과 펠릿을 다시 그린다
+        surface, width = self.background, self.width
+        surface.fill(BLACK, pygame.Rect((area.x - view.x) * TILE_WIDTH, (area.y - view.y) * TILE_HEIGHT, area.w * TILE_WIDTH, area.h * TILE_HEIGHT))
+        area = area.clip(pygame.Rect(0, 0, self.width, self.height))
+        walls, level_map = self.walls, self.map
+        for y in range(area.top, area.bottom):
+            sy = (y - view.y) * TILE_HEIGHT
+            for x in range(area.left, area.right):
+                i, sx = y * width + x, (x - view.x) * TILE_WIDTH
+                if walls[i]: pygame.draw.rect(surface, BLUE, (sx, sy, TILE_WIDTH, TILE_HEIGHT), 1)
+                elif level_map[i] == 2: pygame.draw.circle(surface, WHITE, (sx + HALF_TILE_WIDTH, sy + HALF_TILE_HEIGHT), 2)
+                elif level_map[i] == 3: pygame.draw.circle(surface, WHITE, (sx + HALF_TILE_WIDTH, sy + HALF_TILE_HEIGHT), 6)
+
+    def draw(self, screen, camera=ZERO):
+        view = self.view_for(camera)
+        if self.background is None or view != self.view: self.build_layers(view)
+        screen.blit(self.background, (view.x * TILE_WIDTH - camera.x, view.y * TILE_HEIGHT - camera.y))
+        self.dirty_rects = []
+
+    def restore(self, screen, rects, camera=ZERO):
+        # 지난 프레임에 스프라이트가 있던 자리(화면 좌표)와 먹힌 펠릿 자리(월드 좌표)를 배경으로 되돌린다.
+        rects = rects + [rect.move(-camera.x, -camera.y) for rect in self.dirty_rects]
+        ox, oy = camera.x - self.view.x * TILE_WIDTH, camera.y - self.view.y * TILE_HEIGHT
+        for rect in rects: screen.blit(self.background, rect, rect.move(ox, oy))
+        self.dirty_rects = []
+        return rects
+
+class TileIndex:
+    # 타일 단위 공간 해시: 타일 -> 그 타일에 있는 엔티티 목록. 엔티티는 tile_pos 가 바뀔 때 스스로 버킷을 옮긴다 (Entity.index).
+    # 고스트가 수십~수백 마리인 모드에서 충돌/근접 검사가 주변 버킷만 보도록 한다. 결과는 add() 한 순서로 돌려준다.
+    def __init__(self):
+        self.buckets, self.entities, self.added = {}, [], 0
+
+    def add(self, entity):
+        entity.index, entity.index_order, entity.index_key = self, self.added, (entity.tile_pos.x, entity.tile_pos.y)
+        self.added += 1
+        self.entities.append(entity)
+        self.buckets.setdefault(entity.index_key, []).append(entity)
+
+    def remove(self, entity):
+        self.entities.remove(entity)
+        self.take(entity)
+        entity.index = entity.index_key = None
+
+    def take(self, entity):
+        bucket = self.buckets[entity.index_key]
+        bucket.remove(entity)
+        if not bucket: del self.buckets[entity.index_key]
+
+    def move(self, entity):
+        key = (entity.tile_pos.x, entity.tile_pos.y)
+        if key == entity.index_key: return
+        self.take(entity)
+        entity.index_key = key
+        self.buckets.setdefault(key, []).append(entity)
+
+    def near(self, x, y, radius):
+        # 픽셀 (x, y) 에서 radius 픽셀 안에 있을 수 있는 엔티티 (후보일 뿐이라 거리 검사는 호출하는 쪽이 한다).
+        # 엔티티의 픽셀 위치는 타일 중앙에서 한 타일 미만으로만 벗어나므로, 중앙이 radius + 한 타일 안인 타일만 본다.
+        x0, x1 = floor((x - HALF_TILE_WIDTH - radius) / TILE_WIDTH), ceil((x - HALF_TILE_WIDTH + radius) / TILE_WIDTH)
+        y0, y1 = floor((y - HALF_TILE_HEIGHT - radius) / TILE_HEIGHT), ceil((y - HALF_TILE_HEIGHT + radius) / TILE_HEIGHT)
+        if len(self.entities) <= (x1 - x0 + 1) * (y1 - y0 + 1): return self.entities # 적으면 버킷을 도는 것보다 전부 보는 게 싸다
+        buckets, found = self.buckets, []
+        for ty in range(y0, y1 + 1):
+            for tx in range(x0, x1 + 1):
+                bucket = buckets.get((tx, ty))
+                if bucket: found += bucket
+        if len(found) > 1: found.sort(key=lambda e: e.index_order)
+        return found
+
+    def within_tiles(self, tile, radius):
+        # tile 에서 타일 거리(유클리드) radius 이하인 엔티티 - 고스트끼리의 근접 검사용
+        r2, found = radius * radius, []
+        for e in self.near(tile.x * TILE_WIDTH + HALF_TILE_WIDTH, tile.y * TILE_HEIGHT + HALF_TILE_HEIGHT, radius * max(TILE_WIDTH, TILE_HEIGHT)):
+            dx, dy = e.tile_pos.x - tile.x, e.tile_pos.y - tile.y
+            if dx * dx + dy * dy <= r2: found.append(e)
+        return found
 
 class Entity:
+    # 위치는 타일 좌표 + 타일 중앙에서의 오프셋(서브픽셀, 고정소수점 정수)으로 든다. 방향은 중앙에서만 바뀌므로 오프셋은 한 축에만 생긴다.
+    # 다음 타일 중앙에 닿으면(오프셋이 한 타일 이상) 그 타일로 옮기고, 넘친 거리는 carry 로 남겨 다음 틱 이동에 더한다.
+    # 그래서 2.1 픽셀/틱 같은 속도도 정확히 누적되고, 중앙 도착 판정은 오프셋 비교 한 번이다. pixel_pos 는 그리기용 (내림한 정수 픽셀).
+    index = None # 이 엔티티가 들어 있는 TileIndex
+
     def __init__(self, level, start_pos):
         self.level, self.start_pos = level, start_pos
         self.tile_pos, self.pixel_pos = Vector2(start_pos.x, start_pos.y), get_tile_center(start_pos)
-        self.direction, self.speed = Vector2(0, 0), 2
+        self.offset, self.carry = Vector2(), 0
+        self.direction, self.speed = ZERO, fixed_speed(2)
+
+    def at_tile_center(self): return not (self.offset.x or self.offset.y)
+
+    def fixed_pos(self):
+        # 서브픽셀 단위의 절대 좌표
+        tile, off = self.tile_pos, self.offset
+        return (tile.x * TILE_WIDTH + HALF_TILE_WIDTH) * SUBPIXELS + off.x, (tile.y * TILE_HEIGHT + HALF_TILE_HEIGHT) * SUBPIXELS + off.y
+
+    def sync_pixel(self):
+        x, y = self.fixed_pos()
+        self.pixel_pos.set(x >> SUBPIXEL_BITS, y >> SUBPIXEL_BITS)
 
     def update(self):
-        if self.pixel_pos == get_tile_center(self.tile_pos):
-            if not self.level.is_wall(self.tile_pos + self.direction): self.pixel_pos += self.direction * self.speed
-            else: self.direction = Vector2(0,0)
-        else: self.pixel_pos += self.direction * self.speed
-        if (self.direction.x>0 and self.pixel_pos.x>=get_tile_center(self.tile_pos+Vector2(1,0)).x) or \
-           (self.direction.x<0 and self.pixel_pos.x<=get_tile_center(self.tile_pos+Vector2(-1,0)).x) or \
-           (self.direction.y>0 and self.pixel_pos.y>=get_tile_center(self.tile_pos+Vector2(0,1)).y) or \
-           (self.direction.y<0 and self.pixel_pos.y<=get_tile_center(self.tile_pos+Vector2(0,-1)).y):
-            self.tile_pos += self.direction; self.pixel_pos = get_tile_center(self.tile_pos)
-        if self.pixel_pos.x < 0: self.pixel_pos.x, self.tile_pos.x = SCREEN_WIDTH-1, SCREEN_WIDTH_TILES-1
-        elif self.pixel_pos.x > SCREEN_WIDTH: self.pixel_pos.x, self.tile_pos.x = 1, 0
-
-    def draw(self, screen, color): pygame.draw.circle(screen, color, (int(self.pixel_pos.x), int(self.pixel_pos.y)), int(TILE_WIDTH/2)-2)
-    def reset(self): self.tile_pos, self.pixel_pos, self.direction = Vector2(self.start_pos.x, self.start_pos.y), get_tile_center(self.start_pos), Vector2(0,0)
+        # tile_pos / offset / pixel_pos 는 제자리에서 갱신한다 (틱마다 Vector2 를 새로 만들지 않음)
+        tile, off, d = self.tile_pos, self.offset, self.direction
+        step = self.speed
+        if not (off.x or off.y):
+            if self.level.is_wall_at(tile.x + d.x, tile.y + d.y): self.direction = d = ZERO
+            step, self.carry = step + self.carry, 0
+        if d.x:
+            along = off.x * d.x + step
+            if along >= TILE_SUBPIXELS_X: return self.arrive(along - TILE_SUBPIXELS_X)
+            off.x = along * d.x
+        elif d.y:
+            along = off.y * d.y + step
+            if along >= TILE_SUBPIXELS_Y: return self.arrive(along - TILE_SUBPIXELS_Y)
+            off.y = along * d.y
+        else: return
+        self.sync_pixel()
+
+    def arrive(self, carry):
+        # 다음 타일 중앙에 도착. 좌우 맵 밖 타일은 반대편 끝 타일로 래핑한다.
+        tile, d = self.tile_pos, self.direction
+        tile.set(tile.x + d.x, tile.y + d.y)
+        if tile.x < 0: tile.x = self.level.width - 1
+        elif tile.x >= self.level.width: tile.x = 0
+        self.offset.set(0, 0)
+        self.carry = carry
+        self.pixel_pos.set(tile.x * TILE_WIDTH + HALF_TILE_WIDTH, tile.y * TILE_HEIGHT + HALF_TILE_HEIGHT)
+        if self.index is not None: self.index.move(self)
+
+    def linear_ticks(self, limit):
+        # 앞으로 몇 틱 동안 update() 가 오프셋에 같은 값을 더하기만 하는지 (다음 타일 중앙 도착 직전까지)
+        off, d = self.offset, self.direction
+        if not (off.x or off.y): return 0 # 중앙에서는 방향을 다시 정한다
+        if d.x: remaining = TILE_SUBPIXELS_X - off.x * d.x
+        elif d.y: remaining = TILE_SUBPIXELS_Y - off.y * d.y
+        else: return limit
+        return max(min(limit, -(-remaining // self.speed) - 1), 0)
+
+    def glide(self, ticks):
+        # linear_ticks() 안쪽의 틱들을 한 번에 진행한다
+        d, distance = self.direction, ticks * self.speed
+        self.offset.set(self.offset.x + d.x * distance, self.offset.y + d.y * distance)
+        self.sync_pixel()
+
+    def draw(self, screen, color, pos=None): return pygame.draw.circle(screen, color, pos or (int(self.pixel_pos.x), int(self.pixel_pos.y)), int(TILE_WIDTH/2)-2)
+    def reset(self):
+        self.tile_pos, self.pixel_pos, self.direction = Vector2(self.start_pos.x, self.start_pos.y), get_tile_center(self.start_pos), ZERO
+        self.offset.set(0, 0)
+        self.carry = 0
+        if self.index is not None: self.index.move(self)
+    # 탐색용 스냅샷: 값만 담은 튜플 (방향은 불변 상수라 그대로 공유)
+    def snapshot(self): return (self.tile_pos.x, self.tile_pos.y, self.offset.x, self.offset.y, self.carry, self.direction, self.speed, self.pixel_pos.x, self.pixel_pos.y)
+    def restore(self, state):
+        self.tile_pos.set(state[0], state[1]); self.offset.set(state[2], state[3]); self.pixel_pos.set(state[7], state[8])
+        self.carry, self.direction, self.speed = state[4], state[5], state[6]
+        if self.index is not None: self.index.move(self)
 
 class Pacman(Entity):
-    def __init__(self, level, start_pos):
+    def __init__(self, level, start_pos, assets=None):
         super().__init__(level, start_pos)
-        self.buffered_direction, self.lives, self.score, self.bonus_life_awarded, self.speed = Vector2(0,0), 3, 0, False, PACMAN_SPEED
-        self.last_direction = Vector2(-1, 0)
+        self.buffered_direction, self.lives, self.score, self.bonus_life_awarded, self.speed = ZERO, 3, 0, False, fixed_speed(PACMAN_SPEED)
+        self.last_direction = LEFT
         self.anim_frame = 0
         self.anim_timer = 0
-        self.animations = {}
-
-        try:
-            path1 = os.path.join(RES_DIR, 'pacman_1.png')
-            path2 = os.path.join(RES_DIR, 'pacman_2.png')
-
-            pacman_open_orig = pygame.image.load(path1).convert_alpha()
-            pacman_closed_orig = pygame.image.load(path2).convert_alpha()
-
-            pacman_open = pygame.transform.scale(pacman_open_orig, (TILE_WIDTH, TILE_HEIGHT))
-            pacman_closed = pygame.transform.scale(pacman_closed_orig, (TILE_WIDTH, TILE_HEIGHT))
-
-            self.animations[Vector2(-1, 0)] = [pacman_open, pacman_closed]
-            
-            right_open = pygame.transform.flip(pacman_open, True, False)
-            right_closed = pygame.transform.flip(pacman_closed, True, False)
-            self.animations[Vector2(1, 0)] = [right_open, right_closed]
-
-            up_open = pygame.transform.rotate(right_open, 90)
-            up_closed = pygame.transform.rotate(right_closed, 90)
-            self.animations[Vector2(0, -1)] = [up_open, up_closed]
-
-            down_open = pygame.transform.rotate(right_open, -90)
-            down_closed = pygame.transform.rotate(right_closed, -90)
-            self.animations[Vector2(0, 1)] = [down_open, down_closed]
-            
-            self.image = self.animations[self.last_direction][self.anim_frame]
-
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Warning: Could not load Pac-Man images. Using fallback. Error: {e}")
-            self.animations = None
-            self.image = None
+        self.animations = assets.pacman_animations if assets else None
+        self.image = self.animations[self.last_direction][self.anim_frame] if self.animations else None
 
     def update(self):
-        if self.pixel_pos == get_tile_center(self.tile_pos):
-            if not self.level.is_wall(self.tile_pos + self.buffered_direction):
+        if self.at_tile_center():
+            if not self.level.is_wall_at(self.tile_pos.x + self.buffered_direction.x, self.tile_pos.y + self.buffered_direction.y):
                 self.direction = self.buffered_direction
         
-        if self.direction != Vector2(0, 0):
+        if self.direction.x or self.direction.y:
             self.last_direction = self.direction
             self.anim_timer += 1
             if self.anim_timer >= 5:
@@ -246,23 +670,44 @@ class Pacman(Entity):
 
     def set_direction(self, new_dir): self.buffered_direction = new_dir
 
-    def draw(self, screen):
+    def glide(self, ticks):
+        super().glide(ticks)
+        if self.direction.x or self.direction.y:
+            self.last_direction = self.direction
+            elapsed = self.anim_timer + ticks
+            self.anim_frame, self.anim_timer = (self.anim_frame + elapsed // 5) % 2, elapsed % 5
+        else:
+            self.anim_frame = 0
+            self.anim_timer = 0
+        if self.animations:
+            self.image = self.animations[self.last_direction][self.anim_frame]
+
+    def draw(self, screen, pos=None):
         if self.image:
             rect = self.image.get_rect()
-            rect.center = (int(self.pixel_pos.x), int(self.pixel_pos.y))
-            screen.blit(self.image, rect)
+            rect.center = pos or (int(self.pixel_pos.x), int(self.pixel_pos.y))
+            return screen.blit(self.image, rect)
         else:
-            super().draw(screen, YELLOW)
+            return super().draw(screen, YELLOW, pos)
 
     def reset(self):
         super().reset()
-        self.buffered_direction = Vector2(0,0)
-        self.last_direction = Vector2(-1, 0)
+        self.buffered_direction = ZERO
+        self.last_direction = LEFT
         self.anim_frame = 0
         self.anim_timer = 0
         if self.animations:
             self.image = self.animations[self.last_direction][self.anim_frame]
 
+    def snapshot(self):
+        return super().snapshot() + (self.buffered_direction, self.lives, self.score, self.bonus_life_awarded, self.last_direction, self.anim_frame, self.anim_timer)
+
+    def restore(self, state):
+        super().restore(state)
+        self.buffered_direction, self.lives, self.score, self.bonus_life_awarded, self.last_direction, self.anim_frame, self.anim_timer = state[9:]
+        if self.animations:
+            self.image = self.animations[self.last_direction][self.anim_frame]
+
 class Fruit:
     def __init__(self, position, image=None):
         self.position = position
@@ -270,30 +715,35 @@ class Fruit:
         self.spawn_time = 0
         self.image = image
 
-    def activate(self, pos=None):
+    def snapshot(self): return (self.position, self.is_active, self.spawn_time) # position 은 바뀔 때 새 Vector2 로 교체된다
+    def restore(self, state): self.position, self.is_active, self.spawn_time = state
+
+    def activate(self, pos=None, tick=0):
         if pos: self.position = pos
         self.is_active = True
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = tick # 벽시계 대신 게임 틱 기준 (headless 에서도 동일하게 동작)
 
-    def draw(self, screen):
+    def draw(self, screen, pos=None):
         if self.is_active:
+            if pos is None:
+                center = get_tile_center(self.position)
+                pos = (center.x, center.y)
             if self.image:
-                center_pos = get_tile_center(self.position)
                 rect = self.image.get_rect()
-                rect.center = (center_pos.x, center_pos.y)
-                screen.blit(self.image, rect)
+                rect.center = pos
+                return screen.blit(self.image, rect)
             else:
-                center = get_tile_center(self.position)
-                pygame.draw.circle(screen, RED, (int(center.x), int(center.y)), 8)
+                return pygame.draw.circle(screen, RED, (int(pos[0]), int(pos[1])), 8)
+        return None
 
 class Ghost(Entity):
-    def __init__(self, level, start_pos, color, ghost_id):
+    def __init__(self, level, start_pos, color, ghost_id, image=None):
         super().__init__(level, start_pos)
+        self.image = image
         self.color, self.id, self.state = color, ghost_id, GHOST_STATE_IN_HOUSE
-        self.base_speed = GHOST_BASE_SPEED
+        self.base_speed = fixed_speed(GHOST_BASE_SPEED)
         self.speed = self.base_speed
         self.scatter_target = Vector2()
-        self.calculated_path, self.path_index = None, 0
         self.is_immune = False
         self.in_house_timer = 0
 
@@ -301,34 +751,45 @@ class Ghost(Entity):
         # FIXED: ghost speed bug - 유령이 집에 도착하면 속도를 기본으로 리셋
         if self.state == GHOST_STATE_EATEN and self.tile_pos == self.start_pos:
             self.state = GHOST_STATE_IN_HOUSE
-            self.calculated_path = None
             self.speed = self.base_speed 
 
-        if self.pixel_pos == get_tile_center(self.tile_pos):
+        if self.at_tile_center():
             valid_dirs = self.get_valid_directions()
-            if self.direction * -1 in valid_dirs and len(valid_dirs) > 1: valid_dirs.remove(self.direction * -1)
+            if len(valid_dirs) > 1:
+                # 되돌아가는 방향은 다른 길이 있으면 제외
+                rx, ry = -self.direction.x, -self.direction.y
+                for d in valid_dirs:
+                    if d.x == rx and d.y == ry: valid_dirs.remove(d); break
 
             if self.state == GHOST_STATE_FRIGHTENED:
-                self.direction = random.choice(valid_dirs) if valid_dirs else self.direction
+                rng = game_controller.rng if game_controller else random
+                self.direction = rng.choice(valid_dirs) if valid_dirs else self.direction
             elif self.state == GHOST_STATE_EATEN:
-                if self.calculated_path and self.path_index < len(self.calculated_path):
-                    next_tile = self.calculated_path[self.path_index]
-                    self.direction = next_tile - self.tile_pos; self.path_index += 1
-                else: self.direction = Vector2(0, 0)
-            elif self.state in [GHOST_STATE_CHASE, GHOST_STATE_SCATTER, GHOST_STATE_EXITING]:
+                self.direction = self.level.nav.next_direction(self.tile_pos, self.start_pos)
+            elif self.state == GHOST_STATE_EXITING:
+                self.direction = self.level.nav.next_direction(self.tile_pos, self.level.ghost_house_exit)
+            elif self.state in [GHOST_STATE_CHASE, GHOST_STATE_SCATTER]:
                 target_tile = self.get_target_tile(pacman, blinky)
                 if target_tile and valid_dirs:
                     best_dir = None; min_dist = float('inf')
-                    priority_order = [Vector2(0, -1), Vector2(-1, 0), Vector2(0, 1), Vector2(1, 0)]
-                    for direction in priority_order:
+                    # 거리 비교만 하면 되므로 제곱 거리를 쓴다 (sqrt 및 Vector2 생성 없음)
+                    bx, by = self.tile_pos.x - target_tile.x, self.tile_pos.y - target_tile.y
+                    for direction in PRIORITY_ORDER:
                         if direction in valid_dirs:
-                            dist = (self.tile_pos + direction - target_tile).magnitude()
+                            dx, dy = bx + direction.x, by + direction.y
+                            dist = dx * dx + dy * dy
                             if dist < min_dist: min_dist = dist; best_dir = direction
                     self.direction = best_dir
-            elif self.state == GHOST_STATE_IN_HOUSE: self.direction = Vector2(0,0)
+            elif self.state == GHOST_STATE_IN_HOUSE: self.direction = ZERO
 
         super().update()
 
+    def linear_ticks(self, limit):
+        # 집 안에서 멈춰 있는 고스트는 나올 때까지 아무것도 바뀌지 않는다 (나오는 시점은 엔진이 센다)
+        if self.state == GHOST_STATE_IN_HOUSE and not (self.direction.x or self.direction.y): return limit
+        if self.state == GHOST_STATE_EATEN and self.tile_pos == self.start_pos: return 0
+        return super().linear_ticks(limit)
+
     def get_target_tile(self, pacman, blinky):
         if self.state == GHOST_STATE_SCATTER: return self.scatter_target
         elif self.state == GHOST_STATE_CHASE: return self.get_chase_target(pacman, blinky)
@@ -336,12 +797,9 @@ class Ghost(Entity):
         return pacman.tile_pos
 
     def get_valid_directions(self):
-        valid_dirs = []
-        for d in [Vector2(0,-1), Vector2(0,1), Vector2(-1,0), Vector2(1,0)]:
-            if not self.level.is_wall(self.tile_pos + d): valid_dirs.append(d)
-        return valid_dirs
+        return list(DIRECTIONS_BY_MASK[self.level.exit_mask(self.tile_pos.x, self.tile_pos.y)])
 
-    def draw(self, screen, game_controller=None):
+    def draw(self, screen, game_controller=None, pos=None):
         image_to_draw = self.image
 
         if game_controller and game_controller.ghost_images:
@@ -355,158 +813,256 @@ class Ghost(Entity):
 
         if image_to_draw:
             rect = image_to_draw.get_rect()
-            rect.center = (int(self.pixel_pos.x), int(self.pixel_pos.y))
-            screen.blit(image_to_draw, rect)
+            rect.center = pos or (int(self.pixel_pos.x), int(self.pixel_pos.y))
+            return screen.blit(image_to_draw, rect)
         else:
             draw_color = self.color
             if self.state == GHOST_STATE_FRIGHTENED:
                 draw_color = BLUE
             elif self.state == GHOST_STATE_EATEN:
                 draw_color = WHITE
-            super().draw(screen, draw_color)
+            return super().draw(screen, draw_color, pos)
 
     def get_chase_target(self, pacman, blinky): return pacman.tile_pos
     def reset(self):
         super().reset()
-        self.state, self.speed, self.calculated_path, self.is_immune = GHOST_STATE_IN_HOUSE, self.base_speed, None, False
+        self.state, self.speed, self.is_immune = GHOST_STATE_IN_HOUSE, self.base_speed, False
         self.in_house_timer = 0
 
+    def snapshot(self): return super().snapshot() + (self.state, self.base_speed, self.is_immune, self.in_house_timer)
+    def restore(self, state):
+        super().restore(state)
+        self.state, self.base_speed, self.is_immune, self.in_house_timer = state[9:13]
+
 class Blinky(Ghost):
-    def __init__(self, level, start_pos):
-        super().__init__(level, start_pos, RED, 0)
-        self.scatter_target = Vector2(SCREEN_WIDTH_TILES - 2, 1)
-        self.rage_speed = BLINKY_RAGE_SPEED
-        try:
-            blinky_img = pygame.image.load(os.path.join(RES_DIR, 'blinky.png')).convert_alpha()
-            self.image = pygame.transform.scale(blinky_img, (TILE_WIDTH, TILE_HEIGHT))
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Warning: Could not load blinky.png. Error: {e}")
-            self.image = None
+    def __init__(self, level, start_pos, assets=None):
+        super().__init__(level, start_pos, RED, 0, assets.image('blinky') if assets else None)
+        self.scatter_target = Vector2(level.width - 2, 1)
+        self.rage_speed = fixed_speed(BLINKY_RAGE_SPEED)
 
     def update(self, pacman, blinky=None, game_controller=None):
         if self.state not in [GHOST_STATE_FRIGHTENED, GHOST_STATE_EATEN]:
-            if game_controller and game_controller.level.total_pellets > 0:
-                pellets_eaten_ratio = (game_controller.level.total_pellets - game_controller.level.pellet_count) / game_controller.level.total_pellets
-                self.speed = self.base_speed + (self.rage_speed - self.base_speed) * pellets_eaten_ratio
-            else:
-                self.speed = self.base_speed
+            self.speed = self.rage_speed_for(game_controller.level if game_controller else None)
         
         super().update(pacman, blinky, game_controller)
 
+    def rage_speed_for(self, level):
+        # 먹은 펠릿 비율만큼 rage_speed 쪽으로 빨라진다 (정수 연산)
+        if level and level.total_pellets > 0:
+            return self.base_speed + (self.rage_speed - self.base_speed) * (level.total_pellets - level.pellet_count) // level.total_pellets
+        return self.base_speed
+
     def get_chase_target(self, pacman, blinky=None): return pacman.tile_pos
+    def snapshot(self): return super().snapshot() + (self.rage_speed,)
+    def restore(self, state):
+        super().restore(state)
+        self.rage_speed = state[13]
 
 class Pinky(Ghost):
-    def __init__(self, level, start_pos):
-        super().__init__(level, start_pos, PINK, 1)
+    def __init__(self, level, start_pos, assets=None):
+        super().__init__(level, start_pos, PINK, 1, assets.image('pinky') if assets else None)
         self.scatter_target = Vector2(1, 1)
-        try:
-            pinky_img = pygame.image.load(os.path.join(RES_DIR, 'pinky.png')).convert_alpha()
-            self.image = pygame.transform.scale(pinky_img, (TILE_WIDTH, TILE_HEIGHT))
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Warning: Could not load pinky.png. Error: {e}")
-            self.image = None
     def get_chase_target(self, pacman, blinky=None):
         target = pacman.tile_pos + pacman.direction * 4
-        if pacman.direction == Vector2(0, -1): target = pacman.tile_pos + Vector2(-4, -4)
+        if pacman.direction == UP: target = pacman.tile_pos + Vector2(-4, -4)
         return target
 
 class Inky(Ghost):
-    def __init__(self, level, start_pos):
-        super().__init__(level, start_pos, CYAN, 2)
-        self.scatter_target = Vector2(SCREEN_WIDTH_TILES - 2, SCREEN_HEIGHT_TILES - 2)
-        try:
-            inky_img = pygame.image.load(os.path.join(RES_DIR, 'inky.png')).convert_alpha()
-            self.image = pygame.transform.scale(inky_img, (TILE_WIDTH, TILE_HEIGHT))
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Warning: Could not load inky.png. Error: {e}")
-            self.image = None
+    def __init__(self, level, start_pos, assets=None):
+        super().__init__(level, start_pos, CYAN, 2, assets.image('inky') if assets else None)
+        self.scatter_target = Vector2(level.width - 2, level.height - 2)
     def get_chase_target(self, pacman, blinky):
         if not blinky: return pacman.tile_pos
         pivot = pacman.tile_pos + pacman.direction * 2
         return pivot + (pivot - blinky.tile_pos)
 
 class Clyde(Ghost):
-    def __init__(self, level, start_pos):
-        super().__init__(level, start_pos, ORANGE, 3)
-        self.scatter_target = Vector2(1, SCREEN_HEIGHT_TILES - 2)
-        try:
-            clyde_img = pygame.image.load(os.path.join(RES_DIR, 'clyde.png')).convert_alpha()
-            self.image = pygame.transform.scale(clyde_img, (TILE_WIDTH, TILE_HEIGHT))
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Warning: Could not load clyde.png. Error: {e}")
-            self.image = None
+    def __init__(self, level, start_pos, assets=None):
+        super().__init__(level, start_pos, ORANGE, 3, assets.image('clyde') if assets else None)
+        self.scatter_target = Vector2(1, level.height - 2)
     def get_chase_target(self, pacman, blinky=None):
-        return pacman.tile_pos if (self.tile_pos - pacman.tile_pos).magnitude() > 8 else self.scatter_target
-
-class GameController:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Pacman")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 28)
-        
-        self.init_game()
+        dx, dy = self.tile_pos.x - pacman.tile_pos.x, self.tile_pos.y - pacman.tile_pos.y
+        return pacman.tile_pos if dx * dx + dy * dy > 64 else self.scatter_target # 8 타일보다 멀면 추적
+
+CHASE_DIRECT, CHASE_AHEAD, CHASE_PIVOT, CHASE_SHY = range(4)
+# 추적 목표 계산 방식 (GameEngine.step_ghosts 가 묶어서 계산한다). 여기 없는 get_chase_target 은 고스트마다 부른다.
+CHASE_KINDS = {Ghost.get_chase_target: CHASE_DIRECT, Blinky.get_chase_target: CHASE_DIRECT, Pinky.get_chase_target: CHASE_AHEAD,
+               Inky.get_chase_target: CHASE_PIVOT, Clyde.get_chase_target: CHASE_SHY}
+
+class GameRandom(random.Random):
+    # 엔진 전용 rng. 상태를 바꾼 횟수(draws)를 세어 두고, 그 사이 뽑은 적이 없으면 스냅샷이
+    # getstate()(625 개짜리 튜플)를 새로 만들거나 setstate() 하지 않고 이전 것을 재사용한다. 뽑는 값은 random.Random 과 같다.
+    def seed(self, *args, **kwargs):
+        super().seed(*args, **kwargs)
+        self.draws, self.saved = 0, None
+    def random(self):
+        self.draws += 1
+        return super().random()
+    def getrandbits(self, k):
+        self.draws += 1
+        return super().getrandbits(k)
+    def getstate(self):
+        if self.saved is None or self.saved[0] != self.draws: self.saved = (self.draws, super().getstate())
+        return self.saved[1]
+    def setstate(self, state):
+        if self.saved is not None and self.saved[1] is state and self.saved[0] == self.draws: return
+        super().setstate(state)
+        self.draws += 1
+        self.saved = (self.draws, state)
+
+class GameSnapshot:
+    # GameEngine.snapshot() 의 결과. 규칙에 영향을 주는 값만 담고 이미지/화면/입력 기록은 뺀다.
+    # 펠릿 맵은 레벨과 bytearray 를 공유하며, 어느 쪽이든 바꾸기 직전에 복사된다.
+    __slots__ = ('engine', 'rng', 'template', 'level_map', 'pellet_count', 'pacman', 'ghosts', 'fruit')
+    def __init__(self, engine, rng, template, level_map, pellet_count, pacman, ghosts, fruit):
+        self.engine, self.rng, self.template, self.level_map, self.pellet_count = engine, rng, template, level_map, pellet_count
+        self.pacman, self.ghosts, self.fruit = pacman, ghosts, fruit
+
+class GameEngine:
+    # 화면/폰트/이미지/프레임 제한 없이 게임 규칙만 돌리는 시뮬레이션 코어 (headless)
+    # 봇 평가나 밸런스 테스트에서는 이 클래스를 직접 만들고 step() 으로 조작한다.
+    def __init__(self, seed=None, record=False, level=None):
+        # level: 미로 파일 경로 (없으면 기본 맵 LEVEL_DATA)
+        self.record = record
+        self.level_path = os.path.abspath(level) if level else '' # 입력 기록에 남긴다
+        self.level_template = load_level_template(level) if level else None
+        self.init_game(seed)
+
+    def load_game_assets(self):
+        self.assets = None
+        self.ghost_images = None
+        self.fruit_images = []
 
-    def init_game(self):
+    def init_game(self, seed=None):
         self.state = STATE_PLAYING
-        self.level = Level()
-        self.level.load_level()
+        self.level = Level(template=self.level_template)
         
         self.round_level = 1
+        self.tick = 0
+        self.deaths = self.ghosts_eaten = self.fruits_eaten = 0
+        # 판마다 시드를 정해 두면 같은 입력만으로 같은 판을 재현할 수 있다.
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = GameRandom(self.seed)
+        self.input_log = InputLog(self.seed, level_path=self.level_path, level_crc=self.level.template.checksum) if self.record else None
         
-        self.ghost_images = {}
-        try:
-            frightened_img = pygame.image.load(os.path.join(RES_DIR, 'frightened.png')).convert_alpha()
-            frightened_flash_img = pygame.image.load(os.path.join(RES_DIR, 'frightened_flash.png')).convert_alpha()
-            eyes_img = pygame.image.load(os.path.join(RES_DIR, 'eyes.png')).convert_alpha()
-            
-            self.ghost_images['frightened'] = pygame.transform.scale(frightened_img, (TILE_WIDTH, TILE_HEIGHT))
-            self.ghost_images['frightened_flash'] = pygame.transform.scale(frightened_flash_img, (TILE_WIDTH, TILE_HEIGHT))
-            self.ghost_images['eyes'] = pygame.transform.scale(eyes_img, (TILE_WIDTH, TILE_HEIGHT))
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Warning: Could not load common ghost images. Game may not display correctly. Error: {e}")
-            self.ghost_images = None
-
-        self.pacman = Pacman(self.level, self.level.pacman_start_pos)
+        self.load_game_assets()
+
+        assets = self.assets
+        self.pacman = Pacman(self.level, self.level.pacman_start_pos, assets)
         self.pacman.score = 0
         self.pacman.lives = 3
         self.pacman.bonus_life_awarded = False
 
-        self.ghosts = [Blinky(self.level, self.level.ghost_start_pos[0]), Pinky(self.level, self.level.ghost_start_pos[1]), Inky(self.level, self.level.ghost_start_pos[2]), Clyde(self.level, self.level.ghost_start_pos[3])]
+        self.ghosts, self.ghost_index, self.ghosts_batched = [], TileIndex(), True
+        for ghost in (Blinky(self.level, self.level.ghost_start_pos[0], assets), Pinky(self.level, self.level.ghost_start_pos[1], assets), Inky(self.level, self.level.ghost_start_pos[2], assets), Clyde(self.level, self.level.ghost_start_pos[3], assets)):
+            self.add_ghost(ghost)
         self.blinky = self.ghosts[0]
         
         self.increase_difficulty()
 
         self.frightened_timer, self.scatter_chase_timer, self.current_wave, self.ghost_eaten_score = 0, 0, 0, 200
         self.ghost_mode = GHOST_STATE_SCATTER
-        
-        self.fruit_images = []
-        fruit_pokemon_names = ['cherubi', 'bounsweet', 'applin']
-        for name in fruit_pokemon_names:
-            img = load_image_from_pokeapi(name)
-            if img:
-                scaled_img = pygame.transform.scale(img, (TILE_WIDTH, TILE_HEIGHT))
-                self.fruit_images.append(scaled_img)
 
-        self.fruit = Fruit(Vector2(9, 13), None)
+        self.fruit = Fruit(self.level.fruit_pos, None)
         self.fruit_spawn_level = 0
         
         self.state = STATE_PAUSED
         self.pause_timer = 60
 
+    def add_ghost(self, ghost):
+        # 고스트를 더 두는 모드용. 충돌 처리 순서는 추가한 순서다.
+        self.ghosts.append(ghost)
+        self.ghost_index.add(ghost)
+        if not self.batchable(ghost): self.ghosts_batched = False
+
+    @staticmethod
+    def batchable(ghost):
+        # update() / get_target_tile() / get_valid_directions() 를 바꾼 고스트가 있으면 결정 단계를 묶지 않고 고스트마다 update() 를 부른다.
+        # 인스턴스에 붙인 update (프로파일러가 감싼 것 등) 도 바꾼 것으로 본다.
+        cls = type(ghost)
+        return ('update' not in vars(ghost) and cls.update in (Ghost.update, Blinky.update)
+                and cls.get_target_tile is Ghost.get_target_tile and cls.get_valid_directions is Ghost.get_valid_directions)
+
+    def refresh_ghost_batching(self):
+        # 고스트의 update 를 나중에 감싸거나 되돌렸을 때 부른다
+        self.ghosts_batched = all(self.batchable(ghost) for ghost in self.ghosts)
+
+    def reset(self, seed=None):
+        self.init_game(seed)
+        return self.get_state()
+
+    def apply_action(self, action):
+        if action == ACTION_NONE: return
+        if self.input_log is not None: self.input_log.record_input(self.tick, action)
+        self.pacman.set_direction(ACTION_DIRECTIONS[action])
+
+    def step(self, action=ACTION_NONE):
+        # 프로그램 입력 API: 액션 하나를 적용하고 한 틱 진행한 뒤 상태를 돌려준다.
+        self.apply_action(action)
+        self.update()
+        return self.get_state()
+
+    def checksum(self):
+        # 재현 검증용 상태 체크섬 (맵 + 엔티티 + 타이머)
+        p = self.pacman
+        values = [self.tick, self.state, self.round_level, p.score, p.lives, p.tile_pos.x, p.tile_pos.y, p.offset.x, p.offset.y, p.carry,
+                  p.direction.x, p.direction.y, p.buffered_direction.x, p.buffered_direction.y, self.frightened_timer, self.scatter_chase_timer,
+                  self.current_wave, self.ghost_mode, self.pause_timer, self.ghost_eaten_score, self.fruit.is_active, self.fruit_spawn_level]
+        for g in self.ghosts:
+            values += [g.tile_pos.x, g.tile_pos.y, g.offset.x, g.offset.y, g.carry, g.direction.x, g.direction.y, g.state, g.in_house_timer, g.speed]
+        return zlib.crc32(struct.pack(f'<{len(values)}q', *values), zlib.crc32(self.level.map))
+
+    def snapshot(self):
+        # 트리 탐색용 복제: deepcopy 대신 상태 크기에 비례하는 비용으로 저장/복원한다.
+        level = self.level
+        level.map_shared = True
+        return GameSnapshot((self.seed, self.tick, self.state, self.round_level, self.deaths, self.ghosts_eaten, self.fruits_eaten, self.pause_timer, self.frightened_timer,
+                             self.scatter_chase_timer, self.current_wave, self.ghost_mode, self.ghost_eaten_score, self.fruit_spawn_level),
+                            self.rng.getstate(), level.template, level.map, level.pellet_count,
+                            self.pacman.snapshot(), tuple(g.snapshot() for g in self.ghosts), self.fruit.snapshot())
+
+    def restore(self, snapshot):
+        # 같은 맵의 게임에만 복원할 수 있다. 입력 기록(input_log)은 되돌리지 않는다.
+        level = self.level
+        if level.template is not snapshot.template: raise ValueError("snapshot belongs to a different level")
+        (self.seed, self.tick, self.state, self.round_level, self.deaths, self.ghosts_eaten, self.fruits_eaten, self.pause_timer, self.frightened_timer,
+         self.scatter_chase_timer, self.current_wave, self.ghost_mode, self.ghost_eaten_score, self.fruit_spawn_level) = snapshot.engine
+        self.rng.setstate(snapshot.rng)
+        level.map, level.map_shared, level.pellet_count = snapshot.level_map, True, snapshot.pellet_count
+        if level.background is not None: # 그려 둔 펠릿 레이어는 더 이상 맞지 않는다
+            level.background = None
+            level.generation += 1
+        self.pacman.restore(snapshot.pacman)
+        for ghost, state in zip(self.ghosts, snapshot.ghosts): ghost.restore(state)
+        self.fruit.restore(snapshot.fruit)
+
+    def get_state(self):
+        return {
+            'tick': self.tick,
+            'state': self.state,
+            'score': self.pacman.score,
+            'lives': self.pacman.lives,
+            'round': self.round_level,
+            'deaths': self.deaths,
+            'ghosts_eaten': self.ghosts_eaten,
+            'fruits_eaten': self.fruits_eaten,
+            'pellets_left': self.level.pellet_count,
+            'pacman': (self.pacman.tile_pos.x, self.pacman.tile_pos.y, self.pacman.pixel_pos.x, self.pacman.pixel_pos.y),
+            'ghosts': [(g.tile_pos.x, g.tile_pos.y, g.pixel_pos.x, g.pixel_pos.y, g.state) for g in self.ghosts],
+            'fruit_active': self.fruit.is_active,
+        }
+
     def increase_difficulty(self):
         # NEW: 최고 속도 제한 추가
-        max_ghost_speed = PACMAN_SPEED + 0.8
-        max_rage_speed = PACMAN_SPEED + 1.1
+        max_ghost_speed = PACMAN_SPEED + MAX_GHOST_SPEED_BONUS
+        max_rage_speed = PACMAN_SPEED + MAX_RAGE_SPEED_BONUS
 
-        speed_increase = 0.15 * (self.round_level - 1)
-        rage_speed_increase = 0.2 * (self.round_level - 1)
+        speed_increase = GHOST_SPEED_STEP * (self.round_level - 1)
+        rage_speed_increase = BLINKY_RAGE_SPEED_STEP * (self.round_level - 1)
         for ghost in self.ghosts:
-            ghost.base_speed = min(GHOST_BASE_SPEED + speed_increase, max_ghost_speed)
+            ghost.base_speed = fixed_speed(min(GHOST_BASE_SPEED + speed_increase, max_ghost_speed))
             if isinstance(ghost, Blinky):
-                ghost.rage_speed = min(BLINKY_RAGE_SPEED + rage_speed_increase, max_rage_speed)
+                ghost.rage_speed = fixed_speed(min(BLINKY_RAGE_SPEED + rage_speed_increase, max_rage_speed))
 
     def init_round(self):
         self.level.load_level()
@@ -534,6 +1090,7 @@ class GameController:
         self.state, self.pause_timer = STATE_PAUSED, 60
 
     def update(self):
+        self.tick += 1
         if self.state == STATE_PLAYING:
             self.pacman.update()
             self.handle_pellet_eating()
@@ -548,6 +1105,85 @@ class GameController:
             self.pause_timer -= 1
             if self.pause_timer <= 0:
                 self.state = STATE_PLAYING
+
+        if self.input_log is not None and self.tick % self.input_log.checksum_interval == 0:
+            self.input_log.record_checksum(self.tick, self.checksum())
+
+    def fast_forward(self, limit=None):
+        # 헤드리스 전용 사건 단위 진행: 최소 한 틱을 돌고, 팩맨이 다음 타일 중앙에 닿을 때(입력이 다시 쓰이는 때)까지
+        # 아무 일도 없는 구간은 한 번에 건너뛴다. 결과는 같은 틱 수만큼 update() 를 부른 것과 같다. 진행한 틱 수를 돌려준다.
+        start = self.tick
+        end = start + limit if limit is not None else None
+        self.update()
+        while self.state != STATE_GAME_OVER and not self.pacman.at_tile_center() and (end is None or self.tick < end):
+            ticks = self.quiet_ticks(end - self.tick if end is not None else 1 << 30)
+            if ticks: self.skip_ticks(ticks)
+            else: self.update()
+        return self.tick - start
+
+    def quiet_ticks(self, limit):
+        # 앞으로 몇 틱(최대 limit) 동안 위치가 직선으로 움직이고 타이머만 흐르는지. 0 이면 다음 틱은 update() 로 돌려야 한다.
+        if self.state == STATE_PAUSED: return max(min(limit, self.pause_timer - 1), 0)
+        if self.state != STATE_PLAYING: return 0
+        p, level = self.pacman, self.level
+        if not p.bonus_life_awarded and p.score >= 1500: return 0
+        if 0 <= p.tile_pos.x < level.width and 0 <= p.tile_pos.y < level.height and level.map[p.tile_pos.y * level.width + p.tile_pos.x] in (2, 3): return 0
+        if self.fruit.is_active:
+            if p.tile_pos == self.fruit.position: return 0
+            limit = min(limit, self.fruit.spawn_time + FRUIT_DURATION_TICKS - self.tick)
+        if self.frightened_timer > 0: limit = min(limit, self.frightened_timer - 1)
+        elif self.current_wave < len(SCATTER_CHASE_WAVES):
+            switch_time = SCATTER_CHASE_WAVES[self.current_wave][0 if self.ghost_mode == GHOST_STATE_SCATTER else 1]
+            if switch_time != float('inf'): limit = min(limit, switch_time - self.scatter_chase_timer - 1)
+        if self.input_log is not None: limit = min(limit, -self.tick % self.input_log.checksum_interval or self.input_log.checksum_interval)
+        limit = p.linear_ticks(limit)
+        for ghost in self.ghosts:
+            if limit <= 0: return 0
+            state = ghost.state
+            if state == GHOST_STATE_IN_HOUSE: limit = min(limit, GHOST_HOUSE_TICKS[ghost.id] - ghost.in_house_timer - 1)
+            elif state == GHOST_STATE_EXITING and ghost.tile_pos == level.ghost_house_exit: return 0
+            elif state in (GHOST_STATE_CHASE, GHOST_STATE_SCATTER) and state != self.ghost_mode: return 0
+            if ghost is self.blinky and state not in (GHOST_STATE_FRIGHTENED, GHOST_STATE_EATEN) and ghost.speed != ghost.rage_speed_for(level): return 0
+            limit = ghost.linear_ticks(limit)
+            if state != GHOST_STATE_EATEN and state != GHOST_STATE_IN_HOUSE: limit = min(limit, self.contact_ticks(ghost, limit))
+        return max(limit, 0)
+
+    def contact_ticks(self, ghost, limit):
+        # 팩맨과 고스트가 둘 다 직선으로 움직일 때 충돌 거리 안으로 들어오기 전까지의 틱 수 (거리 제곱은 틱에 대한 2차식)
+        p = self.pacman
+        (px, py), (gx, gy) = p.fixed_pos(), ghost.fixed_pos()
+        rx, ry = px - gx, py - gy
+        vx, vy = p.direction.x * p.speed - ghost.direction.x * ghost.speed, p.direction.y * p.speed - ghost.direction.y * ghost.speed
+        # 남은 틱 동안 최대로 가까워져도 충돌 거리 밖이면 바로 끝낸다 (대부분 여기서 끝남)
+        gap = max(abs(rx), abs(ry)) - limit * (abs(vx) + abs(vy))
+        if gap > 0 and gap * gap >= COLLISION_DISTANCE_FIXED_SQ: return limit
+        a, b, c = vx * vx + vy * vy, 2 * (rx * vx + ry * vy), rx * rx + ry * ry - COLLISION_DISTANCE_FIXED_SQ
+        inside = lambda k: (a * k + b) * k + c < 0
+        if inside(1): return 0
+        if b >= -2 * a: return limit # 꼭짓점이 1 이하: 앞으로 멀어지기만 한다 (둘 다 멈춘 경우 포함)
+        top = -b // (2 * a) # 꼭짓점의 내림. 1..top 에서는 가까워지기만 하고, 가장 가까운 정수 틱은 top 이나 top+1
+        if not inside(top): return min(top, limit) if inside(top + 1) else limit
+        lo, hi = 1, top
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if inside(mid): hi = mid
+            else: lo = mid
+        return min(hi - 1, limit)
+
+    def skip_ticks(self, ticks):
+        # quiet_ticks() 가 허락한 만큼의 틱을 update() 없이 한 번에 진행한다
+        self.tick += ticks
+        if self.state == STATE_PAUSED:
+            self.pause_timer -= ticks
+        else:
+            self.pacman.glide(ticks)
+            for ghost in self.ghosts:
+                if ghost.state == GHOST_STATE_IN_HOUSE: ghost.in_house_timer += ticks
+                ghost.glide(ticks)
+            if self.frightened_timer > 0: self.frightened_timer -= ticks
+            else: self.scatter_chase_timer += ticks
+        if self.input_log is not None and self.tick % self.input_log.checksum_interval == 0:
+            self.input_log.record_checksum(self.tick, self.checksum())
     
     def handle_pellet_eating(self):
         eaten_val = self.level.eat_pellet(self.pacman.tile_pos)
@@ -561,23 +1197,25 @@ class GameController:
             
             pellets_eaten = self.level.total_pellets - self.level.pellet_count
 
+            # 과일 그림은 게임 상태에 영향이 없고 네트워크 상황에 따라 후보가 달라지므로 재현용 rng 를 쓰지 않는다.
             if self.fruit_spawn_level == 0 and pellets_eaten >= 10:
                 if self.fruit_images:
                     self.fruit.image = random.choice(self.fruit_images)
-                self.fruit.activate(Vector2(9, 12))
+                self.fruit.activate(self.level.fruit_pos, self.tick)
                 self.fruit_spawn_level = 1
             elif self.fruit_spawn_level == 1 and pellets_eaten >= 70:
                 if self.fruit_images:
                     self.fruit.image = random.choice(self.fruit_images)
-                self.fruit.activate(Vector2(9, 12))
+                self.fruit.activate(self.level.fruit_pos, self.tick)
                 self.fruit_spawn_level = 2
     
     def handle_fruit_events(self):
         if self.fruit.is_active:
-            if pygame.time.get_ticks() - self.fruit.spawn_time > 10000:
+            if self.tick - self.fruit.spawn_time > FRUIT_DURATION_TICKS:
                 self.fruit.is_active = False
             elif self.pacman.tile_pos == self.fruit.position:
                 self.pacman.score += 100
+                self.fruits_eaten += 1
                 self.fruit.is_active = False
 
     def frighten_ghosts(self):
@@ -585,25 +1223,19 @@ class GameController:
         for g in self.ghosts:
             if g.state != GHOST_STATE_EATEN:
                 g.state = GHOST_STATE_FRIGHTENED
-                g.speed = GHOST_FRIGHTENED_SPEED
+                g.speed = fixed_speed(GHOST_FRIGHTENED_SPEED)
 
     def update_ghosts(self):
         for ghost in self.ghosts:
             if ghost.state == GHOST_STATE_IN_HOUSE:
                 ghost.in_house_timer += 1
-                exit_condition = False
-                if ghost.id == 0: exit_condition = ghost.in_house_timer >= 1
-                elif ghost.id == 1: exit_condition = ghost.in_house_timer >= 4 * 60
-                elif ghost.id == 2: exit_condition = ghost.in_house_timer >= 8 * 60
-                elif ghost.id == 3: exit_condition = ghost.in_house_timer >= 12 * 60
-                
-                if exit_condition:
+                if ghost.in_house_timer >= GHOST_HOUSE_TICKS[ghost.id]:
                     ghost.state = GHOST_STATE_EXITING
 
             # FIXED: ghost speed bug - 집에서 나올 때 속도를 리셋
             if ghost.state == GHOST_STATE_EXITING and ghost.tile_pos == self.level.ghost_house_exit:
                 if self.frightened_timer > 0 and not ghost.is_immune:
-                    ghost.state, ghost.speed = GHOST_STATE_FRIGHTENED, GHOST_FRIGHTENED_SPEED
+                    ghost.state, ghost.speed = GHOST_STATE_FRIGHTENED, fixed_speed(GHOST_FRIGHTENED_SPEED)
                 else:
                     ghost.state = self.ghost_mode
                     ghost.speed = ghost.base_speed
@@ -618,9 +1250,8 @@ class GameController:
                         g.speed = g.base_speed
         else:
             self.scatter_chase_timer += 1
-            waves = [(7*60, 20*60), (7*60, 20*60), (5*60, 20*60), (float('inf'), 5*60)]
-            if self.current_wave < len(waves):
-                scatter_time, chase_time = waves[self.current_wave]
+            if self.current_wave < len(SCATTER_CHASE_WAVES):
+                scatter_time, chase_time = SCATTER_CHASE_WAVES[self.current_wave]
                 if (self.ghost_mode == GHOST_STATE_SCATTER and self.scatter_chase_timer >= scatter_time) or \
                    (self.ghost_mode == GHOST_STATE_CHASE and self.scatter_chase_timer >= chase_time):
                     self.ghost_mode = GHOST_STATE_CHASE if self.ghost_mode == GHOST_STATE_SCATTER else GHOST_STATE_SCATTER
@@ -630,22 +1261,88 @@ class GameController:
         for ghost in self.ghosts:
             if ghost.state not in [GHOST_STATE_FRIGHTENED, GHOST_STATE_EATEN, GHOST_STATE_IN_HOUSE, GHOST_STATE_EXITING]:
                 ghost.state = self.ghost_mode
-            ghost.update(self.pacman, self.blinky, self)
+        if not self.ghosts_batched:
+            for ghost in self.ghosts: ghost.update(self.pacman, self.blinky, self)
+            return
+        # Inky 는 이번 틱에 Blinky 가 움직인 뒤의 타일을 보므로, Blinky 까지와 그 뒤를 나눠 묶는다 (rng 는 두 묶음 모두 고스트 순서대로 쓴다)
+        ghosts, blinky = self.ghosts, self.blinky
+        split = next((i + 1 for i, g in enumerate(ghosts) if g is blinky), 0)
+        if split: self.step_ghosts(ghosts[:split])
+        self.step_ghosts(ghosts[split:] if split else ghosts)
+
+    def step_ghosts(self, ghosts):
+        # Ghost.update() 를 고스트마다 부른 것과 같은 결과를 묶음 단위로 낸다:
+        # 상태 정리 -> 타일 중앙에 있는 고스트를 모아 목표/방향 결정 -> 전부 이동.
+        # 추적 목표는 성격별로 이번 틱에 한 번만 계산하고, 방향은 (출구 마스크, 현재 방향) 표와 제곱 거리로 고른다.
+        level, pacman, blinky, exits = self.level, self.pacman, self.blinky, self.level.exits
+        width, height = level.width, level.height
+        centred = []
+        for ghost in ghosts:
+            state = ghost.state
+            if state != GHOST_STATE_FRIGHTENED and state != GHOST_STATE_EATEN and isinstance(ghost, Blinky): ghost.speed = ghost.rage_speed_for(level)
+            if state == GHOST_STATE_EATEN and ghost.tile_pos == ghost.start_pos: ghost.state, ghost.speed = GHOST_STATE_IN_HOUSE, ghost.base_speed
+            if not (ghost.offset.x or ghost.offset.y): centred.append(ghost)
+
+        pt, pd = pacman.tile_pos, pacman.direction
+        ahead = pivot = None
+        for ghost in centred:
+            state, tile, d = ghost.state, ghost.tile_pos, ghost.direction
+            x, y = tile.x, tile.y
+            mask = exits[y * width + x] if 0 <= y < height and 0 <= x < width else level.template.compute_exits(x, y)
+            valid, ordered = GHOST_CHOICES[(mask, d.x, d.y)]
+            if state == GHOST_STATE_FRIGHTENED:
+                if valid: ghost.direction = self.rng.choice(valid)
+            elif state == GHOST_STATE_EATEN: ghost.direction = level.nav.next_direction(tile, ghost.start_pos)
+            elif state == GHOST_STATE_EXITING: ghost.direction = level.nav.next_direction(tile, level.ghost_house_exit)
+            elif state == GHOST_STATE_CHASE or state == GHOST_STATE_SCATTER:
+                if state == GHOST_STATE_SCATTER: tx, ty = ghost.scatter_target.x, ghost.scatter_target.y
+                else:
+                    kind = CHASE_KINDS.get(type(ghost).get_chase_target)
+                    if kind == CHASE_DIRECT: tx, ty = pt.x, pt.y
+                    elif kind == CHASE_AHEAD:
+                        # 위쪽일 때 왼쪽으로도 4 칸 밀리는 원작의 오버플로 버그를 그대로 둔다
+                        if ahead is None: ahead = (pt.x - 4, pt.y - 4) if pd.x == 0 and pd.y == -1 else (pt.x + pd.x * 4, pt.y + pd.y * 4)
+                        tx, ty = ahead
+                    elif kind == CHASE_PIVOT:
+                        if pivot is None: pivot = (2 * (pt.x + pd.x * 2) - blinky.tile_pos.x, 2 * (pt.y + pd.y * 2) - blinky.tile_pos.y) if blinky else (pt.x, pt.y)
+                        tx, ty = pivot
+                    elif kind == CHASE_SHY:
+                        dx, dy = x - pt.x, y - pt.y
+                        tx, ty = (pt.x, pt.y) if dx * dx + dy * dy > 64 else (ghost.scatter_target.x, ghost.scatter_target.y)
+                    else:
+                        target = ghost.get_chase_target(pacman, blinky)
+                        if target is None: continue
+                        tx, ty = target.x, target.y
+                if ordered:
+                    best_dir, min_dist, bx, by = None, None, x - tx, y - ty
+                    for direction in ordered:
+                        dx, dy = bx + direction.x, by + direction.y
+                        dist = dx * dx + dy * dy
+                        if min_dist is None or dist < min_dist: min_dist, best_dir = dist, direction
+                    ghost.direction = best_dir
+            elif state == GHOST_STATE_IN_HOUSE: ghost.direction = ZERO
+
+        for ghost in ghosts: Entity.update(ghost)
 
     def check_collisions(self):
         pacman_died = False
-        for ghost in self.ghosts:
-            if (self.pacman.pixel_pos - ghost.pixel_pos).magnitude() < TILE_WIDTH * 0.75:
+        # 충돌 거리는 서브픽셀 좌표로 잰다
+        px, py = self.pacman.fixed_pos()
+        for ghost in self.ghost_index.near(px / SUBPIXELS, py / SUBPIXELS, COLLISION_DISTANCE):
+            tile, off = ghost.tile_pos, ghost.offset
+            dx = px - (tile.x * TILE_WIDTH + HALF_TILE_WIDTH) * SUBPIXELS - off.x
+            dy = py - (tile.y * TILE_HEIGHT + HALF_TILE_HEIGHT) * SUBPIXELS - off.y
+            if dx * dx + dy * dy < COLLISION_DISTANCE_FIXED_SQ:
                 if ghost.state == GHOST_STATE_FRIGHTENED:
                     ghost.is_immune = True
-                    ghost.state, ghost.speed = GHOST_STATE_EATEN, GHOST_EATEN_SPEED
+                    ghost.state, ghost.speed = GHOST_STATE_EATEN, fixed_speed(GHOST_EATEN_SPEED)
                     self.pacman.score += self.ghost_eaten_score; self.ghost_eaten_score *= 2
-                    path_to_nest = find_shortest_path_bfs(ghost.tile_pos, ghost.start_pos, self.level)
-                    if path_to_nest: ghost.calculated_path, ghost.path_index = path_to_nest, 1
+                    self.ghosts_eaten += 1
                 elif ghost.state not in [GHOST_STATE_EATEN, GHOST_STATE_IN_HOUSE]:
                     pacman_died = True
         
         if pacman_died:
+            self.deaths += 1
             self.pacman.lives -= 1
             if self.pacman.lives > 0:
                 self.reset_after_death()
@@ -653,22 +1350,120 @@ class GameController:
                 self.pacman.lives = 0
                 self.state = STATE_GAME_OVER
 
-    def draw(self):
-        self.screen.fill(BLACK)
-        if self.state == STATE_PLAYING or self.state == STATE_PAUSED:
-            self.level.draw(self.screen)
-            self.pacman.draw(self.screen)
-            self.fruit.draw(self.screen)
-            for ghost in self.ghosts:
-                ghost.draw(self.screen, self)
-            self.draw_ui()
+class GameController(GameEngine):
+    def __init__(self, seed=None, record_dir=None, sim_hz=SIM_HZ, fps=DISPLAY_FPS, level=None):
+        self.record_dir = record_dir
+        self.sim_hz, self.fps = sim_hz, fps
+        self.prev_positions, self.skipped_ticks = [], 0
+        self.frame_start = None # run() 이 프레임 일을 시작한 perf_counter() 시각 (metrics 가 프레임 일 시간을 잰다)
+        self.autopilot = None
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Pacman")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 28)
+        self.hud_cache, self.sprite_rects = {}, []
+        self.drawn_level, self.drawn_generation = None, 0
+        self.camera = Vector2() # 화면 왼쪽 위의 월드 픽셀 좌표. 화면보다 큰 맵에서 팩맨을 따라간다.
+        self.profiler = None
+        self.capture = None # capture.FrameCapture.attach() 가 채운다
+        self.trajectory = None # trajectory.TrajectoryWriter.attach() 가 채운다
         
-        pygame.display.flip()
+        super().__init__(seed, record=record_dir is not None, level=level)
+
+    def load_game_assets(self):
+        # 이미지는 프로세스 전체에서 한 번만 디코딩된 아틀라스를 공유한다 (재시작 비용 없음)
+        self.assets = get_assets()
+        self.ghost_images = self.assets.ghost_images
+
+        # 과일 이미지는 백그라운드에서 받아 오고, 그동안은 Fruit.draw 의 빨간 원으로 대신한다.
+        self.fruit_images = [_fruit_surfaces[name] for name in FRUIT_POKEMON_NAMES if name in _fruit_surfaces]
+        loader = get_sprite_loader()
+        self.pending_fruit_images = {name: loader.fetch(name) for name in FRUIT_POKEMON_NAMES if name not in _fruit_surfaces}
+
+    def poll_fruit_images(self):
+        for name, future in list(self.pending_fruit_images.items()):
+            if not future.done(): continue
+            del self.pending_fruit_images[name]
+            img = decode_sprite(name, future.result())
+            if img:
+                scaled_img = _fruit_surfaces[name] = pygame.transform.scale(img, (TILE_WIDTH, TILE_HEIGHT))
+                self.fruit_images.append(scaled_img)
+                if self.fruit.image is None: self.fruit.image = scaled_img
+
+    def update(self):
+        # 보간용으로 이번 틱 직전의 위치를 남겨 둔다.
+        self.prev_positions = [entity.fixed_pos() for entity in (self.pacman, *self.ghosts)]
+        super().update()
+
+    def draw(self, alpha=1.0):
+        if self.state == STATE_PLAYING or self.state == STATE_PAUSED:
+            full_redraw, dirty = self.draw_level(alpha)
+            rects = self.draw_entities(alpha)
+            rects.extend(self.draw_ui())
+            if self.profiler is not None and self.profiler.overlay:
+                rects.append(self.profiler.draw_overlay(self.screen))
+            self.sprite_rects = [rect for rect in rects if rect]
+            self.present(full_redraw, dirty + self.sprite_rects)
+        else:
+            self.screen.fill(BLACK)
+            self.drawn_level = None
+            pygame.display.flip()
+
+    def draw_level(self, alpha=1.0):
+        # 레벨이나 라운드가 바뀌었거나 카메라가 움직였을 때만 전체를 다시 그리고, 평소에는 지난 프레임의 흔적만 지운다.
+        moved = self.update_camera(alpha)
+        if moved or self.drawn_level is not self.level or self.drawn_generation != self.level.generation:
+            self.level.draw(self.screen, self.camera)
+            self.drawn_level, self.drawn_generation = self.level, self.level.generation
+            return True, []
+        return False, self.level.restore(self.screen, self.sprite_rects, self.camera)
+
+    def update_camera(self, alpha=1.0):
+        # 팩맨을 화면 가운데에 두되 맵 바깥은 보이지 않게 한다. 화면에 다 들어가는 맵은 (0, 0) 에 고정된다.
+        x, y = self.draw_pos(0, self.pacman, alpha)
+        cx = min(max(x - SCREEN_WIDTH // 2, 0), max(self.level.width * TILE_WIDTH - SCREEN_WIDTH, 0))
+        cy = min(max(y - SCREEN_HEIGHT // 2, 0), max(self.level.height * TILE_HEIGHT - SCREEN_HEIGHT, 0))
+        if cx == self.camera.x and cy == self.camera.y: return False
+        self.camera.set(cx, cy)
+        return True
+
+    def draw_pos(self, i, entity, alpha):
+        # 직전 틱과 현재 틱 사이를 alpha 비율로 보간한다. 터널 이동이나 리셋처럼 크게 튄 경우는 보간하지 않는다.
+        # 서브픽셀 좌표로 보간한 뒤 픽셀로 내림한다 (alpha=1 이면 pixel_pos 와 같다).
+        x, y = entity.fixed_pos()
+        if alpha < 1.0 and i < len(self.prev_positions):
+            px, py = self.prev_positions[i]
+            if abs(x - px) <= TILE_SUBPIXELS_X and abs(y - py) <= TILE_SUBPIXELS_Y:
+                x, y = px + (x - px) * alpha, py + (y - py) * alpha
+        return int(x // SUBPIXELS), int(y // SUBPIXELS)
+
+    def screen_pos(self, pos): return pos[0] - self.camera.x, pos[1] - self.camera.y
+
+    def draw_entities(self, alpha=1.0):
+        fruit_center = get_tile_center(self.fruit.position)
+        rects = [self.pacman.draw(self.screen, self.screen_pos(self.draw_pos(0, self.pacman, alpha))),
+                 self.fruit.draw(self.screen, self.screen_pos((fruit_center.x, fruit_center.y)))]
+        for i, ghost in enumerate(self.ghosts, 1):
+            rects.append(ghost.draw(self.screen, self, self.screen_pos(self.draw_pos(i, ghost, alpha))))
+        return rects
+
+    def present(self, full_redraw, rects):
+        if full_redraw: pygame.display.flip()
+        else: pygame.display.update(rects)
+
+    def render_hud_text(self, key, text, pos):
+        # 점수/라운드/목숨 글자는 값이 바뀔 때만 다시 렌더링한다.
+        cached = self.hud_cache.get(key)
+        if cached is None or cached[0] != text:
+            cached = self.hud_cache[key] = (text, self.font.render(text, True, WHITE))
+        return self.screen.blit(cached[1], pos)
 
     def draw_ui(self):
-        self.screen.blit(self.font.render(f"Score: {self.pacman.score}", True, WHITE), (10, 10))
-        self.screen.blit(self.font.render(f"Round: {self.round_level}", True, WHITE), (SCREEN_WIDTH // 2 - 60, 10))
-        self.screen.blit(self.font.render(f"Lives: {self.pacman.lives}", True, WHITE), (SCREEN_WIDTH - 120, 10))
+        return [self.render_hud_text('score', f"Score: {self.pacman.score}", (10, 10)),
+                self.render_hud_text('round', f"Round: {self.round_level}", (SCREEN_WIDTH // 2 - 60, 10)),
+                self.render_hud_text('lives', f"Lives: {self.pacman.lives}", (SCREEN_WIDTH - 120, 10))]
 
     def game_over_loop(self):
         button_width, button_height = 120, 50
@@ -711,27 +1506,101 @@ class GameController:
             pygame.display.flip()
             self.clock.tick(60)
 
+    def save_recording(self):
+        if self.input_log is None: return
+        self.input_log.end_tick = self.tick
+        os.makedirs(self.record_dir, exist_ok=True)
+        path = os.path.join(self.record_dir, f"pacman-{time.strftime('%Y%m%d-%H%M%S')}-{self.seed}.pmr")
+        self.input_log.save(path)
+        self.input_log = None
+        print(f"Recorded game to {path}")
+
+    def toggle_autopilot(self):
+        from autopilot import Autopilot # autopilot 이 pacman 을 import 하므로 필요할 때 불러온다
+        self.autopilot = None if self.autopilot else Autopilot()
+        if self.autopilot: self.autopilot.prepare(self)
+
+    def toggle_profiler_overlay(self):
+        if self.profiler is None: Profiler().attach(self)
+        self.profiler.overlay = not self.profiler.overlay
+
+    def export_profile(self):
+        if self.profiler is None: return
+        path = self.profiler.export_chrome_trace(f"pacman-trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        print(f"Wrote profile trace to {path}")
+
     def run(self):
         running = True
+        step_ms = 1000.0 / self.sim_hz
+        accumulator = 0.0
+        self.clock.tick() # 창을 띄우고 자원을 읽은 시간은 밀린 틱이 아니다
         while running:
+            # 지난 프레임 이후 흐른 시간만큼 고정 틱을 진행한다. 그리기가 느려도 게임 속도는 일정하다.
+            accumulator += self.clock.tick(self.fps)
+            self.frame_start = time.perf_counter()
             if self.state == STATE_GAME_OVER:
+                self.save_recording()
                 self.game_over_loop()
+                self.clock.tick()
+                accumulator = 0.0
             else: # STATE_PLAYING or STATE_PAUSED
+                if self.pending_fruit_images: self.poll_fruit_images()
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT: running = False
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_ESCAPE: running = False
-                        elif event.key == pygame.K_LEFT: self.pacman.set_direction(Vector2(-1,0))
-                        elif event.key == pygame.K_RIGHT: self.pacman.set_direction(Vector2(1,0))
-                        elif event.key == pygame.K_UP: self.pacman.set_direction(Vector2(0,-1))
-                        elif event.key == pygame.K_DOWN: self.pacman.set_direction(Vector2(0,1))
-                self.update()
-                self.draw()
-
-            self.clock.tick(60)
+                        elif event.key == pygame.K_F3: self.toggle_profiler_overlay()
+                        elif event.key == pygame.K_F4: self.export_profile()
+                        elif event.key == pygame.K_a: self.toggle_autopilot()
+                        elif event.key in KEY_ACTIONS: self.apply_action(KEY_ACTIONS[event.key])
+                steps = 0
+                while accumulator >= step_ms and steps < MAX_STEPS_PER_FRAME and self.state != STATE_GAME_OVER:
+                    if self.autopilot is not None: self.apply_action(self.autopilot(self))
+                    self.update()
+                    accumulator -= step_ms
+                    steps += 1
+                if steps == MAX_STEPS_PER_FRAME and accumulator >= step_ms: # 따라잡지 못한 틱은 세고 버린다 (나머지만 남긴다)
+                    self.skipped_ticks += int(accumulator // step_ms)
+                    accumulator %= step_ms
+                self.draw(accumulator / step_ms)
+        self.save_recording()
+        if self.capture is not None: print(f"Captured frames: {self.capture.close()}")
+        if self.trajectory is not None: self.trajectory.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == '__main__':
-    game = GameController()
+    sys.modules.setdefault('pacman', sys.modules['__main__']) # 다른 모듈의 import pacman 이 이 모듈을 다시 읽지 않도록
+    import argparse
+    parser = argparse.ArgumentParser(description="Pac-Man")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the first game")
+    parser.add_argument('--record', metavar='DIR', default=None, help="write an input log of every game to DIR")
+    parser.add_argument('--profile', action='store_true', help="time update/draw phases from the start (F3: overlay, F4: export trace)")
+    parser.add_argument('--fps', type=int, default=DISPLAY_FPS, help=f"display frame rate cap, 0 = uncapped (default {DISPLAY_FPS})")
+    parser.add_argument('--autopilot', action='store_true', help="let the built-in AI play (A toggles it in game)")
+    parser.add_argument('--level', metavar='FILE', default=None, help="maze file using the LEVEL_DATA tile codes, any size (the view scrolls)")
+    parser.add_argument('--sim-hz', type=int, default=SIM_HZ, help=f"simulation ticks per second (default {SIM_HZ}; game balance assumes {SIM_HZ})")
+    parser.add_argument('--capture', metavar='PATH', default=None, help="capture frames to a raw file, a PNG directory, or {output} of --capture-pipe")
+    parser.add_argument('--capture-pipe', metavar='CMD', default=None, help="encoder command reading raw frames on stdin (e.g. ffmpeg ... -i - {output})")
+    parser.add_argument('--trajectory', metavar='DIR', default=None, help="append every tick of every game to a trajectory dataset in DIR")
+    parser.add_argument('--metrics', metavar='PORT', type=int, default=None, help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+    if args.level:
+        try: load_level_template(args.level)
+        except (OSError, ValueError) as e: parser.error(f"cannot load level {args.level}: {e}")
+    metrics = None
+    if args.metrics is not None:
+        from metrics import Metrics
+        try: metrics = Metrics().instrument_loader(get_sprite_loader()).serve(args.metrics) # 첫 PokeAPI 요청보다 먼저 붙인다
+        except OSError as e: parser.error(f"cannot serve metrics on port {args.metrics}: {e}")
+    game = GameController(seed=args.seed, record_dir=args.record, sim_hz=args.sim_hz, fps=args.fps, level=args.level)
+    if metrics: metrics.attach(game)
+    if args.profile: Profiler().attach(game)
+    if args.autopilot: game.toggle_autopilot()
+    if args.capture:
+        from capture import FrameCapture, open_sink
+        FrameCapture(open_sink(args.capture, args.capture_pipe), fps=args.fps or DISPLAY_FPS).attach(game)
+    if args.trajectory:
+        from trajectory import TrajectoryWriter
+        TrajectoryWriter(args.trajectory, ghosts=len(game.ghosts)).attach(game)
     game.run()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+POKEAPI_URL = "https://pokeapi.co/api/v2/pokemon/"
+POKEAPI_TIMEOUT = (3.0, 5.0) # (연결, 읽기) 초. 오프라인에서 무한 대기하지 않도록 항상 지정한다.
+SPRITE_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'pacman', 'pokeapi')
+SPRITE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+SPRITE_CACHE_TTL = 7 * 24 * 60 * 60 # 초
+
+
+class SpriteCache:
+    # 포켓몬 이름별 스프라이트 PNG 를 디스크에 저장하는 캐시.
+    # 파일의 mtime 은 받아 온 시각(TTL 판정), atime 은 마지막 사용 시각(LRU 판정)으로 쓴다.
+    def __init__(self, directory=SPRITE_CACHE_DIR, max_bytes=SPRITE_CACHE_MAX_BYTES, ttl=SPRITE_CACHE_TTL):
+        self.directory, self.max_bytes, self.ttl = directory, max_bytes, ttl
+        self.lock = threading.Lock()
+
+    def path(self, name):
+        return os.path.join(self.directory, re.sub(r'[^a-z0-9_-]', '_', name.lower()) + '.png')
+
+    def get(self, name):
+        path = self.path(name)
+        with self.lock:
+            try:
+                fetched_at = os.stat(path).st_mtime
+                now = time.time()
+                if now - fetched_at > self.ttl:
+                    os.remove(path)
+                    return None
+                with open(path, 'rb') as f: data = f.read()
+                os.utime(path, (now, fetched_at))
+                return data
+            except OSError:
+                return None
+
+    def put(self, name, data):
+        path = self.path(name)
+        with self.lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f: f.write(data)
+                os.replace(tmp_path, path)
+                self.evict()
+            except OSError as e:
+                print(f"Warning: Could not write sprite cache for '{name}'. Error: {e}")
+
+    def evict(self):
+        entries, total = [], 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.png'):
+                st = entry.stat()
+                entries.append((st.st_atime, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes: break
+            os.remove(path)
+            total -= size
+
+
+class SpriteLoader:
+    # 스프라이트를 백그라운드 스레드에서 받아 오는 로더. fetch() 는 바로 Future 를 돌려주며,
+    # 결과는 PNG 바이트(실패 시 None)이다. 같은 이름은 프로세스 안에서 한 번만 요청한다.
+    def __init__(self, base_url=POKEAPI_URL, cache=None, timeout=POKEAPI_TIMEOUT, max_workers=3):
+        self.base_url, self.timeout = base_url, timeout
+        self.cache = cache if cache is not None else SpriteCache()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pokeapi')
+        self.local = threading.local()
+        self.futures, self.lock = {}, threading.Lock()
+
+    def session(self):
+        # 스레드마다 하나의 Session 을 재사용해 연결(keep-alive)을 유지한다.
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def fetch(self, name):
+        key = name.lower()
+        with self.lock:
+            future = self.futures.get(key)
+            if future is None or (future.done() and future.result() is None):
+                future = self.futures[key] = self.executor.submit(self.load, key)
+            return future
+
+    def load(self, name):
+        data = self.cache.get(name)
+        if data is not None: return data
+        data = self.download(name)
+        if data is not None: self.cache.put(name, data)
+        return data
+
+    def download(self, name):
+        try:
+            response = self.session().get(f"{self.base_url.rstrip('/')}/{name}", timeout=self.timeout)
+            response.raise_for_status()
+            image_url = response.json()['sprites']['other']['official-artwork']['front_default']
+
+            if not image_url:
+                print(f"Warning: No official artwork found for '{name}'.")
+                return None
+
+            image_response = self.session().get(image_url, timeout=self.timeout)
+            image_response.raise_for_status()
+            print(f"Successfully loaded '{name}' sprite from PokeAPI.")
+            return image_response.content
+
+        except (requests.exceptions.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Warning: Failed to load sprite for '{name}' from PokeAPI. Error: {e}")
+            return None
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_sprite_loader = None
+
+def get_sprite_loader():
+    global _sprite_loader
+    if _sprite_loader is None: _sprite_loader = SpriteLoader()
+    return _sprite_loader
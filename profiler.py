@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import pygame
+
+# 프레임 구간별 타이머. attach() 한 게임의 메서드들을 인스턴스 단위로 감싸서 시간을 재므로,
+# 붙이지 않았을 때는 게임 코드에 추가 비용이 전혀 없다.
+UPDATE_PHASES = ('update', 'handle_pellet_eating', 'update_ghosts', 'handle_fruit_events', 'check_collisions')
+DRAW_PHASES = ('draw', 'draw_level', 'draw_entities', 'draw_ui', 'present')
+OVERLAY_REFRESH_FRAMES = 30
+
+
+class Profiler:
+    def __init__(self, history=600, max_events=50000):
+        self.history_size = history
+        self.histories = {}
+        self.events = deque(maxlen=max_events) # (이름, 시작 ns, 길이 ns) - Chrome trace 용
+        self.origin = time.perf_counter_ns()
+        self.tid = threading.get_ident()
+        self.game, self.overlay = None, False
+        self.overlay_surface, self.overlay_age, self.font = None, OVERLAY_REFRESH_FRAMES, None
+        # 감싼 자리: (객체, 속성, 감싸기 전 인스턴스 값 또는 None, 감싼 함수). detach() 는 이것만 되돌린다.
+        # 팩맨/고스트는 init_game 마다 바뀌므로 따로 들고 있다가 다시 감쌀 때 비운다.
+        self.installed, self.entity_installed = [], []
+
+    def history(self, name):
+        history = self.histories.get(name)
+        if history is None:
+            history = self.histories[name] = deque(maxlen=self.history_size)
+        return history
+
+    def wrap(self, name, func):
+        history, events, clock = self.history(name), self.events, time.perf_counter_ns
+        def timed(*args, **kwargs):
+            # 떼어 낸 뒤에도 다른 모듈(metrics, capture 등)이 이 위에 감싸 두어 되돌리지 못한 경우에는 그대로 넘긴다
+            if self.game is None: return func(*args, **kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = clock() - start
+                history.append(duration)
+                events.append((name, start, duration))
+        timed.__wrapped__, timed.profiler = func, self
+        return timed
+
+    def install(self, obj, attr, wrapper, installed):
+        installed.append((obj, attr, obj.__dict__.get(attr), wrapper))
+        setattr(obj, attr, wrapper)
+
+    def wrap_method(self, obj, attr, name, installed=None):
+        # 다른 모듈이 감싼 메서드(__wrapped__ 가 있어도)는 그 위에 다시 감싼다. 이 프로파일러가 이미 감싼 것만 건너뛴다.
+        if getattr(obj.__dict__.get(attr), 'profiler', None) is self: return
+        self.install(obj, attr, self.wrap(name, getattr(obj, attr)), self.installed if installed is None else installed)
+
+    def attach(self, game):
+        self.game = game
+        for phase in UPDATE_PHASES + DRAW_PHASES:
+            if hasattr(game, phase): self.wrap_method(game, phase, phase)
+        # 팩맨/고스트 객체는 init_game 마다 새로 만들어지므로 그때마다 다시 감싼다.
+        init_game = game.init_game
+        def init_and_attach(*args, **kwargs):
+            result = init_game(*args, **kwargs)
+            self.attach_entities()
+            return result
+        init_and_attach.__wrapped__, init_and_attach.profiler = init_game, self
+        self.install(game, 'init_game', init_and_attach, self.installed)
+        self.attach_entities()
+        game.profiler = self
+        return self
+
+    def attach_entities(self):
+        game = self.game
+        installed = self.entity_installed = [entry for entry in self.entity_installed if entry[0] is game.pacman or entry[0] in game.ghosts]
+        self.wrap_method(game.pacman, 'update', 'pacman.update', installed)
+        for ghost in game.ghosts:
+            self.wrap_method(ghost, 'update', f'ghost.{type(ghost).__name__}.update', installed)
+        # 묶음 처리(step_ghosts)는 ghost.update 를 부르지 않으므로, 감싼 동안에는 고스트마다 update() 를 부르는 경로로 돈다 (결과는 같다)
+        if hasattr(game, 'refresh_ghost_batching'): game.refresh_ghost_batching()
+
+    def detach(self):
+        # 이 프로파일러가 감싼 자리만, 감싼 뒤 아무도 그 위를 덮지 않았으면 감싸기 전 값으로 되돌린다 (다른 모듈의 감싸기는 그대로 둔다)
+        game = self.game
+        for obj, attr, previous, wrapper in reversed(self.installed + self.entity_installed):
+            if obj.__dict__.get(attr) is not wrapper: continue
+            if previous is None: delattr(obj, attr)
+            else: setattr(obj, attr, previous)
+        self.installed, self.entity_installed = [], []
+        if hasattr(game, 'refresh_ghost_batching'): game.refresh_ghost_batching()
+        game.profiler, self.game = None, None
+
+    def percentiles(self, name):
+        samples = sorted(self.histories.get(name, ()))
+        if not samples: return 0.0, 0.0
+        p50 = samples[len(samples) // 2]
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return p50 / 1e6, p99 / 1e6
+
+    def summary(self):
+        # 아직 한 번도 불리지 않은 구간은 보여 주지 않는다
+        return {name: self.percentiles(name) for name, history in self.histories.items() if history}
+
+    def draw_overlay(self, screen):
+        # 글자 렌더링은 비싸므로 몇 프레임마다 한 번만 다시 만든다.
+        self.overlay_age += 1
+        if self.overlay_surface is None or self.overlay_age >= OVERLAY_REFRESH_FRAMES:
+            self.overlay_age = 0
+            if self.font is None: self.font = pygame.font.SysFont('monospace', 13)
+            font = self.font
+            lines = [f"{'phase':<22}{'p50':>7}{'p99':>7} ms"]
+            for name, (p50, p99) in sorted(self.summary().items()):
+                lines.append(f"{name:<22}{p50:7.3f}{p99:7.3f}")
+            line_height = font.get_linesize()
+            width = max(font.size(line)[0] for line in lines) + 8
+            self.overlay_surface = pygame.Surface((width, line_height * len(lines) + 8), pygame.SRCALPHA)
+            self.overlay_surface.fill((0, 0, 0, 190))
+            for i, line in enumerate(lines):
+                self.overlay_surface.blit(font.render(line, True, (0, 255, 0)), (4, 4 + i * line_height))
+        return screen.blit(self.overlay_surface, (4, 40))
+
+    def export_chrome_trace(self, path):
+        # chrome://tracing / Perfetto 에서 열 수 있는 trace-event JSON
+        trace = [{'name': name, 'ph': 'X', 'ts': (start - self.origin) / 1000, 'dur': duration / 1000, 'pid': os.getpid(), 'tid': self.tid}
+                 for name, start, duration in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+def check_attach(frames=120):
+    # metrics, trajectory, capture, profiler 를 한 게임에 같이 붙이고 profiler 만 떼어 낸 뒤에도 나머지가 그대로 도는지 본다.
+    import tempfile
+    import capture, metrics, pacman, trajectory
+    game = pacman.GameController(seed=1, fps=0)
+    def play(n):
+        for _ in range(n):
+            game.update()
+            game.draw()
+    def counts(): return sum(meter.frame_time.counts), meter.games, writer.rows + writer.buffered, frames_out.captured
+    with tempfile.TemporaryDirectory() as tmp:
+        meter = metrics.Metrics().attach(game)
+        writer = trajectory.TrajectoryWriter(os.path.join(tmp, 'trajectory')).attach(game)
+        frames_out = capture.FrameCapture(capture.RawSink(os.path.join(tmp, 'frames.raw')), drop=False).attach(game)
+        profiler = Profiler().attach(game)
+        play(frames)
+        missing = [phase for phase in UPDATE_PHASES + DRAW_PHASES if not profiler.histories.get(phase)]
+        if missing: raise AssertionError(f"profiler skipped phases wrapped by other modules: {missing}")
+        hooks = {attr: game.__dict__.get(attr) for attr in ('draw', 'present', 'update', 'apply_action', 'init_game', 'quiet_ticks')}
+        profiler.detach()
+        left = [attr for attr, hook in hooks.items() if getattr(game.__dict__.get(attr), 'profiler', None) is profiler]
+        if left: raise AssertionError(f"profiler hooks left after detach: {left}")
+        gone = [attr for attr in hooks if game.__dict__.get(attr) is None]
+        if gone: raise AssertionError(f"detach removed other modules' hooks: {gone}")
+        samples = {name: len(history) for name, history in profiler.histories.items()}
+        before = counts()
+        game.init_game(2)
+        play(frames)
+        after = counts()
+        stalled = [name for name, old, new in zip(('frames', 'games', 'trajectory rows', 'captured'), before, after) if new <= old]
+        if stalled: raise AssertionError(f"stopped after profiler.detach(): {stalled}")
+        if {name: len(history) for name, history in profiler.histories.items()} != samples: raise AssertionError("profiler kept timing after detach()")
+        frames_out.close()
+        writer.close()
+    pygame.quit()
+    return {'frames': after[0], 'games': after[1], 'trajectory_rows': after[2], 'captured': after[3], 'phases': len(samples)}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Frame phase profiler.")
+    parser.add_argument('--check', action='store_true', help="attach metrics, trajectory, capture and the profiler together, then detach the profiler")
+    args = parser.parse_args()
+    if args.check:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        print(f"OK: {check_attach()}")
+    else:
+        parser.print_help()
@@ -0,0 +1,75 @@
+import sys
+import time
+
+import pacman
+from inputlog import InputLog, ReplayDesyncError
+
+
+def level_path(log, level=None):
+    # 기록한 판의 미로 파일 (기본 맵이면 None). 파일을 옮겼으면 level 로 새 경로를 준다.
+    return level or log.level_path or None
+
+
+def check_level(log, engine):
+    # 기록과 다른 미로에서는 재생이 어긋나므로 돌리지 않는다 (버전 2 기록은 미로를 모르므로 확인하지 않는다)
+    if log.level_crc is not None and engine.level.template.checksum != log.level_crc:
+        raise ValueError(f"log was recorded on a different maze ({log.level_path or 'the built-in maze'}, checksum {log.level_crc:08x}, "
+                         f"this one is {engine.level.template.checksum:08x})")
+
+
+def replay(log, until_tick=None, verify=True, engine=None, level=None):
+    # 기록된 판을 프레임 제한 없이 다시 돌려 until_tick(기본: 기록 끝)까지 빨리 감은 엔진을 돌려준다.
+    engine = engine or pacman.GameEngine(seed=log.seed, level=level_path(log, level))
+    check_level(log, engine)
+    end = log.end_tick if until_tick is None else min(until_tick, log.end_tick)
+    inputs, i = log.inputs, 0
+    while engine.tick < end:
+        while i < len(inputs) and inputs[i][0] == engine.tick:
+            engine.pacman.set_direction(pacman.ACTION_DIRECTIONS[inputs[i][1]]); i += 1
+        engine.update()
+        expected = log.checksums.get(engine.tick)
+        if verify and expected is not None:
+            actual = engine.checksum()
+            if actual != expected: raise ReplayDesyncError(engine.tick, expected, actual)
+    return engine
+
+
+def watch(log, from_tick=0, level=None):
+    # from_tick 까지 빨리 감은 뒤 창에서 나머지를 60fps 로 재생한다.
+    game = pacman.GameController(seed=log.seed, level=level_path(log, level))
+    replay(log, from_tick, engine=game)
+    inputs = [entry for entry in log.inputs if entry[0] >= game.tick]
+    i = 0
+    while game.tick < log.end_tick:
+        for event in pacman.pygame.event.get():
+            if event.type == pacman.pygame.QUIT or (event.type == pacman.pygame.KEYDOWN and event.key == pacman.pygame.K_ESCAPE):
+                return
+        while i < len(inputs) and inputs[i][0] == game.tick:
+            game.pacman.set_direction(pacman.ACTION_DIRECTIONS[inputs[i][1]]); i += 1
+        game.update()
+        game.draw()
+        game.clock.tick(60)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay a recorded pacman game.")
+    parser.add_argument('log')
+    parser.add_argument('--tick', type=int, default=None, help="fast-forward to this tick")
+    parser.add_argument('--watch', action='store_true', help="show the game in a window from --tick on")
+    parser.add_argument('--level', metavar='FILE', default=None, help="maze file to use instead of the path stored in the log")
+    args = parser.parse_args()
+
+    log = InputLog.load(args.log)
+    try:
+        if args.watch:
+            watch(log, args.tick or 0, args.level)
+            sys.exit()
+        start = time.perf_counter()
+        engine = replay(log, args.tick, level=args.level)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot replay {args.log}: {e}")
+    elapsed = time.perf_counter() - start
+    verified = sum(1 for tick in log.checksums if tick <= engine.tick)
+    print(f"seed {log.seed}: replayed {engine.tick} ticks in {elapsed * 1000:.1f} ms, {verified} checksums verified")
+    print(engine.get_state())
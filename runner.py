@@ -0,0 +1,193 @@
+# 헤드리스 게임 여러 판을 프로세스 풀에 나눠 돌리는 러너 (봇 대전, 밸런스 스윕용)
+#
+#   python runner.py --episodes 200                                   # 기본 정책(wander)으로 200판
+#   python runner.py --episodes 100 --set GHOST_BASE_SPEED=2.0,2.2,2.4 # 설정값마다 100판씩
+#   python runner.py --policy mybot:make_policy --jsonl results.jsonl
+#   python runner.py --fast-forward                                   # 팩맨이 타일 중앙에 있을 때만 정책을 부른다
+#
+# 정책은 'module:factory' 문자열로 넘긴다. factory(seed) 는 판마다 한 번 불려 policy(engine) -> ACTION_* 함수를 돌려준다.
+# --fast-forward 는 GameEngine.fast_forward() 로 그 사이 틱을 건너뛰므로, 타일 중앙이 아닐 때 ACTION_NONE 만 내는
+# 정책(wander, autopilot 등)에서는 결과가 틱 단위 진행과 같다.
+import ast
+import importlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+import types
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # stdout 은 JSON 결과 전용
+import pacman
+
+DEFAULT_POLICY = 'runner:wander'
+DEFAULT_MAX_TICKS = 60 * 60 * 10 # 10분 (60틱 = 1초)
+RESULT_FIELDS = ('score', 'round', 'deaths', 'ticks')
+DIRECTION_ACTIONS = {direction: action for action, direction in pacman.ACTION_DIRECTIONS.items()}
+
+
+def wander(seed):
+    # 기본 정책: 갈림길마다 되돌아가지 않는 방향 중 하나를 무작위로 고른다. 게임 rng 와는 별개의 rng 를 쓴다.
+    rng = random.Random(seed)
+    def policy(engine):
+        p = engine.pacman
+        if not p.at_tile_center(): return pacman.ACTION_NONE
+        choices = [d for d in pacman.DIRECTIONS if not engine.level.is_wall_at(p.tile_pos.x + d.x, p.tile_pos.y + d.y)]
+        forward = [d for d in choices if d.x != -p.direction.x or d.y != -p.direction.y]
+        if forward: choices = forward
+        return DIRECTION_ACTIONS[rng.choice(choices)] if choices else pacman.ACTION_NONE
+    return policy
+
+
+def load_policy(spec):
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'make_policy')
+
+
+def runtime_constants():
+    # 함수/메서드 안에서 읽는 이름들. import 할 때만 쓰이거나(다른 상수 계산) 아무도 읽지 않는 상수는 바꿔도 게임에 영향이 없다.
+    names, codes = set(), [c for c in compile(inspect.getsource(pacman), pacman.__file__, 'exec').co_consts if isinstance(c, types.CodeType)]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+    return names
+
+
+def derived_constants():
+    # 모듈/클래스 본문에서 다른 상수를 계산하는 데 쓰인 이름 -> 그 값으로 import 때 정해진 이름들.
+    # 예: COLLISION_DISTANCE -> COLLISION_DISTANCE_FIXED_SQ. 원래 이름만 바꾸면 이쪽 값은 그대로 남는다.
+    derived, bodies = {}, [('', ast.parse(inspect.getsource(pacman)).body)]
+    while bodies:
+        scope, body = bodies.pop()
+        for node in body:
+            if isinstance(node, ast.ClassDef): bodies.append((node.name + '.', node.body))
+            elif isinstance(node, ast.Assign):
+                targets = [scope + t.id for target in node.targets for t in ast.walk(target) if isinstance(t, ast.Name)]
+                for name in ast.walk(node.value):
+                    if isinstance(name, ast.Name) and name.id.isupper(): derived.setdefault(name.id, set()).update(targets)
+    return derived
+
+
+def check_overrides(overrides):
+    used = derived = None
+    for name in overrides:
+        if not name.isupper() or not hasattr(pacman, name): raise ValueError(f"unknown pacman constant: {name}")
+        if used is None: used, derived = runtime_constants(), derived_constants()
+        if name in derived:
+            raise ValueError(f"pacman constant {name} is baked into {', '.join(sorted(derived[name]))} at import time, "
+                             f"overriding it alone would leave those stale")
+        if name not in used: raise ValueError(f"pacman constant {name} is not used by the game, overriding it has no effect")
+
+
+def play_episode(seed, policy, max_ticks=DEFAULT_MAX_TICKS, fast_forward=False):
+    engine = pacman.GameEngine(seed=seed)
+    while engine.state != pacman.STATE_GAME_OVER and engine.tick < max_ticks:
+        action = policy(engine)
+        if action: engine.apply_action(action)
+        if fast_forward: engine.fast_forward(max_ticks - engine.tick)
+        else: engine.update()
+    return {'score': engine.pacman.score, 'round': engine.round_level, 'deaths': engine.deaths,
+            'ticks': engine.tick, 'game_over': engine.state == pacman.STATE_GAME_OVER}
+
+
+def run_episode(task):
+    # 워커 프로세스에서 한 판을 돌린다. 오버라이드는 이 판 동안만 pacman 모듈 상수에 적용하고 되돌린다.
+    episode, seed, overrides, policy_spec, max_ticks, fast_forward = task
+    saved = {name: getattr(pacman, name) for name in overrides}
+    start = time.perf_counter()
+    try:
+        for name, value in overrides.items(): setattr(pacman, name, value)
+        result = play_episode(seed, load_policy(policy_spec)(seed), max_ticks, fast_forward)
+    finally:
+        for name, value in saved.items(): setattr(pacman, name, value)
+    result.update(episode=episode, seed=seed, config=overrides, seconds=time.perf_counter() - start)
+    return result
+
+
+def make_tasks(episodes, configs=({},), base_seed=0, policy=DEFAULT_POLICY, max_ticks=DEFAULT_MAX_TICKS, fast_forward=False):
+    # 판 번호로 시드를 정하므로 어느 워커가 어떤 순서로 돌려도 같은 판이 나온다. 설정끼리는 같은 시드 묶음을 쓴다.
+    seeds = random.Random(base_seed)
+    seeds = [seeds.randrange(2**32) for _ in range(episodes)]
+    tasks = []
+    for overrides in configs:
+        check_overrides(overrides)
+        tasks.extend((len(tasks), seed, dict(overrides), policy, max_ticks, fast_forward) for seed in seeds)
+    return tasks
+
+
+def run_episodes(tasks, processes=None, chunksize=1):
+    # 끝나는 순서대로 결과를 하나씩 내보낸다.
+    if processes == 1:
+        for task in tasks: yield run_episode(task)
+        return
+    with multiprocessing.get_context('fork' if sys.platform.startswith('linux') else 'spawn').Pool(processes) as pool:
+        yield from pool.imap_unordered(run_episode, tasks, chunksize)
+
+
+def summarize(results):
+    # 설정별로 점수/라운드/죽음/틱 통계를 모은다.
+    groups = {}
+    for result in results:
+        groups.setdefault(json.dumps(result['config'], sort_keys=True), []).append(result)
+    summary = []
+    for key, group in groups.items():
+        stats = {'config': json.loads(key), 'episodes': len(group),
+                 'game_over_rate': sum(r['game_over'] for r in group) / len(group)}
+        for field in RESULT_FIELDS:
+            values = [r[field] for r in group]
+            stats[field] = {'mean': statistics.fmean(values), 'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+                            'min': min(values), 'median': statistics.median(values), 'max': max(values)}
+        summary.append(stats)
+    return summary
+
+
+def parse_overrides(items):
+    # ['GHOST_BASE_SPEED=2.0,2.2', 'GHOST_SPEED_STEP=0.1,0.15'] -> 모든 조합의 설정 목록
+    axes = []
+    for item in items:
+        name, _, values = item.partition('=')
+        current = getattr(pacman, name, None)
+        kind = type(current) if isinstance(current, (int, float)) else float
+        axes.append([(name, kind(value)) for value in values.split(',')])
+    return [dict(combo) for combo in itertools.product(*axes)] or [{}]
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Play many headless pacman games in parallel.")
+    parser.add_argument('--episodes', type=int, default=100, help="games per configuration (default 100)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed for the episode seeds")
+    parser.add_argument('--policy', default=DEFAULT_POLICY, help=f"'module:factory' (default {DEFAULT_POLICY})")
+    parser.add_argument('--max-ticks', type=int, default=DEFAULT_MAX_TICKS, help="stop a game after this many ticks")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2', help="override a pacman constant; several --set form a grid")
+    parser.add_argument('--fast-forward', action='store_true', help="skip ticks between Pac-Man's tile centres (policy is only asked there)")
+    parser.add_argument('--jsonl', help="append every episode result to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        tasks = make_tasks(args.episodes, parse_overrides(args.set), args.seed, args.policy, args.max_ticks, args.fast_forward)
+        load_policy(args.policy)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+    results, start = [], time.perf_counter()
+    out = open(args.jsonl, 'a') if args.jsonl else None
+    try:
+        for result in run_episodes(tasks, args.processes):
+            results.append(result)
+            if out: out.write(json.dumps(result) + '\n')
+            print(f"\r{len(results)}/{len(tasks)} episodes", end='', file=sys.stderr)
+    finally:
+        if out: out.close()
+    elapsed = time.perf_counter() - start
+    print(f"\r{len(results)} episodes, {sum(r['ticks'] for r in results) / elapsed:.0f} ticks/s in {elapsed:.1f} s", file=sys.stderr)
+    print(json.dumps(summarize(results), indent=2))
+
+
+if __name__ == '__main__':
+    main()
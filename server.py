@@ -0,0 +1,464 @@
+# 관전/원격 플레이 서버: 한 프로세스에서 여러 판(room)을 asyncio 로 돌리며, 판마다 수백 명의 관전자에게 상태를 스트리밍하고
+# 플레이어 한 명의 방향 입력을 받는다. 같은 포트로 일반 TCP 와 WebSocket 을 모두 받는다 (첫 4 바이트가 'GET ' 이면 WebSocket).
+#
+#   python server.py --port 8765                 # 서버 (판은 첫 클라이언트가 들어올 때 만들어진다)
+#   python server.py --check                     # 루프백에서 플레이어 1 + 관전자 여럿(TCP/WS, 느린 소비자 포함)으로 자체 검증
+#
+# 메시지 (리틀 엔디언). TCP 는 u32 길이 접두어로, WebSocket 은 바이너리 프레임 하나에 메시지 하나를 싣는다.
+#   클라이언트 -> 서버
+#     HELLO    u8 0, room u16, role u8            role: 0 관전, 1 플레이 (판마다 플레이어는 먼저 온 한 명, 나머지는 관전)
+#     INPUT    u8 3, action u8                    플레이어의 ACTION_*
+#   서버 -> 클라이언트
+#     KEYFRAME u8 1, tick u32, 상태, width u16, height u16, 과일 x/y i16, 맵 길이 u32 + zlib 맵, 엔티티 수 u16 + 엔티티들
+#     DELTA    u8 2, tick u32, 플래그 u8 + 바뀐 상태 값들, 바뀐 엔티티 수 u16 + 엔티티들, 먹은 펠릿 수 u16 + 타일 인덱스 u32 들
+#   상태   = game state u8, score u32, lives u8, round u16, fruit active u8 (델타에서는 플래그 비트 0..4 가 켜진 것만)
+#   엔티티 = index u16, x i32, y i32, direction u8, ghost state u8   (0 은 팩맨, 1.. 은 고스트. x/y 는 서브픽셀 좌표)
+# 델타는 틱마다 한 번만 인코딩하고 모든 클라이언트가 같은 bytes 를 공유한다. 클라이언트마다 보낼 큐는 크기가 정해져 있어서,
+# 넘치면(느린 소비자) 그 클라이언트의 큐를 비우고 델타를 건너뛰다가 다 보내고 나면 키프레임 하나로 다시 맞춘다.
+# 시뮬레이션은 어떤 클라이언트도 기다리지 않는다.
+import argparse
+import asyncio
+import base64
+import hashlib
+import os
+import random
+import socket
+import statistics
+import struct
+import sys
+import time
+import zlib
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pacman
+
+HELLO, KEYFRAME, DELTA, INPUT = 0, 1, 2, 3
+ROLE_WATCH, ROLE_PLAY = 0, 1
+LENGTH = struct.Struct('<I')
+HELLO_MESSAGE, INPUT_MESSAGE = struct.Struct('<BHB'), struct.Struct('<BB')
+HEAD = struct.Struct('<BI')
+SCALARS = struct.Struct('<BIBHB')
+SCALAR_FIELDS = tuple(struct.Struct('<' + code) for code in 'BIBHB') # 델타 플래그 비트 순서
+LEVEL_HEAD = struct.Struct('<HHhhI')
+COUNT = struct.Struct('<H')
+ENTITY = struct.Struct('<HiiBB')
+PELLET = struct.Struct('<I')
+
+QUEUE_LIMIT = 240 # 클라이언트마다 밀려 있을 수 있는 메시지 수 (60Hz 로 4초). 넘치면 키프레임으로 다시 맞춘다.
+SEND_BUFFER = 64 * 1024 # 연결마다 커널/전송 버퍼 상한. 느린 소비자가 메모리를 잡아먹지 않게 한다.
+MAX_MESSAGE = 1024 # 클라이언트가 보내는 메시지 최대 크기
+GAME_OVER_RESTART_TICKS = 3 * 60
+WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def game_view(engine):
+    # -> (상태 튜플, 엔티티 튜플 리스트). 키프레임/델타와 클라이언트 쪽 Mirror 가 같은 모양을 쓴다.
+    p = engine.pacman
+    scalars = (engine.state, p.score, p.lives, engine.round_level, int(engine.fruit.is_active))
+    entities = []
+    for entity in (p, *engine.ghosts):
+        x, y = entity.fixed_pos()
+        d = entity.direction
+        entities.append((x, y, pacman.DIRECTION_CODES[(d.x, d.y)], getattr(entity, 'state', 0)))
+    return scalars, entities
+
+
+def encode_keyframe(engine, view=None):
+    level = engine.level
+    scalars, entities = view or game_view(engine)
+    packed_map = zlib.compress(bytes(level.map), 1)
+    parts = [HEAD.pack(KEYFRAME, engine.tick), SCALARS.pack(*scalars),
+             LEVEL_HEAD.pack(level.width, level.height, level.fruit_pos.x, level.fruit_pos.y, len(packed_map)), packed_map, COUNT.pack(len(entities))]
+    parts += [ENTITY.pack(i, *entity) for i, entity in enumerate(entities)]
+    return b''.join(parts)
+
+
+# --- WebSocket (RFC 6455) 최소 구현: 바이너리 메시지, ping/pong, close. 조각난(fragmented) 메시지는 받지 않는다. ---
+def ws_frame(payload, opcode=2, mask=None):
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    bit = 0x80 if mask else 0
+    if n < 126: head += bytes([bit | n])
+    elif n < 1 << 16: head += bytes([bit | 126]) + struct.pack('>H', n)
+    else: head += bytes([bit | 127]) + struct.pack('>Q', n)
+    if mask: head, payload = head + mask, ws_unmask(payload, mask)
+    return head + payload
+
+
+def ws_unmask(data, mask):
+    key = int.from_bytes((mask * (len(data) // 4 + 1))[:len(data)], 'little')
+    return (int.from_bytes(data, 'little') ^ key).to_bytes(len(data), 'little')
+
+
+async def ws_read_frame(reader, limit=None):
+    # -> (opcode, payload)
+    b0, b1 = await reader.readexactly(2)
+    opcode, n = b0 & 0x0F, b1 & 0x7F
+    if not b0 & 0x80: raise ValueError("fragmented websocket messages are not supported")
+    if n == 126: n = struct.unpack('>H', await reader.readexactly(2))[0]
+    elif n == 127: n = struct.unpack('>Q', await reader.readexactly(8))[0]
+    if limit is not None and n > limit: raise ValueError(f"websocket frame too large ({n} bytes)")
+    mask = await reader.readexactly(4) if b1 & 0x80 else None
+    payload = await reader.readexactly(n)
+    return opcode, ws_unmask(payload, mask) if mask else payload
+
+
+def ws_accept(key): return base64.b64encode(hashlib.sha1(key.encode('ascii') + WS_GUID).digest()).decode('ascii')
+
+
+def parse_headers(request):
+    lines = request.decode('latin-1').split('\r\n')
+    return lines[0], {name.strip().lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+
+
+class Connection:
+    # 서버 쪽 클라이언트 하나: 보낼 프레임 큐와 그것을 소켓으로 내보내는 태스크
+    def __init__(self, reader, writer, websocket, queue_limit=QUEUE_LIMIT):
+        self.reader, self.writer, self.websocket = reader, writer, websocket
+        self.queue = asyncio.Queue(queue_limit)
+        self.resync = True # 키프레임이 필요하다 (처음 들어왔거나 밀려서 델타를 버렸을 때)
+        self.dropped = 0
+        self.sender = asyncio.ensure_future(self.send_loop())
+
+    def frame(self, message): return ws_frame(message) if self.websocket else LENGTH.pack(len(message)) + message
+
+    def push(self, frames, message):
+        # frames: 이번 메시지를 형식별로 한 번만 감싸 두는 dict (모든 클라이언트가 공유)
+        if self.resync: return
+        frame = frames.get(self.websocket)
+        if frame is None: frame = frames[self.websocket] = self.frame(message)
+        try: self.queue.put_nowait(frame)
+        except asyncio.QueueFull: # 느린 소비자: 밀린 델타를 버리고 다 보낸 뒤 키프레임으로 다시 맞춘다
+            while not self.queue.empty(): self.queue.get_nowait()
+            self.resync = True
+            self.dropped += 1
+
+    async def send_loop(self):
+        queue, writer = self.queue, self.writer
+        while True:
+            chunks = [await queue.get()]
+            while not queue.empty(): chunks.append(queue.get_nowait()) # 밀린 것은 한 번에 쓴다
+            writer.write(b''.join(chunks))
+            await writer.drain()
+
+    async def read_message(self):
+        # -> 메시지 bytes, 연결이 끝나면 None
+        if not self.websocket:
+            n = LENGTH.unpack(await self.reader.readexactly(LENGTH.size))[0]
+            if n > MAX_MESSAGE: raise ValueError(f"message too large ({n} bytes)")
+            return await self.reader.readexactly(n)
+        while True:
+            opcode, payload = await ws_read_frame(self.reader, MAX_MESSAGE)
+            if opcode == 2: return payload
+            if opcode == 8:
+                self.writer.write(ws_frame(payload[:2], 8))
+                return None
+            if opcode == 9: self.writer.write(ws_frame(payload, 10))
+
+    def close(self):
+        self.sender.cancel()
+        self.writer.close()
+
+
+class Room:
+    # 판 하나: 엔진과 그 판의 클라이언트들. run() 은 GameController.run 과 같은 고정 틱 루프를 asyncio 로 돈다.
+    def __init__(self, room_id, engine, sim_hz=pacman.SIM_HZ):
+        self.id, self.engine, self.sim_hz = room_id, engine, sim_hz
+        self.clients, self.player, self.inputs = set(), None, []
+        self.level = self.generation = None
+        self.eaten = [] # 이 판의 Level.eaten_logs 에 넣어 둔, 지난 델타 뒤에 먹은 타일들
+        self.scalars, self.entities = None, []
+        self.over_ticks, self.skipped_ticks = 0, 0
+        self.task = None
+
+    def join(self, client, role):
+        self.clients.add(client)
+        if role == ROLE_PLAY and self.player is None: self.player = client
+
+    def leave(self, client):
+        self.clients.discard(client)
+        if self.player is client: self.player = None
+
+    def input(self, client, action):
+        if client is self.player and 0 <= action <= pacman.ACTION_RIGHT: self.inputs.append(action)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        step = 1.0 / self.sim_hz
+        next_time = loop.time()
+        while True:
+            steps = 0
+            while next_time <= loop.time() and steps < pacman.MAX_STEPS_PER_FRAME:
+                self.step()
+                next_time += step
+                steps += 1
+            if next_time <= loop.time(): # 따라잡지 못한 틱은 버린다
+                self.skipped_ticks += int((loop.time() - next_time) // step) + 1
+                next_time = loop.time() + step
+            await asyncio.sleep(next_time - loop.time())
+
+    def step(self):
+        engine = self.engine
+        for action in self.inputs: engine.apply_action(action)
+        self.inputs.clear()
+        if engine.state == pacman.STATE_GAME_OVER:
+            self.over_ticks += 1
+            if self.over_ticks >= GAME_OVER_RESTART_TICKS:
+                self.over_ticks = 0
+                engine.init_game()
+        engine.update()
+        self.broadcast()
+
+    def broadcast(self):
+        engine = self.engine
+        level = engine.level
+        view = game_view(engine)
+        scalars, entities = view
+        if level is not self.level or level.generation != self.generation or len(entities) != len(self.entities):
+            # 새 판/새 라운드/엔티티 수가 바뀜: 모두에게 키프레임
+            if level is not self.level: level.eaten_logs.append(self.eaten)
+            self.level, self.generation = level, level.generation
+            self.eaten.clear()
+            message = encode_keyframe(engine, view)
+            for client in self.clients: client.resync = False
+        else:
+            flags, parts = 0, []
+            for bit, (old, new, field) in enumerate(zip(self.scalars, scalars, SCALAR_FIELDS)):
+                if old != new:
+                    flags |= 1 << bit
+                    parts.append(field.pack(new))
+            changed = [ENTITY.pack(i, *entity) for i, (entity, old) in enumerate(zip(entities, self.entities)) if entity != old]
+            eaten = self.eaten
+            message = b''.join([HEAD.pack(DELTA, engine.tick), bytes([flags]), *parts, COUNT.pack(len(changed)), *changed,
+                                COUNT.pack(len(eaten)), *(PELLET.pack(index) for index in eaten)])
+            eaten.clear()
+        self.scalars, self.entities = scalars, entities
+        frames = {}
+        for client in self.clients: client.push(frames, message)
+        # 다시 맞춰야 하는 클라이언트는 밀린 것을 다 보낸 뒤에 지금 상태의 키프레임을 받는다
+        keyframe = None
+        for client in self.clients:
+            if client.resync and client.queue.empty():
+                if keyframe is None: keyframe, frames = encode_keyframe(engine, view), {}
+                client.resync = False
+                client.push(frames, keyframe)
+
+
+class SpectatorServer:
+    def __init__(self, seed=None, level=None, sim_hz=pacman.SIM_HZ, queue_limit=QUEUE_LIMIT, send_buffer=SEND_BUFFER, clock=True):
+        # clock=False 면 판의 틱 루프를 돌리지 않는다 (Room.step() 을 직접 부르는 검증용)
+        self.seed, self.level, self.sim_hz = seed, level, sim_hz
+        self.queue_limit, self.send_buffer, self.clock = queue_limit, send_buffer, clock
+        self.rooms = {}
+
+    def room(self, room_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            seed = None if self.seed is None else self.seed + room_id
+            room = self.rooms[room_id] = Room(room_id, pacman.GameEngine(seed, level=self.level), self.sim_hz)
+            if self.clock: room.task = asyncio.ensure_future(room.run())
+        return room
+
+    async def start(self, host='127.0.0.1', port=0):
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None and self.send_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+            writer.transport.set_write_buffer_limits(self.send_buffer)
+        client = room = None
+        try:
+            first = await reader.readexactly(4)
+            websocket = first == b'GET '
+            if websocket:
+                request_line, headers = parse_headers(first + await reader.readuntil(b'\r\n\r\n'))
+                key = headers.get('sec-websocket-key')
+                if not key or headers.get('upgrade', '').lower() != 'websocket':
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+                    return
+                writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                              f'Sec-WebSocket-Accept: {ws_accept(key)}\r\n\r\n').encode('ascii'))
+            client = Connection(reader, writer, websocket, self.queue_limit)
+            # TCP 면 이미 읽은 4 바이트가 HELLO 의 길이다
+            hello = await client.read_message() if websocket else await reader.readexactly(min(LENGTH.unpack(first)[0], MAX_MESSAGE))
+            if hello is None or len(hello) != HELLO_MESSAGE.size or hello[0] != HELLO: return
+            _, room_id, role = HELLO_MESSAGE.unpack(hello)
+            room = self.room(room_id)
+            room.join(client, role)
+            while True:
+                message = await client.read_message()
+                if message is None: break
+                if len(message) == INPUT_MESSAGE.size and message[0] == INPUT: room.input(client, message[1])
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            if room is not None:
+                room.leave(client)
+                if not room.clients: # 아무도 없는 판은 닫는다
+                    if room.task is not None: room.task.cancel()
+                    del self.rooms[room.id]
+            if client is not None: client.close()
+            else: writer.close()
+
+
+class Mirror:
+    # 클라이언트 쪽: 키프레임과 델타를 받아 판의 상태를 그대로 복원한다.
+    def __init__(self):
+        self.tick, self.scalars, self.entities = -1, None, []
+        self.width = self.height = 0
+        self.fruit_pos, self.map = (0, 0), bytearray()
+        self.keyframes = self.deltas = 0
+
+    def apply(self, message):
+        kind, tick = HEAD.unpack_from(message)
+        offset = HEAD.size
+        if kind == KEYFRAME:
+            self.scalars = SCALARS.unpack_from(message, offset)
+            offset += SCALARS.size
+            self.width, self.height, fx, fy, n = LEVEL_HEAD.unpack_from(message, offset)
+            offset += LEVEL_HEAD.size
+            self.fruit_pos, self.map = (fx, fy), bytearray(zlib.decompress(message[offset:offset + n]))
+            offset += n
+            count = COUNT.unpack_from(message, offset)[0]
+            offset += COUNT.size
+            self.entities = [ENTITY.unpack_from(message, offset + i * ENTITY.size)[1:] for i in range(count)]
+            self.keyframes += 1
+        elif kind == DELTA:
+            if self.scalars is None: return kind # 키프레임보다 먼저 온 델타는 쓸 수 없다
+            flags = message[offset]
+            offset += 1
+            scalars = list(self.scalars)
+            for bit, field in enumerate(SCALAR_FIELDS):
+                if flags & (1 << bit):
+                    scalars[bit] = field.unpack_from(message, offset)[0]
+                    offset += field.size
+            self.scalars = tuple(scalars)
+            count = COUNT.unpack_from(message, offset)[0]
+            offset += COUNT.size
+            for _ in range(count):
+                index, x, y, d, state = ENTITY.unpack_from(message, offset)
+                offset += ENTITY.size
+                self.entities[index] = (x, y, d, state)
+            count = COUNT.unpack_from(message, offset)[0]
+            offset += COUNT.size
+            for index, in PELLET.iter_unpack(message[offset:offset + count * PELLET.size]): self.map[index] = 0
+            self.deltas += 1
+        else: raise ValueError(f"unknown message type {kind}")
+        self.tick = tick
+        return kind
+
+    def matches(self, engine):
+        scalars, entities = game_view(engine)
+        return self.tick == engine.tick and self.scalars == scalars and self.entities == entities and self.map == engine.level.map
+
+
+class Client:
+    # 루프백 검증과 봇용 asyncio 클라이언트 (TCP 또는 WebSocket)
+    def __init__(self, reader, writer, websocket):
+        self.reader, self.writer, self.websocket = reader, writer, websocket
+        self.mirror = Mirror()
+
+    @classmethod
+    async def connect(cls, host, port, room=0, role=ROLE_WATCH, websocket=False, recv_buffer=None):
+        if recv_buffer: # 느린 소비자 흉내: 받는 버퍼를 작게 잡는다
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer)
+            sock.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(sock, (host, port))
+            reader, writer = await asyncio.open_connection(sock=sock, limit=recv_buffer // 2) # StreamReader 도 조금만 쌓아 두게 한다
+        else: reader, writer = await asyncio.open_connection(host, port)
+        if websocket:
+            key = base64.b64encode(os.urandom(16)).decode('ascii')
+            writer.write((f'GET /pacman HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                          f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n').encode('ascii'))
+            status, headers = parse_headers(await reader.readuntil(b'\r\n\r\n'))
+            if ' 101 ' not in status or headers.get('sec-websocket-accept') != ws_accept(key): raise ConnectionError(f"websocket handshake failed: {status}")
+        client = cls(reader, writer, websocket)
+        await client.send(HELLO_MESSAGE.pack(HELLO, room, role))
+        return client
+
+    async def send(self, message):
+        self.writer.write(ws_frame(message, mask=os.urandom(4)) if self.websocket else LENGTH.pack(len(message)) + message)
+        await self.writer.drain()
+
+    async def send_input(self, action): await self.send(INPUT_MESSAGE.pack(INPUT, action))
+
+    async def receive(self):
+        # 메시지 하나를 받아 mirror 에 반영하고 종류를 돌려준다. 연결이 끝나면 None.
+        try:
+            if self.websocket:
+                opcode, message = await ws_read_frame(self.reader)
+                if opcode == 8: return None
+            else: message = await self.reader.readexactly(LENGTH.unpack(await self.reader.readexactly(LENGTH.size))[0])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        return self.mirror.apply(message)
+
+    async def run(self):
+        while await self.receive() is not None: pass
+
+    def close(self): self.writer.close()
+
+
+async def check(ticks=2000, spectators=200, seed=0):
+    # 루프백 검증: 플레이어 1 + 관전자 spectators (TCP/WebSocket 반반) + 한동안 읽지 않는 느린 관전자 1.
+    # 틱은 직접 돌리고(Room.step), 끝에서 모든 클라이언트의 Mirror 가 엔진 상태와 같은지 본다.
+    server = SpectatorServer(seed=seed, queue_limit=32, send_buffer=8 * 1024, clock=False)
+    listener = await server.start('127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    player = await Client.connect('127.0.0.1', port, role=ROLE_PLAY)
+    watchers = [await Client.connect('127.0.0.1', port, websocket=i % 2 == 1) for i in range(spectators)]
+    slow = await Client.connect('127.0.0.1', port, recv_buffer=4096)
+    while 0 not in server.rooms or len(server.rooms[0].clients) < spectators + 2: await asyncio.sleep(0.01)
+    room, rng = server.rooms[0], random.Random(seed)
+    readers = [asyncio.ensure_future(client.run()) for client in (player, *watchers)]
+    step_times, bytes_sent = [], 0
+    for t in range(ticks):
+        if t % 12 == 0: await player.send_input(rng.choice(tuple(pacman.ACTION_DIRECTIONS)))
+        start = time.perf_counter()
+        room.step()
+        step_times.append(time.perf_counter() - start)
+        if t == ticks * 3 // 4: readers.append(asyncio.ensure_future(slow.run())) # 느린 관전자가 이제야 읽기 시작한다
+        await asyncio.sleep(0)
+    engine = room.engine
+    clients = (player, *watchers, slow)
+    deadline = time.perf_counter() + 30
+    while any(client.mirror.tick != engine.tick for client in clients) and time.perf_counter() < deadline: await asyncio.sleep(0.01)
+    mismatched = sum(not client.mirror.matches(engine) for client in clients)
+    resyncs = sum(connection.dropped for connection in room.clients)
+    for client in clients: client.close()
+    for task in readers: task.cancel()
+    while server.rooms: await asyncio.sleep(0.01) # 서버 쪽 연결이 모두 끝나기를 기다린다
+    listener.close()
+    await listener.wait_closed()
+    step_times.sort()
+    return {'ticks': ticks, 'clients': len(clients), 'mismatched': mismatched, 'resyncs': resyncs, 'slow_keyframes': slow.mirror.keyframes,
+            'score': engine.pacman.score, 'step_ms_p50': round(statistics.median(step_times) * 1000, 3), 'step_ms_max': round(step_times[-1] * 1000, 3)}
+
+
+async def serve(host, port, **options):
+    listener = await SpectatorServer(**options).start(host, port)
+    print(f"serving on {', '.join(str(sock.getsockname()) for sock in listener.sockets)}")
+    async with listener: await listener.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stream live pacman games to spectators and remote players (TCP and WebSocket on one port).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=None, help="room N plays seed+N (default: random)")
+    parser.add_argument('--level', metavar='FILE', default=None, help="maze file for every room")
+    parser.add_argument('--sim-hz', type=int, default=pacman.SIM_HZ)
+    parser.add_argument('--check', action='store_true', help="loopback self-test with many spectators and a slow consumer")
+    parser.add_argument('--spectators', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=2000)
+    args = parser.parse_args()
+    try:
+        if args.check:
+            result = asyncio.run(check(args.ticks, args.spectators, args.seed or 0))
+            print(f"{'OK' if result['mismatched'] == 0 else 'FAILED'}: {result}")
+            sys.exit(result['mismatched'] != 0)
+        asyncio.run(serve(args.host, args.port, seed=args.seed, level=args.level, sim_hz=args.sim_hz))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,275 @@
+# 학습/분석용 궤적 데이터셋: 매 틱의 액션, 엔티티 위치, 고스트 상태, 점수, 먹은 펠릿을 열(column)마다 파일 하나에
+# 고정 길이 레코드로 덧붙인다. 읽을 때는 파싱 없이 numpy.memmap 으로 열어 바로 자른다.
+#
+#   python trajectory.py record data/ --episodes 100      # 헤드리스 판 100개를 기록 (runner 의 정책 사용)
+#   python pacman.py --trajectory data/                   # 사람이 하는 판을 기록
+#   python trajectory.py info data/
+#
+#   ds = Trajectories('data/')             # numpy 필요
+#   ds['pacman_pos']                       # (행 수, 2) int32 memmap. 행 하나 = update() 한 번
+#   ds.episode(3)['ghost_state']           # 에피소드 3 의 (틱 수, 고스트 수) 슬라이스 (복사 없음)
+#
+# 디렉터리 구성
+#   meta.json       버전, 고스트 수, 열 이름/자료형/모양
+#   <열 이름>.col    리틀 엔디언 고정 길이 값을 이어 붙인 것
+#   episodes.col    EPISODE 레코드: 시작 행 u64, 행 수 u32, 시드 u32, 점수 u32, 라운드 u16, 죽은 횟수 u16
+# 행의 action 은 그 틱의 update() 직전에 적용된 입력(없으면 ACTION_NONE)이고 나머지는 update() 직후의 상태다.
+# 틱마다 행 하나를 struct 로 버퍼에 채우고, FLUSH_ROWS 행마다 열별로 나눠 한 번에 덧붙인다.
+# 파일은 덧붙이기만 하므로 기록 도중 죽어도 앞부분은 읽힌다 (열 길이가 어긋나면 가장 짧은 열에 맞춘다).
+import json
+import operator
+import os
+import struct
+import time
+from itertools import chain
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pacman
+
+VERSION = 1
+FLUSH_ROWS = 4096
+GHOSTS = 'ghosts' # 모양에서 고스트 수 자리
+COLUMNS = (
+    ('episode', 'u4', ()),
+    ('tick', 'u4', ()),
+    ('action', 'u1', ()),
+    ('state', 'u1', ()),
+    ('score', 'u4', ()),
+    ('lives', 'u1', ()),
+    ('round', 'u2', ()),
+    ('pacman_tile', 'i2', (2,)),
+    ('pacman_pos', 'i4', (2,)), # pixel_pos (월드 픽셀)
+    ('pacman_dir', 'u1', ()), # pacman.DIRECTION_CODES
+    ('ghost_tile', 'i2', (GHOSTS, 2)),
+    ('ghost_pos', 'i4', (GHOSTS, 2)),
+    ('ghost_state', 'u1', (GHOSTS,)),
+    ('eaten', 'i4', ()), # 이번 틱에 먹은 펠릿의 타일 인덱스 (y * width + x), 없으면 -1
+    ('eaten_kind', 'u1', ()), # 2 펠릿, 3 파워 펠릿, 0 없음
+)
+STRUCT_CODES = {'u1': 'B', 'u2': 'H', 'u4': 'I', 'i2': 'h', 'i4': 'i'}
+# record() 가 값을 모으는 순서: (열, 원소 번호). 고스트 열은 'eaten' 앞에 고스트마다 GHOST_FIELDS_ORDER 순서로 들어간다.
+ROW_FIELDS = (('episode', 0), ('action', 0), ('tick', 0), ('state', 0), ('score', 0), ('lives', 0), ('round', 0),
+              ('pacman_tile', 0), ('pacman_tile', 1), ('pacman_pos', 0), ('pacman_pos', 1), ('pacman_dir', 0), ('eaten', 0), ('eaten_kind', 0))
+HEAD_ATTRS = ('tick', 'state', 'pacman.score', 'pacman.lives', 'round_level', 'pacman.tile_pos.x', 'pacman.tile_pos.y', 'pacman.pixel_pos.x', 'pacman.pixel_pos.y')
+GHOST_FIELDS = ('ghost_tile', 'ghost_pos', 'ghost_state')
+GHOST_FIELDS_ORDER = (('ghost_tile', 0), ('ghost_tile', 1), ('ghost_pos', 0), ('ghost_pos', 1), ('ghost_state', 0))
+GHOST_ATTRS = ('tile_pos.x', 'tile_pos.y', 'pixel_pos.x', 'pixel_pos.y', 'state')
+EPISODE = struct.Struct('<QIIIHH')
+EPISODE_FIELDS = (('start', '<u8'), ('rows', '<u4'), ('seed', '<u4'), ('score', '<u4'), ('round', '<u2'), ('deaths', '<u2'))
+
+
+def shape_size(shape):
+    n = 1
+    for size in shape: n *= size
+    return n
+
+
+def column_shapes(ghosts):
+    return [(name, dtype, tuple(ghosts if n == GHOSTS else n for n in shape)) for name, dtype, shape in COLUMNS]
+
+
+def column_path(path, name): return os.path.join(path, name + '.col')
+
+
+def read_meta(path):
+    with open(os.path.join(path, 'meta.json')) as f: meta = json.load(f)
+    if meta.get('version') != VERSION: raise ValueError(f"unsupported trajectory dataset version {meta.get('version')}")
+    return meta
+
+
+def stored_rows(path, columns):
+    # 모든 열에 다 쓰인 행 수
+    sizes = []
+    for name, dtype, shape in columns:
+        row_bytes = struct.calcsize('<' + STRUCT_CODES[dtype]) * shape_size(shape)
+        try: sizes.append(os.path.getsize(column_path(path, name)) // row_bytes)
+        except FileNotFoundError: sizes.append(0)
+    return min(sizes)
+
+
+class TrajectoryWriter:
+    def __init__(self, path, ghosts=4, flush_rows=FLUSH_ROWS):
+        self.path, self.flush_rows = path, flush_rows
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, 'meta.json')):
+            ghosts = read_meta(path)['ghosts']
+        else:
+            with open(os.path.join(path, 'meta.json'), 'w') as f:
+                json.dump({'version': VERSION, 'ghosts': ghosts, 'columns': [[name, dtype, list(shape)] for name, dtype, shape in COLUMNS]}, f)
+        self.ghosts = ghosts
+        self.columns = column_shapes(ghosts)
+        # 행 하나는 record() 가 값을 모으는 순서(ROW_FIELDS, 고스트는 한 마리씩)대로 채운 struct 이고,
+        # 열마다 그 열의 j 번째 바이트가 행 안 어디에 있는지(offsets)를 들고 있다가 flush() 에서 열별로 모은다.
+        dtypes = {name: dtype for name, dtype, _ in self.columns}
+        fields = [(name, i) for name, i in ROW_FIELDS if name not in GHOST_FIELDS]
+        head = fields.index(('eaten', 0))
+        fields[head:head] = [(name, g * 2 + i if name != 'ghost_state' else g) for g in range(ghosts) for name, i in GHOST_FIELDS_ORDER]
+        self.row = struct.Struct('<' + ''.join(STRUCT_CODES[dtypes[name]] for name, _ in fields))
+        positions, offset = {}, 0
+        for field in fields:
+            positions[field] = offset
+            offset += struct.calcsize('<' + STRUCT_CODES[dtypes[field[0]]])
+        self.layout = []
+        for name, dtype, shape in self.columns:
+            item = struct.calcsize('<' + STRUCT_CODES[dtype])
+            self.layout.append((name, [positions[(name, j // item)] + j % item for j in range(item * shape_size(shape))]))
+        self.get_head = operator.attrgetter(*HEAD_ATTRS)
+        self.get_ghost = operator.attrgetter(*GHOST_ATTRS)
+        self.buffer = bytearray(self.row.size * flush_rows)
+        self.rows = stored_rows(path, self.columns)
+        for name, offsets in self.layout: # 쓰다 만 행이 있으면 잘라 낸다
+            file, size = column_path(path, name), len(offsets)
+            if os.path.exists(file) and os.path.getsize(file) != self.rows * size: os.truncate(file, self.rows * size)
+        episodes_file = column_path(path, 'episodes')
+        self.episodes = os.path.getsize(episodes_file) // EPISODE.size if os.path.exists(episodes_file) else 0
+        self.buffered = 0
+        self.episode_start = None
+        self.action, self.game = pacman.ACTION_NONE, None
+        self.level, self.eaten = None, [] # 기록 중인 Level 과, 그 Level.eaten_logs 에 넣어 둔 리스트
+
+    def begin_episode(self, game):
+        if len(game.ghosts) != self.ghosts: raise ValueError(f"dataset stores {self.ghosts} ghosts, game has {len(game.ghosts)}")
+        self.episode_start = self.rows + self.buffered
+
+    def end_episode(self, game):
+        if self.episode_start is None: return
+        rows = self.rows + self.buffered - self.episode_start
+        if rows:
+            self.flush()
+            with open(column_path(self.path, 'episodes'), 'ab') as f:
+                f.write(EPISODE.pack(self.episode_start, rows, game.seed, game.pacman.score, game.round_level, game.deaths))
+            self.episodes += 1
+        self.episode_start = None
+
+    def record(self, game, action):
+        # update() 직후에 부른다. 값은 attrgetter 로 한 번에 모은다 (틱마다 파이썬 연산을 최소로).
+        eaten, kind, tiles = -1, 0, self.eaten
+        if tiles:
+            # 팩맨은 한 틱에 타일 하나만 먹으므로 행마다 한 칸이면 된다. 그보다 많으면 행이 사실을 담지 못하므로 멈춘다.
+            if len(tiles) > 1: raise RuntimeError(f"{len(tiles)} pellets eaten in one tick, trajectory rows hold one")
+            eaten = tiles[0]
+            kind = game.level.template.tiles[eaten]
+            tiles.clear()
+        d = game.pacman.direction
+        self.row.pack_into(self.buffer, self.buffered * self.row.size, self.episodes, action, *self.get_head(game), pacman.DIRECTION_CODES[d.x, d.y],
+                           *chain.from_iterable(map(self.get_ghost, game.ghosts)), eaten, kind)
+        self.buffered += 1
+        if self.buffered == self.flush_rows: self.flush()
+
+    def flush(self):
+        # 버퍼의 행들을 열별로 나눠 각 파일 끝에 덧붙인다 (바이트 단위 확장 슬라이스라 파이썬 루프가 행 수에 비례하지 않는다)
+        rows = self.buffered
+        if not rows: return
+        stride, data = self.row.size, memoryview(self.buffer)[:rows * self.row.size]
+        for name, offsets in self.layout:
+            size = len(offsets)
+            column = bytearray(rows * size)
+            for j, offset in enumerate(offsets): column[j::size] = data[offset::stride]
+            with open(column_path(self.path, name), 'ab') as f: f.write(column)
+        self.rows += rows
+        self.buffered = 0
+
+    def close(self):
+        if self.game is not None: self.end_episode(self.game)
+        self.flush()
+
+    def attach(self, game):
+        # 게임의 update/apply_action/init_game 을 인스턴스 단위로 감싸 매 틱 기록한다. 판이 끝나거나 새 판을 시작하면 에피소드를 닫는다.
+        # fast_forward() 는 틱을 건너뛰지 않고 한 틱씩 돌게 된다 (quiet_ticks 가 0).
+        self.game = game
+        update, apply_action, init_game = game.update, game.apply_action, game.init_game
+        def update_and_record():
+            if game.state == pacman.STATE_GAME_OVER: return update() # 끝난 판의 틱은 기록하지 않는다
+            level = game.level
+            if level is not self.level: # 새 판: 새 Level 에서 먹은 타일을 받는다
+                self.level = level
+                self.eaten.clear()
+                level.eaten_logs.append(self.eaten)
+            if self.episode_start is None: self.begin_episode(game)
+            update()
+            self.record(game, self.action)
+            self.action = pacman.ACTION_NONE
+            if game.state == pacman.STATE_GAME_OVER: self.end_episode(game)
+        def apply_and_remember(action):
+            apply_action(action)
+            if action != pacman.ACTION_NONE: self.action = action
+        def init_and_begin(*args, **kwargs):
+            self.end_episode(game)
+            self.action = pacman.ACTION_NONE
+            return init_game(*args, **kwargs)
+        def no_quiet_ticks(limit): return 0
+        for wrapper, original in ((update_and_record, update), (apply_and_remember, apply_action), (init_and_begin, init_game), (no_quiet_ticks, game.quiet_ticks)):
+            wrapper.__wrapped__ = original
+        game.update, game.apply_action, game.init_game, game.quiet_ticks = update_and_record, apply_and_remember, init_and_begin, no_quiet_ticks
+        game.trajectory = self
+        return self
+
+
+class Trajectories:
+    # 읽기 전용 데이터셋. 열은 numpy.memmap 이라 여는 데 드는 시간이 행 수와 무관하다.
+    def __init__(self, path):
+        import numpy as np
+        meta = read_meta(path)
+        self.path, self.ghosts = path, meta['ghosts']
+        columns = column_shapes(self.ghosts)
+        self.rows = stored_rows(path, columns)
+        self.columns = {}
+        for name, dtype, shape in columns:
+            dtype = np.dtype('<' + dtype)
+            self.columns[name] = np.memmap(column_path(path, name), dtype, 'r', shape=(self.rows, *shape)) if self.rows else np.empty((0, *shape), dtype)
+        episodes_file = column_path(path, 'episodes')
+        count = os.path.getsize(episodes_file) // EPISODE.size if os.path.exists(episodes_file) else 0
+        dtype = np.dtype(list(EPISODE_FIELDS))
+        self.episodes = np.memmap(episodes_file, dtype, 'r', shape=(count,)) if count else np.empty(0, dtype)
+
+    def __len__(self): return self.rows
+    def __getitem__(self, name): return self.columns[name]
+
+    def episode(self, i):
+        # -> {열 이름: 그 에피소드 구간의 memmap 슬라이스}
+        start, rows = int(self.episodes[i]['start']), int(self.episodes[i]['rows'])
+        return {name: column[start:start + rows] for name, column in self.columns.items()}
+
+
+def record_episodes(path, episodes, policy_spec=None, seed=0, max_ticks=None):
+    import runner
+    make_policy = runner.load_policy(policy_spec or runner.DEFAULT_POLICY)
+    max_ticks = max_ticks or runner.DEFAULT_MAX_TICKS
+    engine = pacman.GameEngine(seed=seed)
+    writer = TrajectoryWriter(path).attach(engine)
+    for episode in range(episodes):
+        if episode: engine.init_game(seed + episode)
+        policy = make_policy(seed + episode)
+        while engine.state != pacman.STATE_GAME_OVER and engine.tick < max_ticks:
+            action = policy(engine)
+            if action: engine.apply_action(action)
+            engine.update()
+    writer.close()
+    return writer
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Record and inspect per-tick pacman trajectory datasets.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="play headless episodes and append them to a dataset")
+    record.add_argument('path')
+    record.add_argument('--episodes', type=int, default=10)
+    record.add_argument('--policy', default=None, help="module:factory (default: runner's wander)")
+    record.add_argument('--seed', type=int, default=0, help="first episode seed (episode i uses seed+i)")
+    record.add_argument('--max-ticks', type=int, default=None)
+    info = commands.add_parser('info', help="summarise a dataset")
+    info.add_argument('path')
+    args = parser.parse_args()
+    if args.command == 'record':
+        start = time.perf_counter()
+        writer = record_episodes(args.path, args.episodes, args.policy, args.seed, args.max_ticks)
+        elapsed = time.perf_counter() - start
+        print(f"{writer.path}: {writer.rows} rows in {writer.episodes} episodes ({elapsed:.2f} s)")
+    else:
+        start = time.perf_counter()
+        ds = Trajectories(args.path)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(column_path(args.path, name)) for name in ds.columns)
+        print(f"{args.path}: {len(ds)} rows, {len(ds.episodes)} episodes, {size / 1e6:.1f} MB, opened in {elapsed * 1000:.2f} ms")
+        if len(ds.episodes): print(f"mean score {ds.episodes['score'].mean():.1f}, mean length {ds.episodes['rows'].mean():.0f} ticks")